@@ -6,13 +6,17 @@ import json
 import logging
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 import yaml
 from rich.console import Console
 from rich.table import Table
 
+from one_updater.package_managers import freshness
 from one_updater.package_managers.base import PackageManager
+from one_updater.package_managers.inventory import InventorySession
 from one_updater.package_managers.registry import PackageManagerRegistry
 
 
@@ -24,6 +28,13 @@ console = Console()
 error_console = Console(stderr=True)
 logger = logging.getLogger(__name__)
 
+# Concurrency group shared by every manager whose action needs the terminal
+# (e.g. sudo password prompts), so those never run at the same time.
+TERMINAL_GROUP = "terminal"
+
+# Number of managers export enumerates at once unless -j is given.
+DEFAULT_EXPORT_JOBS = 8
+
 
 def setup_logging(config: dict) -> None:
     """Set up logging configuration."""
@@ -116,9 +127,19 @@ def get_package_manager(name: str, config: dict) -> Optional[PackageManager]:
 
 
 def run_package_manager_action(
-    name: str, cfg: dict, action_name: str, action_func, verbose: bool, status=None
+    name: str,
+    cfg: dict,
+    action_name: str,
+    action_func,
+    verbose: bool,
+    status=None,
+    skip_check=None,
 ) -> None:
-    """Run a package manager action (update or upgrade) with proper console output."""
+    """Run a package manager action (update or upgrade) with proper console output.
+
+    *skip_check*, if given, is called with the package manager first; a
+    non-empty reason returned from it skips the action.
+    """
     if not cfg.get("enabled", True):
         return
 
@@ -137,6 +158,9 @@ def run_package_manager_action(
     logger.debug(f"Config for {name}: {cfg}")
 
     if pm := get_package_manager(name, cfg):
+        if skip_check and (reason := skip_check(pm)):
+            console.print(f"[green]✓ {name} {reason}, skipping {action_name}[/green]")
+            return
         # strip e at end of action_name if it exists
         action_name_without_e = action_name.title().rstrip("e")
         console.print(f"\n[bold blue]{action_name_without_e}ing {name}...[/bold blue]")
@@ -146,6 +170,81 @@ def run_package_manager_action(
             console.print(f"[red]✗ {name} {action_name} failed[/red]")
 
 
+def get_concurrency_group(name: str, cfg: dict, action_name: str) -> Optional[str]:
+    """Return the concurrency group a manager's action has to run in, if any.
+
+    Managers in the same group are never run at the same time. Actions that
+    need the terminal always share the ``terminal`` group, so two sudo
+    prompts can never be shown at once; otherwise an explicit
+    ``concurrency_group`` in the manager config applies.
+    """
+    try:
+        pm = PackageManagerRegistry.get_manager(name, cfg)
+    except ValueError:
+        pm = None
+    if pm is not None and pm.needs_terminal(action_name):
+        return TERMINAL_GROUP
+    if group := cfg.get("concurrency_group"):
+        return str(group)
+    return None
+
+
+def run_managers(
+    package_managers: dict,
+    action_name: str,
+    action_func,
+    verbose: bool,
+    jobs: int = 1,
+    status=None,
+    skip_check=None,
+) -> None:
+    """Run an action across package managers, up to *jobs* at a time.
+
+    Managers that need the terminal run first, one after another and with
+    nothing else running, so their prompts are not mixed with other
+    output. Of the rest, managers sharing a concurrency group are run one
+    after another in a single worker; everything else runs in parallel.
+    """
+
+    def _run_batch(batch: list[tuple[str, dict]]) -> None:
+        for name, cfg in batch:
+            run_package_manager_action(
+                name, cfg, action_name, action_func, verbose, status, skip_check
+            )
+
+    if jobs <= 1 or len(package_managers) <= 1:
+        _run_batch(list(package_managers.items()))
+        return
+
+    batches: dict[str, list[tuple[str, dict]]] = {}
+    for name, cfg in package_managers.items():
+        group = get_concurrency_group(name, cfg, action_name)
+        batches.setdefault(group or f"manager:{name}", []).append((name, cfg))
+
+    logger.debug(f"Running {action_name} with {jobs} jobs: {list(batches.values())}")
+
+    _run_batch(batches.pop(TERMINAL_GROUP, []))
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(_run_batch, batch) for batch in batches.values()]
+        for future in futures:
+            future.result()
+
+
+def config_jobs(config: dict) -> int:
+    """Return the validated ``jobs`` setting of *config* (default 1).
+
+    Exits with an error if it is not a positive integer.
+    """
+    value = config.get("jobs", 1)
+    try:
+        if isinstance(value, bool):
+            raise argparse.ArgumentTypeError(f"invalid integer: {value}")
+        return positive_int(str(value))
+    except argparse.ArgumentTypeError as e:
+        console.print(f"[red]Error: invalid 'jobs' in config: {e}[/red]")
+        sys.exit(1)
+
+
 def list_managers(config: dict) -> None:
     """List all configured package managers."""
     package_managers = config.get("package_managers", {})
@@ -160,8 +259,45 @@ def list_managers(config: dict) -> None:
         console.print(f"  • {name}: {status}")
 
 
-def update_managers(config: dict, managers: list[str], verbose: bool) -> None:
-    """Update specified package managers."""
+def update_skip_reason(pm: PackageManager) -> Optional[str]:
+    """Return why *pm* can skip its update, or None if it has to run.
+
+    An update is skipped while the last successful one, recorded by
+    one-updater or seen in the manager's index on disk, is younger than
+    the manager's ``update_ttl``.
+    """
+    if (ttl := pm.config.get("update_ttl")) is None or pm.name is None:
+        return None
+    try:
+        ttl = freshness.parse_duration(ttl)
+    except ValueError as e:
+        logger.warning(f"Ignoring update_ttl for {pm.name}: {e}")
+        return None
+    if (age := pm.index_age()) is not None and 0 <= age < ttl:
+        return f"was updated {freshness.format_age(age)} ago"
+    return None
+
+
+def update_and_record(pm: PackageManager) -> bool:
+    """Update *pm*, recording the time of a successful update."""
+    if success := pm.update():
+        if pm.name:
+            freshness.record_update(pm.name)
+    return success
+
+
+def update_managers(
+    config: dict,
+    managers: list[str],
+    verbose: bool,
+    jobs: Optional[int] = None,
+    force: bool = False,
+) -> None:
+    """Update specified package managers.
+
+    Managers updated more recently than their ``update_ttl`` are skipped
+    unless *force* is set.
+    """
     package_managers = config.get("package_managers", {})
 
     # Filter package managers if specified
@@ -178,14 +314,37 @@ def update_managers(config: dict, managers: list[str], verbose: bool) -> None:
         console.print("[yellow]No package managers specified or enabled[/yellow]")
         return
 
+    jobs = jobs or config_jobs(config)
     with console.status("[bold green]Updating package managers...") as status:
-        for name, cfg in package_managers.items():
-            run_package_manager_action(
-                name, cfg, "update", lambda pm: pm.update(), verbose, status
-            )
+        run_managers(
+            package_managers,
+            "update",
+            update_and_record,
+            verbose,
+            jobs,
+            status,
+            None if force else update_skip_reason,
+        )
 
 
-def upgrade_managers(config: dict, managers: list[str], verbose: bool) -> None:
+def upgrade_skip_reason(pm: PackageManager) -> Optional[str]:
+    """Return why *pm* can skip its upgrade, or None if it has to run.
+
+    Managers whose outdated probe finds nothing are skipped, unless the
+    probe is turned off with ``probe_outdated: false``.
+    """
+    if not pm.config.get("probe_outdated", True):
+        return None
+    if (outdated := pm.outdated_packages()) is not None and not outdated:
+        return "is up to date"
+    if outdated:
+        logger.debug(f"Outdated packages: {', '.join(outdated)}")
+    return None
+
+
+def upgrade_managers(
+    config: dict, managers: list[str], verbose: bool, jobs: Optional[int] = None
+) -> None:
     """Upgrade packages for specified package managers."""
     package_managers = config.get("package_managers", {})
 
@@ -203,11 +362,28 @@ def upgrade_managers(config: dict, managers: list[str], verbose: bool) -> None:
         console.print("[yellow]No package managers specified or enabled[/yellow]")
         return
 
+    jobs = jobs or config_jobs(config)
     with console.status("[bold green]Upgrading packages...") as status:
-        for name, cfg in package_managers.items():
-            run_package_manager_action(
-                name, cfg, "upgrade", lambda pm: pm.upgrade(), verbose, status
-            )
+        run_managers(
+            package_managers,
+            "upgrade",
+            lambda pm: pm.upgrade(),
+            verbose,
+            jobs,
+            status,
+            upgrade_skip_reason,
+        )
+
+
+def positive_int(value: str) -> int:
+    """argparse type for options that take a positive integer."""
+    try:
+        number = int(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"invalid integer: {value}") from e
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1: {value}")
+    return number
 
 
 def show_version():
@@ -255,6 +431,7 @@ def export_packages(
     fmt: str,
     verbose: bool,
     skip: Optional[list[str]] = None,
+    jobs: Optional[int] = None,
 ) -> None:
     # sourcery skip: low-code-quality
     """Export installed packages grouped by package manager to YAML or JSON."""
@@ -266,30 +443,76 @@ def export_packages(
         if m not in supported:
             console.print(f"[yellow]! {m} is not export-supported, skipping[/yellow]")
 
+    with (
+        InventorySession(jobs or DEFAULT_EXPORT_JOBS) as session,
+        ThreadPoolExecutor(max_workers=1) as scanner,
+    ):
+        started = time.monotonic()
+        collected = session.collect(targets)
+        elapsed = time.monotonic() - started
+
+        # The unmanaged scan needs every manager's inventory. Managers already
+        # collected for the export are reused; the rest are enumerated while
+        # the export is being written.
+        scan = scanner.submit(
+            lambda: scan_unmanaged_binaries(session.managed_names(sorted(supported)))
+        )
+        _print_export(collected, verbose, elapsed, output, fmt)
+        unmanaged = scan.result()
+
+    if unmanaged:
+        console.print("\n[bold yellow]Other Tools Not Importable:[/bold yellow]")
+        console.print(
+            "[dim](binaries in /usr/local/bin and ~/.local/bin"
+            " not managed by any known package manager)[/dim]"
+        )
+        for tool in unmanaged:
+            console.print(f"  \u2022 {tool}")
+
+
+def _print_export(
+    collected: dict,
+    verbose: bool,
+    elapsed: float,
+    output: Optional[str],
+    fmt: str,
+) -> None:
+    """Report per-manager results and write the export file (or stdout)."""
     result: dict[str, list[str]] = {}
-    for name in targets:
-        try:
-            pm = PackageManagerRegistry.get_manager(name, {"enabled": True})
-        except ValueError as e:
-            console.print(f"[yellow]! {e}, skipping[/yellow]")
+    for name, inventory in collected.items():
+        timing = f"[dim]({inventory.seconds:.2f}s)[/dim]"
+        if inventory.error:
+            console.print(f"[yellow]! {inventory.error}, skipping[/yellow]")
             continue
 
-        if not pm.is_available():
+        if not inventory.available:
             if verbose:
-                console.print(f"[yellow]! {name} not available, skipping[/yellow]")
+                console.print(
+                    f"[yellow]! {name} not available, skipping[/yellow] {timing}"
+                )
             continue
 
-        packages = pm.list_packages()
+        packages = inventory.packages
         if packages is None:
             console.print(f"[yellow]! {name} list not supported, skipping[/yellow]")
             continue
 
         if not packages:
-            console.print(f"[dim]- {name}: none found, skipping[/dim]")
+            console.print(f"[dim]- {name}: none found, skipping[/dim] {timing}")
             continue
-        console.print(f"[green]\u2713 {name}[/green]: {len(packages)} package(s)")
+        console.print(
+            f"[green]\u2713 {name}[/green]: {len(packages)} package(s) {timing}"
+        )
         result[name] = sorted(packages)
 
+    if verbose and collected:
+        slowest = max(collected, key=lambda name: collected[name].seconds)
+        console.print(
+            f"[dim]Collected {len(collected)} manager(s) in "
+            f"{elapsed:.2f}s; slowest: {slowest} "
+            f"({collected[slowest].seconds:.2f}s)[/dim]"
+        )
+
     if not result:
         console.print("[yellow]No packages found to export[/yellow]")
     else:
@@ -306,27 +529,6 @@ def export_packages(
             console.print("\n")
             console.print(text)
 
-    managed_names: set[str] = set()
-    for pkgs in result.values():
-        managed_names.update(pkgs)
-    targets_set = set(targets)
-    for pm_name in PackageManagerRegistry.EXPORT_SUPPORTED:
-        if pm_name in targets_set:
-            continue
-        with contextlib.suppress(Exception):
-            extra_pm = PackageManagerRegistry.get_manager(pm_name, {"enabled": True})
-            if extra_pm.is_available():
-                if extra_pkgs := extra_pm.list_packages():
-                    managed_names.update(extra_pkgs)
-    if unmanaged := scan_unmanaged_binaries(managed_names):
-        console.print("\n[bold yellow]Other Tools Not Importable:[/bold yellow]")
-        console.print(
-            "[dim](binaries in /usr/local/bin and ~/.local/bin"
-            " not managed by any known package manager)[/dim]"
-        )
-        for tool in unmanaged:
-            console.print(f"  \u2022 {tool}")
-
 
 def import_packages(
     file_path: str,
@@ -404,7 +606,7 @@ def import_packages(
                 "in the export file.[/yellow]"
             )
             continue
-        packages = [pkg for pkg in packages if isinstance(pkg, str)]
+        packages = list(dict.fromkeys(pkg for pkg in packages if isinstance(pkg, str)))
 
         try:
             pm = PackageManagerRegistry.get_manager(name, {"enabled": True})
@@ -418,22 +620,22 @@ def import_packages(
 
         summary[name] = {"installed": 0, "skipped": 0, "failed": 0}
 
+        present = {pkg for pkg in packages if pm.is_package_installed(pkg)}
+        missing = [pkg for pkg in packages if pkg not in present]
+        summary[name]["skipped"] = len(present)
+        results = {} if dry_run else pm.install_packages(missing)
+
         for pkg in packages:
-            if pm.is_package_installed(pkg):
-                summary[name]["skipped"] += 1
+            if pkg in present:
                 if verbose:
                     table.add_row(
                         name,
                         pkg,
                         "[yellow]skipped (already installed)[/yellow]",
                     )
-                continue
-
-            if dry_run:
+            elif dry_run:
                 table.add_row(name, pkg, "[blue]would install[/blue]")
-                continue
-
-            if pm.install_package(pkg):
+            elif results.get(pkg):
                 summary[name]["installed"] += 1
                 table.add_row(name, pkg, "[green]installed[/green]")
             else:
@@ -471,6 +673,7 @@ Examples:
   %(prog)s list-managers           List all configured package managers
   %(prog)s update -m brew pip      Update only brew and pip
   %(prog)s upgrade                 Upgrade all enabled package managers
+  %(prog)s upgrade -j 4            Upgrade up to 4 package managers at once
   %(prog)s export -o pkgs.yaml     Export installed packages to a file
   %(prog)s import pkgs.yaml        Install packages from an export file
   %(prog)s -h                      Show this help message
@@ -522,6 +725,17 @@ https://github.com/timmyb824/one-updater
         help="specific package manager(s) to process (can be specified multiple times)",
     )
 
+    # Parallelism arguments for update/upgrade commands
+    jobs_parser = argparse.ArgumentParser(add_help=False)
+    jobs_group = jobs_parser.add_argument_group("parallelism")
+    jobs_group.add_argument(
+        "-j",
+        "--jobs",
+        metavar="N",
+        type=positive_int,
+        help="number of package managers to process at once",
+    )
+
     # Add subcommands with detailed help
     init_help = """
     Initialize a new configuration file with default settings.
@@ -552,26 +766,35 @@ https://github.com/timmyb824/one-updater
     Update package manager indices/registries.
     If no managers are specified, updates all enabled managers.
     Use -m to specify specific managers to update.
+    Use -j to run several managers at once (default: config 'jobs' or 1).
+    Managers with an 'update_ttl' that were updated more recently are
+    skipped; use --force to update them anyway.
     """
-    subparsers.add_parser(
+    update_parser = subparsers.add_parser(
         "update",
         help="update package manager indices",
         description=update_help,
         formatter_class=argparse.RawDescriptionHelpFormatter,
-        parents=[common_parser, manager_parser],
+        parents=[common_parser, manager_parser, jobs_parser],
+    )
+    update_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="ignore update_ttl and update every selected manager",
     )
 
     upgrade_help = """
     Upgrade packages for specified package managers.
     If no managers are specified, upgrades all enabled managers.
     Use -m to specify specific managers to upgrade.
+    Use -j to run several managers at once (default: config 'jobs' or 1).
     """
     subparsers.add_parser(
         "upgrade",
         help="upgrade packages for package managers",
         description=upgrade_help,
         formatter_class=argparse.RawDescriptionHelpFormatter,
-        parents=[common_parser, manager_parser],
+        parents=[common_parser, manager_parser, jobs_parser],
     )
 
     version_help = """
@@ -589,13 +812,14 @@ https://github.com/timmyb824/one-updater
     Export all installed packages grouped by package manager.
     Writes YAML (default) or JSON to a file or stdout.
     Use -m to limit to specific managers.
+    Managers are enumerated in parallel (-j, default: 8).
     """
     export_parser = subparsers.add_parser(
         "export",
         help="export installed packages to a file",
         description=export_help,
         formatter_class=argparse.RawDescriptionHelpFormatter,
-        parents=[common_parser, manager_parser],
+        parents=[common_parser, manager_parser, jobs_parser],
     )
     export_parser.add_argument(
         "-o",
@@ -689,9 +913,9 @@ https://github.com/timmyb824/one-updater
         elif args.command == "list-managers":
             list_managers(config)
         elif args.command == "update":
-            update_managers(config, args.manager, args.verbose)
+            update_managers(config, args.manager, args.verbose, args.jobs, args.force)
         elif args.command == "upgrade":
-            upgrade_managers(config, args.manager, args.verbose)
+            upgrade_managers(config, args.manager, args.verbose, args.jobs)
         elif args.command == "export":
             export_packages(
                 args.manager,
@@ -699,6 +923,7 @@ https://github.com/timmyb824/one-updater
                 args.format,
                 args.verbose,
                 args.skip,
+                args.jobs,
             )
         elif args.command == "import":
             import_packages(
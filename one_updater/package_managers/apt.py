@@ -2,15 +2,20 @@
 
 from typing import Optional
 
+from . import dpkg, freshness
 from .base import PackageManager
 
+APT_LISTS = "/var/lib/apt/lists"
+# Touched after every successful `apt-get update` on Debian and Ubuntu
+APT_UPDATE_STAMP = "/var/lib/apt/periodic/update-success-stamp"
+
 
 class AptManager(PackageManager):
     """Manager for apt packages."""
 
     def is_available(self) -> bool:
         """Check if apt is available."""
-        return self.run_command(["which", "apt"])
+        return self._command_available("apt")
 
     def update(self) -> bool:
         """Update apt package lists."""
@@ -18,6 +23,10 @@ class AptManager(PackageManager):
             return False
         return self.run_command(self.commands.get("update", ["sudo", "apt", "update"]))
 
+    def last_index_refresh(self) -> Optional[float]:
+        """Return when the apt lists were last refreshed."""
+        return freshness.newest_mtime([APT_UPDATE_STAMP, APT_LISTS])
+
     def upgrade(self) -> bool:
         """Upgrade apt packages."""
         if not self._check_available("upgrade"):
@@ -26,22 +35,43 @@ class AptManager(PackageManager):
             self.commands.get("upgrade", ["sudo", "apt", "upgrade", "-y"])
         )
 
+    def outdated_packages(self) -> Optional[list[str]]:
+        """Return the packages `apt list --upgradable` reports, or None if unknown."""
+        if not self.is_available():
+            return None
+        ok, stdout, _ = self.run_command_with_output(["apt", "list", "--upgradable"])
+        if not ok:
+            return None
+        return [
+            line.split("/", 1)[0]
+            for line in (stdout or "").splitlines()
+            if "[upgradable from:" in line
+        ]
+
     def list_packages(self) -> Optional[list[str]]:
         """Return all explicitly installed apt packages."""
         if not self.is_available():
             return None
+        if (index := dpkg.installed_packages()) is not None:
+            return sorted(key for key, package in index.items() if package.manual)
         ok, stdout, _ = self.run_command_with_output(["apt-mark", "showmanual"])
         if not ok or not stdout:
             return []
         return [line.strip() for line in stdout.splitlines() if line.strip()]
 
+    def _install_command(self, names: list[str]) -> list[str]:
+        """Return the apt command installing all *names* at once."""
+        return ["sudo", "apt-get", "install", "-y", *names]
+
     def install_package(self, name: str) -> bool:
         """Install an apt package by name."""
         if not self.is_available():
             return False
-        return self.run_command(["sudo", "apt-get", "install", "-y", name])
+        return self.run_command(self._install_command([name]))
 
     def is_package_installed(self, name: str) -> bool:
         """Check whether an apt package is installed."""
+        if (index := dpkg.installed_packages()) is not None:
+            return dpkg.lookup(index, name) is not None
         ok, _, _ = self.run_command_with_output(["dpkg", "-s", name])
         return ok
@@ -0,0 +1,63 @@
+"""Cached lookup of executables on PATH.
+
+Results are memoized for the whole run and persisted to the cache
+directory. The persisted results are only reused while no directory on
+PATH has changed (by modification time), so repeated invocations skip
+probing entirely until something is installed or removed.
+"""
+
+import os
+import shutil
+import threading
+from typing import Optional
+
+from .cache import load_cache, save_cache
+
+CACHE_NAME = "which.json"
+
+_lock = threading.Lock()
+_resolved: dict[str, Optional[str]] = {}
+_fingerprint: Optional[list[list]] = None
+
+
+def _path_fingerprint() -> list[list]:
+    """Return [directory, mtime_ns] for every directory on PATH."""
+    fingerprint = []
+    for directory in os.environ.get("PATH", "").split(os.pathsep):
+        if not directory:
+            continue
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            mtime = -1
+        fingerprint.append([directory, mtime])
+    return fingerprint
+
+
+def _load() -> None:
+    """Take the PATH fingerprint and prime results from the on-disk cache."""
+    global _fingerprint
+    _fingerprint = _path_fingerprint()
+    cached = load_cache(CACHE_NAME)
+    if cached.get("fingerprint") == _fingerprint:
+        _resolved.update(cached.get("tools", {}))
+
+
+def which(tool: str) -> Optional[str]:
+    """Return the full path of *tool* on PATH, or None if it is not found."""
+    with _lock:
+        if _fingerprint is None:
+            _load()
+        if tool in _resolved:
+            return _resolved[tool]
+        _resolved[tool] = path = shutil.which(tool)
+        save_cache(CACHE_NAME, {"fingerprint": _fingerprint, "tools": _resolved})
+        return path
+
+
+def clear_cache() -> None:
+    """Forget all in-process results (the next lookup re-reads PATH)."""
+    global _fingerprint
+    with _lock:
+        _resolved.clear()
+        _fingerprint = None
@@ -1,8 +1,70 @@
+import asyncio
 import logging
-import subprocess
 import sys
+import time
 from abc import ABC, abstractmethod
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Coroutine, Optional, TypeVar
+
+from . import availability, freshness
+
+T = TypeVar("T")
+
+# Called with ("stdout" | "stderr", line) as a child process produces output.
+OutputCallback = Callable[[str, str], None]
+
+
+def _run_sync(coro: Coroutine[object, object, T]) -> T:
+    """Run a coroutine to completion from synchronous code.
+
+    When the calling thread is already running an event loop the coroutine
+    is run on a private loop in a helper thread instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+def bisect_batch(
+    names: list[str], run_batch: Callable[[list[str]], bool]
+) -> dict[str, bool]:
+    """Run *run_batch* on all names at once, splitting failed batches in half.
+
+    Splitting continues until every failing name is isolated, so one bad
+    package does not stop the rest from being processed. Returns the
+    result for each name.
+    """
+    if not names:
+        return {}
+    if run_batch(names):
+        return dict.fromkeys(names, True)
+    if len(names) == 1:
+        return {names[0]: False}
+    middle = len(names) // 2
+    return {
+        **bisect_batch(names[:middle], run_batch),
+        **bisect_batch(names[middle:], run_batch),
+    }
+
+
+async def _read_stream(
+    stream: asyncio.StreamReader, name: str, on_output: Optional[OutputCallback]
+) -> str:
+    """Read a child's output stream to EOF, reporting complete lines as they arrive."""
+    chunks: list[bytes] = []
+    pending = b""
+    while chunk := await stream.read(65536):
+        chunks.append(chunk)
+        if on_output:
+            *lines, pending = (pending + chunk).split(b"\n")
+            for line in lines:
+                on_output(name, line.decode(errors="replace"))
+    if on_output and pending:
+        on_output(name, pending.decode(errors="replace"))
+    return b"".join(chunks).decode(errors="replace")
 
 
 class PackageManager(ABC):
@@ -15,88 +77,186 @@ class PackageManager(ABC):
         self.commands = config.get("commands", {})
         self.verbose = config.get("verbose", False)
         self._status = config.get("status")  # Status object for progress display
+        # Snapshot of installed package names, enumerated once per run
+        self._inventory: Optional[set[str]] = None
+        self._inventory_loaded = False
+        # Registry name (e.g. "apt"), set by PackageManagerRegistry.get_manager
+        self.name: Optional[str] = None
 
-    def run_command(self, command: list[str]) -> bool:
-        """Run a command and return True if it succeeded."""
+    async def _communicate(
+        self,
+        command: list[str],
+        on_output: Optional[OutputCallback] = None,
+        env: Optional[dict[str, str]] = None,
+    ) -> tuple[int, str, str]:
+        """Run a command with captured output and return (returncode, stdout, stderr).
+
+        If *on_output* is given it is called with ("stdout" | "stderr", line)
+        for every line as soon as the child writes it. *env* replaces the
+        child's environment when given.
+        """
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=env,
+        )
+        stdout, stderr = await asyncio.gather(
+            _read_stream(process.stdout, "stdout", on_output),
+            _read_stream(process.stderr, "stderr", on_output),
+        )
+        return await process.wait(), stdout, stderr
+
+    async def run_command_async(
+        self, command: list[str], on_output: Optional[OutputCallback] = None
+    ) -> bool:
+        """Run a command and return True if it succeeded.
+
+        In verbose mode the command's output is logged line by line as it is
+        produced, instead of all at once when the command finishes.
+        """
         if not command:
             return True
 
-        try:
-            if self.verbose:
-                logging.info(f"Running command: {' '.join(command)}")
+        if self.verbose:
+            logging.info(f"Running command: {' '.join(command)}")
+            if on_output is None:
 
-            # Check if this is a sudo command that might need password input
-            needs_terminal = command[0] == "sudo"
+                def on_output(stream: str, line: str) -> None:
+                    logging.info(f"{command[0]} [{stream}]: {line}")
 
-            if needs_terminal and self._status:
-                # Pause the status spinner for sudo commands
-                self._status.stop()
+        # Check if this is a sudo command that might need password input
+        needs_terminal = command[0] == "sudo"
+        stdout = stderr = None
 
+        try:
             if needs_terminal:
-                # For sudo commands, connect directly to the terminal
-                result = subprocess.run(
-                    command,
-                    stdin=sys.stdin,
-                    stdout=sys.stdout,
-                    stderr=sys.stderr,
-                    check=True,
-                )
+                if self._status:
+                    # Pause the status spinner for sudo commands
+                    self._status.stop()
+                try:
+                    # For sudo commands, connect directly to the terminal
+                    process = await asyncio.create_subprocess_exec(
+                        *command,
+                        stdin=sys.stdin,
+                        stdout=sys.stdout,
+                        stderr=sys.stderr,
+                    )
+                    returncode = await process.wait()
+                finally:
+                    if self._status:
+                        # Resume the status spinner after sudo command
+                        self._status.start()
             else:
                 # For non-sudo commands, we can capture output
-                result = subprocess.run(
-                    command,
-                    capture_output=True,
-                    text=True,
-                    check=True,
-                )
-                if result.stdout:
-                    logging.info(
-                        f"INFO - stdout from {' '.join(command)}:\n{result.stdout}"
-                    )
-
-            if needs_terminal and self._status:
-                # Resume the status spinner after sudo command
-                self._status.start()
-
-            return True
-        except subprocess.CalledProcessError as e:
-            if self.verbose:
-                logging.error(f"Command failed with exit code {e.returncode}")
-                if hasattr(e, "stdout") and e.stdout:
-                    logging.error(f"stdout: {e.stdout}")
-                if hasattr(e, "stderr") and e.stderr:
-                    logging.error(f"stderr: {e.stderr}")
-            if hasattr(e, "stdout") and e.stdout:
-                logging.error(f"ERROR - stdout from {' '.join(command)}:\n{e.stdout}")
-            if hasattr(e, "stderr") and e.stderr:
-                logging.error(f"ERROR - stderr from {' '.join(command)}:\n{e.stderr}")
-
-            if needs_terminal and self._status:
-                # Resume the status spinner after error
-                self._status.start()
-
-            return False
+                returncode, stdout, stderr = await self._communicate(command, on_output)
         except FileNotFoundError:
             logging.error(f"Command not found: {command[0]}")
             return False
 
-    def run_command_with_output(
-        self, command: list[str]
+        if returncode != 0:
+            if self.verbose:
+                logging.error(f"Command failed with exit code {returncode}")
+                if stdout:
+                    logging.error(f"stdout: {stdout}")
+                if stderr:
+                    logging.error(f"stderr: {stderr}")
+            if stdout:
+                logging.error(f"ERROR - stdout from {' '.join(command)}:\n{stdout}")
+            if stderr:
+                logging.error(f"ERROR - stderr from {' '.join(command)}:\n{stderr}")
+            return False
+
+        if stdout and not self.verbose:  # verbose output was logged as it arrived
+            logging.info(f"INFO - stdout from {' '.join(command)}:\n{stdout}")
+        return True
+
+    async def run_command_with_output_async(
+        self,
+        command: list[str],
+        on_output: Optional[OutputCallback] = None,
+        env: Optional[dict[str, str]] = None,
     ) -> tuple[bool, Optional[str], Optional[str]]:
         """Run a command and return success status and output."""
         try:
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=True,
-                check=True,
+            returncode, stdout, stderr = await self._communicate(
+                command, on_output, env
             )
-            return True, result.stdout, result.stderr
-        except subprocess.CalledProcessError as e:
-            return False, e.stdout, e.stderr
         except FileNotFoundError:
             logging.error(f"Command not found: {command[0]}")
             return False, "", ""
+        return returncode == 0, stdout, stderr
+
+    async def run_commands_with_output_async(
+        self, commands: list[list[str]], limit: Optional[int] = None
+    ) -> list[tuple[bool, Optional[str], Optional[str]]]:
+        """Run several commands concurrently, at most *limit* at a time.
+
+        Results are returned in the same order as *commands*.
+        """
+        semaphore = asyncio.Semaphore(limit or max(len(commands), 1))
+
+        async def _run(command: list[str]) -> tuple[bool, Optional[str], Optional[str]]:
+            async with semaphore:
+                return await self.run_command_with_output_async(command)
+
+        return list(await asyncio.gather(*(_run(command) for command in commands)))
+
+    def run_command(self, command: list[str]) -> bool:
+        """Run a command and return True if it succeeded."""
+        return _run_sync(self.run_command_async(command))
+
+    def run_command_with_output(
+        self, command: list[str], env: Optional[dict[str, str]] = None
+    ) -> tuple[bool, Optional[str], Optional[str]]:
+        """Run a command and return success status and output."""
+        return _run_sync(self.run_command_with_output_async(command, env=env))
+
+    def run_commands_with_output(
+        self, commands: list[list[str]], limit: Optional[int] = None
+    ) -> list[tuple[bool, Optional[str], Optional[str]]]:
+        """Run several commands concurrently on one event loop."""
+        return _run_sync(self.run_commands_with_output_async(commands, limit))
+
+    def _command_available(self, command: str) -> bool:
+        """Check whether *command* is on PATH without spawning a process.
+
+        Lookups are cached for the whole run (and across runs while PATH
+        is unchanged), see :mod:`availability`.
+        """
+        return availability.which(command) is not None
+
+    def _positive_setting(self, key: str, default: int = 1) -> int:
+        """Return the config setting *key* as a positive integer.
+
+        Unset or empty settings give *default*; invalid ones are logged and
+        give *default* too, so a typo does not abort the run.
+        """
+        value = self.config.get(key)
+        if value is None or value == "":
+            return default
+        try:
+            if isinstance(value, bool):
+                raise ValueError(value)
+            number = int(str(value))
+        except ValueError:
+            number = 0
+        if number < 1:
+            logging.error(
+                f"Invalid {key!r} for {self.name or type(self).__name__}: "
+                f"{value!r} is not a positive integer, using {default}"
+            )
+            return default
+        return number
+
+    def needs_terminal(self, action: str) -> bool:
+        """Check whether running *action* needs direct access to the terminal.
+
+        Commands run through ``sudo`` may prompt for a password, so they are
+        connected to the terminal instead of having their output captured.
+        """
+        command = self.commands.get(action) or []
+        return bool(command) and command[0] == "sudo"
 
     def _check_available(self, operation: str) -> bool:
         """Check if package manager is available and log if not.
@@ -132,10 +292,97 @@ class PackageManager(ABC):
         """Return a list of installed package names, or None if unsupported."""
         return None
 
+    def last_index_refresh(self) -> Optional[float]:
+        """Return when the package index on disk was last refreshed, if known.
+
+        Used with ``update_ttl`` to notice refreshes made outside
+        one-updater. Returns None if the manager keeps no such index.
+        """
+        return None
+
+    def index_age(self) -> Optional[float]:
+        """Return the seconds since the package index was last refreshed.
+
+        Combines the successful updates recorded by one-updater with
+        last_index_refresh(). Returns None if neither is known.
+        """
+        recorded = freshness.last_update(self.name) if self.name else None
+        refreshed = [t for t in (recorded, self.last_index_refresh()) if t is not None]
+        return time.time() - max(refreshed) if refreshed else None
+
+    def index_is_current(self) -> bool:
+        """Check whether the index was refreshed this run or within update_ttl."""
+        if (age := self.index_age()) is None:
+            return False
+        if age <= time.time() - freshness.RUN_STARTED:
+            return True
+        try:
+            ttl = freshness.parse_duration(self.config.get("update_ttl", 0))
+        except ValueError:
+            return False
+        return age < ttl
+
+    def outdated_packages(self) -> Optional[list[str]]:
+        """Return the installed packages that have a newer version available.
+
+        Managers override this with a probe that is much cheaper than an
+        upgrade. Returns None if unsupported or the answer is unknown.
+        """
+        return None
+
+    def inventory(self) -> Optional[set[str]]:
+        """Return the installed package names, enumerating them only once.
+
+        The snapshot is taken from list_packages() on first use and kept for
+        the lifetime of this instance (one CLI run). Returns None if listing
+        is unsupported or the manager is unavailable.
+        """
+        if not self._inventory_loaded:
+            packages = self.list_packages()
+            self._inventory = set(packages) if packages is not None else None
+            self._inventory_loaded = True
+        return self._inventory
+
+    def mark_installed(self, name: str) -> None:
+        """Record a successful install in the inventory snapshot, if taken."""
+        if self._inventory is not None:
+            self._inventory.add(name)
+
     def install_package(self, _name: str) -> bool:
         """Install a single package by name. Returns False if unsupported."""
         return False
 
+    def _install_command(self, _names: list[str]) -> Optional[list[str]]:
+        """Return a command installing all *names* in one invocation.
+
+        Returns None if the tool cannot install several packages at once.
+        """
+        return None
+
+    def _install_batch(self, names: list[str]) -> bool:
+        """Install *names* with the command from _install_command()."""
+        return self.run_command(self._install_command(names))
+
+    def install_packages(self, names: list[str]) -> dict[str, bool]:
+        """Install several packages and return the result for each name.
+
+        Managers with a native multi-package install run one command for
+        the whole batch, splitting it to isolate failures; the others fall
+        back to install_package() per name.
+        """
+        if not names:
+            return {}
+        if len(names) == 1 or self._install_command(names) is None:
+            results = {name: self.install_package(name) for name in names}
+        elif not self.is_available():
+            results = dict.fromkeys(names, False)
+        else:
+            results = bisect_batch(names, self._install_batch)
+        for name, installed in results.items():
+            if installed:
+                self.mark_installed(name)
+        return results
+
     def is_package_installed(self, _name: str) -> bool:
         """Check whether a package is already installed.
 
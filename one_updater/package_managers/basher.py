@@ -14,7 +14,7 @@ class BasherManager(PackageManager):
     """
 
     def is_available(self) -> bool:
-        return self.run_command(["which", "basher"])
+        return self._command_available("basher")
 
     def update(self) -> bool:
         """Update Homebrew package lists."""
@@ -8,7 +8,7 @@ class BinManager(PackageManager):
 
     def is_available(self) -> bool:
         """Check if bin is available."""
-        return self.run_command(["which", "bin"])
+        return self._command_available("bin")
 
     def update(self) -> bool:
         """Update all binaries managed by bin, including bin itself."""
@@ -1,18 +1,32 @@
 """Homebrew package manager implementation."""
 
+import json
+import os
 import subprocess
 import sys
 from typing import Optional
 
+from . import cellar, freshness
 from .base import PackageManager
 
+# `brew upgrade` options that `brew outdated` takes too
+OUTDATED_FLAGS = {
+    "--formula",
+    "--formulae",
+    "--cask",
+    "--casks",
+    "--greedy",
+    "--greedy-latest",
+    "--greedy-auto-updates",
+}
+
 
 class HomebrewManager(PackageManager):
     """Manager for Homebrew packages."""
 
     def is_available(self) -> bool:
         """Check if Homebrew is installed."""
-        return self.run_command(["which", "brew"])
+        return self._command_available("brew")
 
     def update(self) -> bool:
         """Update Homebrew package lists."""
@@ -20,6 +34,22 @@ class HomebrewManager(PackageManager):
             return False
         return self.run_command(self.commands.get("update", ["brew", "update"]))
 
+    def last_index_refresh(self) -> Optional[float]:
+        """Return when `brew update` last fetched the Homebrew repository."""
+        if (prefix := cellar.brew_prefix()) is None:
+            return None
+        # The repository is the prefix itself or, on Intel macOS, prefix/Homebrew
+        return freshness.newest_mtime(
+            [
+                os.path.join(prefix, ".git", "FETCH_HEAD"),
+                os.path.join(prefix, "Homebrew", ".git", "FETCH_HEAD"),
+            ]
+        )
+
+    def needs_terminal(self, action: str) -> bool:
+        """brew upgrade is always attached to the terminal (casks may prompt)."""
+        return action == "upgrade" or super().needs_terminal(action)
+
     def upgrade(self) -> bool:
         """Upgrade Homebrew packages."""
         if not self.is_available():
@@ -50,23 +80,69 @@ class HomebrewManager(PackageManager):
 
         return success
 
+    def outdated_packages(self) -> Optional[list[str]]:
+        """Return the outdated formulae and casks, or None if unknown.
+
+        The probe does not auto-update like `brew upgrade` does, so "nothing
+        outdated" is only trusted when the taps were refreshed during this
+        run or within update_ttl. Selection flags of the configured upgrade
+        command (such as --greedy) are passed on.
+        """
+        if not self.is_available():
+            return None
+        upgrade = self.commands.get("upgrade", ["brew", "upgrade"])
+        flags = [arg for arg in upgrade if arg in OUTDATED_FLAGS]
+        ok, stdout, _ = self.run_command_with_output(
+            ["brew", "outdated", "--json=v2", *flags],
+            env={**os.environ, "HOMEBREW_NO_AUTO_UPDATE": "1"},
+        )
+        if not ok:
+            return None
+        try:
+            outdated = json.loads(stdout or "{}")
+        except ValueError:
+            return None
+        packages = [
+            package["name"]
+            for kind in ("formulae", "casks")
+            for package in outdated.get(kind, [])
+        ]
+        if not packages and not self.index_is_current():
+            return None
+        return packages
+
     def list_packages(self) -> Optional[list[str]]:
         """Return all installed Homebrew formulae and casks."""
         if not self.is_available():
             return None
-        ok, stdout, _ = self.run_command_with_output(["brew", "list", "--formula"])
-        formulae = stdout.splitlines() if ok and stdout else []
-        ok, stdout, _ = self.run_command_with_output(["brew", "list", "--cask"])
-        casks = stdout.splitlines() if ok and stdout else []
-        return formulae + casks
+        if (index := cellar.installed_packages()) is not None:
+            formulae = [name for name, pkg in index.items() if not pkg.cask]
+            casks = [name for name, pkg in index.items() if pkg.cask]
+            return formulae + casks
+        results = self.run_commands_with_output(
+            [["brew", "list", "--formula"], ["brew", "list", "--cask"]]
+        )
+        return [
+            name
+            for ok, stdout, _ in results
+            if ok and stdout
+            for name in stdout.splitlines()
+        ]
+
+    def _install_command(self, names: list[str]) -> list[str]:
+        """Return the Homebrew command installing all *names* at once."""
+        return ["brew", "install", *names]
 
     def install_package(self, name: str) -> bool:
         """Install a Homebrew formula or cask by name."""
         if not self.is_available():
             return False
-        return self.run_command(["brew", "install", name])
+        return self.run_command(self._install_command([name]))
 
     def is_package_installed(self, name: str) -> bool:
         """Check whether a Homebrew package is installed."""
+        if (index := cellar.installed_packages()) is not None:
+            # Tap-qualified names (user/tap/formula) are installed by short name
+            return name.rsplit("/", 1)[-1] in index
         ok, _, _ = self.run_command_with_output(["brew", "list", name])
         return ok
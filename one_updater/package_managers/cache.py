@@ -0,0 +1,78 @@
+"""Persistent cache files shared across one-updater runs."""
+
+import contextlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def get_cache_dir() -> str:
+    """Return the one-updater cache directory (honours XDG_CACHE_HOME)."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "one-updater")
+
+
+def file_stamp(path: str) -> Optional[list[int]]:
+    """Return [mtime_ns, size] identifying a file's contents, or None if missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+_memo_lock = threading.Lock()
+_memo_locks: dict[str, threading.Lock] = {}
+_memo: dict[str, tuple[list, object]] = {}
+
+
+def memoize_on_stamp(key: str, paths: list[str], read: Callable[[], T]) -> T:
+    """Return read(), reusing the result for *key* while *paths* are unchanged.
+
+    Paths are compared by file_stamp(); a directory's stamp changes when
+    entries are added or removed. If read() raises, nothing is stored.
+    """
+    stamp = [[path, file_stamp(path)] for path in paths]
+    with _memo_lock:
+        lock = _memo_locks.setdefault(key, threading.Lock())
+    with lock:
+        cached = _memo.get(key)
+        if cached and cached[0] == stamp:
+            return cached[1]
+        result = read()
+        _memo[key] = (stamp, result)
+        return result
+
+
+def load_cache(name: str) -> dict:
+    """Load a JSON cache file, returning an empty dict if missing or corrupt."""
+    path = os.path.join(get_cache_dir(), name)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_cache(name: str, data: dict) -> None:
+    """Atomically write a JSON cache file. Failures are logged, not raised."""
+    cache_dir = get_cache_dir()
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=f".{name}.")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, os.path.join(cache_dir, name))
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        logging.debug(f"Could not write cache {name}: {e}")
@@ -1,10 +1,245 @@
 """cargo package manager implementation."""
 
+import glob
+import json
 import logging
+import os
+import queue
+import shutil
 import subprocess
-from typing import Optional
+import tomllib
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional
 
+from . import sparseindex
 from .base import PackageManager
+from .cache import get_cache_dir, load_cache, memoize_on_stamp, save_cache
+from .freshness import RUN_STARTED, newest_mtime
+from .versions import is_prerelease, semver_key
+
+TARGET_CACHE = "cargo-target"
+TARGET_SIZES_CACHE = "cargo-target-sizes.json"
+UPGRADE_CACHE = "cargo-upgrade.json"
+DEFAULT_TARGET_CACHE_MB = 4096
+
+
+class InstalledCrate(NamedTuple):
+    """A crate recorded in cargo's install metadata."""
+
+    name: str
+    version: str
+    source: str  # e.g. registry+https://github.com/rust-lang/crates.io-index
+    bins: list[str]
+
+
+def cargo_home() -> str:
+    """Return CARGO_HOME (defaults to ~/.cargo)."""
+    return os.environ.get("CARGO_HOME") or os.path.expanduser("~/.cargo")
+
+
+def _parse_package_id(key: str, bins: list[str]) -> InstalledCrate:
+    """Parse a key like "ripgrep 14.1.0 (registry+https://...)"."""
+    name, _, rest = key.partition(" ")
+    version, _, source = rest.partition(" ")
+    return InstalledCrate(name, version, source.strip("()"), list(bins))
+
+
+def read_crates2(home: str) -> Optional[list[InstalledCrate]]:
+    """Read the crates recorded in $CARGO_HOME/.crates2.json.
+
+    Returns None if the file is missing or cannot be parsed.
+    """
+    try:
+        with open(os.path.join(home, ".crates2.json"), "r", encoding="utf-8") as f:
+            installs = json.load(f)["installs"]
+        return [
+            _parse_package_id(key, entry.get("bins", []))
+            for key, entry in installs.items()
+        ]
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def read_crates_toml(home: str) -> Optional[list[InstalledCrate]]:
+    """Read the crates recorded in the older $CARGO_HOME/.crates.toml.
+
+    Returns None if the file is missing or cannot be parsed.
+    """
+    try:
+        with open(os.path.join(home, ".crates.toml"), "rb") as f:
+            installs = tomllib.load(f)["v1"]
+        return [_parse_package_id(key, bins) for key, bins in installs.items()]
+    except (OSError, tomllib.TOMLDecodeError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def installed_crates(home: str) -> Optional[list[InstalledCrate]]:
+    """Return the installed crates, from .crates2.json or else .crates.toml.
+
+    The metadata is parsed once and reused until either file changes.
+    Returns None if neither file can be read.
+    """
+
+    def _read() -> Optional[list[InstalledCrate]]:
+        crates = read_crates2(home)
+        return crates if crates is not None else read_crates_toml(home)
+
+    paths = [os.path.join(home, name) for name in (".crates2.json", ".crates.toml")]
+    return memoize_on_stamp(f"cargo:{home}", paths, _read)
+
+
+def index_cache_relpath(name: str) -> str:
+    """Return the path of a crate within a registry index (e.g. ri/pg/ripgrep)."""
+    name = name.lower()
+    if len(name) <= 2:
+        return os.path.join(str(len(name)), name)
+    if len(name) == 3:
+        return os.path.join("3", name[0], name)
+    return os.path.join(name[:2], name[2:4], name)
+
+
+def read_index_cache(path: str) -> list[str]:
+    """Return the unyanked versions in one of cargo's registry index cache files.
+
+    The file holds a small header followed by NUL-separated pairs of
+    version and JSON index entry; only the JSON entries are needed.
+    """
+    try:
+        with open(path, "rb") as f:
+            fields = f.read().split(b"\0")
+    except OSError:
+        return []
+    versions = []
+    for field in fields:
+        if not field.startswith(b"{"):
+            continue
+        try:
+            entry = json.loads(field)
+        except ValueError:
+            continue
+        if isinstance(entry, dict) and entry.get("vers") and not entry.get("yanked"):
+            versions.append(entry["vers"])
+    return versions
+
+
+def latest_cached_version(home: str, name: str) -> Optional[str]:
+    """Return the newest stable version of a crate in the local index caches.
+
+    Every registry index under $CARGO_HOME is consulted. The result is only
+    as fresh as cargo's last index update. Returns None if the crate is not
+    cached anywhere.
+    """
+    versions = []
+    for path in _index_cache_paths(home, name):
+        versions += read_index_cache(path)
+    return latest_stable(versions)
+
+
+def _index_cache_paths(home: str, name: str) -> list[str]:
+    """Return the index cache file of a crate in every registry under *home*."""
+    relpath = index_cache_relpath(name)
+    return [
+        os.path.join(index_dir, ".cache", relpath)
+        for index_dir in glob.glob(os.path.join(home, "registry", "index", "*"))
+    ]
+
+
+def latest_stable(versions: list[str]) -> Optional[str]:
+    """Return the newest stable version among *versions*, if any."""
+    stable = [v for v in versions if semver_key(v) is not None and not is_prerelease(v)]
+    return max(stable, key=semver_key) if stable else None
+
+
+def index_cache_is_fresh(home: str, name: str, since: Optional[float]) -> bool:
+    """Check whether cargo rewrote a crate's index cache after *since*.
+
+    cargo only refreshes a crate's cache entry while resolving that crate,
+    so an entry older than the previous upgrade run may predate releases.
+    """
+    mtime = newest_mtime(_index_cache_paths(home, name))
+    return since is not None and mtime is not None and mtime > since
+
+
+def _tree_size(path: str) -> int:
+    """Return the total size in bytes of the files below *path*."""
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+# Directories of a cargo target profile holding one entry per compiled unit
+_TARGET_UNIT_DIRS = ("deps", "build", ".fingerprint", "incremental")
+
+
+def _target_unit_dirs(root: str) -> list[str]:
+    """Return the unit directories of every profile below the target cache.
+
+    Profiles live at <slot>/<profile> or, for cross builds,
+    <slot>/<triple>/<profile>.
+    """
+    dirs = []
+    for depth in ("*/*", "*/*/*"):
+        for name in _TARGET_UNIT_DIRS:
+            dirs += glob.glob(os.path.join(glob.escape(root), depth, name))
+    return dirs
+
+
+def evict_target_cache(max_bytes: int) -> list[str]:
+    """Shrink the shared cargo target cache to at most *max_bytes*.
+
+    Individual build outputs (entries of deps, build, .fingerprint and
+    incremental) are removed, least recently built first, so the rest of
+    each target directory stays usable. Sizes of directory entries are
+    cached by mtime, so only new outputs are measured. Returns the removed
+    paths.
+    """
+    root = os.path.join(get_cache_dir(), TARGET_CACHE)
+    cached = load_cache(TARGET_SIZES_CACHE)
+    sizes: dict[str, list[int]] = {}
+    units = []
+    for parent in _target_unit_dirs(root):
+        try:
+            entries = list(os.scandir(parent))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                stat = entry.stat(follow_symlinks=False)
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            size = stat.st_size
+            if is_dir:
+                known = cached.get(entry.path)
+                if known and known[0] == stat.st_mtime_ns:
+                    size = known[1]
+                else:
+                    size = _tree_size(entry.path)
+                sizes[entry.path] = [stat.st_mtime_ns, size]
+            units.append((stat.st_mtime, entry.path, is_dir, size))
+    total = sum(size for *_, size in units)
+    removed = []
+    for _, path, is_dir, size in sorted(units):
+        if total <= max_bytes:
+            break
+        try:
+            if is_dir:
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+        except OSError as e:
+            logging.debug(f"Cannot evict cargo build output {path}: {e}")
+            continue
+        total -= size
+        sizes.pop(path, None)
+        removed.append(path)
+    save_cache(TARGET_SIZES_CACHE, sizes)
+    return removed
 
 
 class CargoManager(PackageManager):
@@ -12,7 +247,7 @@ class CargoManager(PackageManager):
 
     def is_available(self) -> bool:
         """Check if cargo is available."""
-        return self.run_command(["which", "cargo"])
+        return self._command_available("cargo")
 
     def update(self) -> bool:
         """Update cargo package lists."""
@@ -35,7 +270,111 @@ class CargoManager(PackageManager):
             logging.info("cargo upgrade command not configured. Skipping.")
             return success
 
-        # Get list of installed packages
+        # Installed versions come from cargo's metadata, latest versions from
+        # the registry index, so only outdated crates are rebuilt
+        home = cargo_home()
+        crates = installed_crates(home)
+        if crates is None:
+            return self._upgrade_all() and success
+
+        latest = self._latest_versions(home, crates)
+        outdated = []
+        for crate in crates:
+            if self._is_up_to_date(crate, latest.get(crate.name)):
+                if self.verbose:
+                    logging.info(
+                        f"cargo package {crate.name} is up to date ({crate.version})"
+                    )
+                continue
+            outdated.append(crate.name)
+
+        failed = self._install_each(outdated)
+        logging.info(
+            f"cargo summary: {len(outdated) - len(failed)} rebuilt, "
+            f"{len(crates) - len(outdated)} build(s) avoided, {len(failed)} failed"
+        )
+        self._evict_target_cache()
+        save_cache(UPGRADE_CACHE, {"last_run": RUN_STARTED})
+        return success and not failed
+
+    def _install_each(self, packages: list[str]) -> list[str]:
+        """Install each package, up to `parallel_installs` at a time.
+
+        Every worker owns one shared target directory (when enabled) so
+        concurrent builds never wait on each other's cargo build lock.
+        Returns the packages that failed.
+        """
+        workers = max(
+            1, min(self._positive_setting("parallel_installs"), len(packages))
+        )
+        slots: "queue.Queue[int]" = queue.Queue()
+        for slot in range(workers):
+            slots.put(slot)
+
+        def _install(package: str) -> bool:
+            slot = slots.get()
+            try:
+                if self.verbose:
+                    logging.info(f"Updating cargo package: {package}")
+                return self._install_batch([package], slot, workers)
+            finally:
+                slots.put(slot)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_install, packages))
+        return [package for package, ok in zip(packages, results) if not ok]
+
+    def _latest_versions(
+        self, home: str, crates: list[InstalledCrate]
+    ) -> dict[str, Optional[str]]:
+        """Look up the latest stable version of each registry crate.
+
+        Crates from crates.io and other sparse registries are looked up
+        upstream. Otherwise, or when the registry cannot be reached, the
+        local index cache is only used if cargo refreshed it since the
+        previous upgrade run; an older entry counts as unknown (None).
+        """
+        if not self.config.get("check_latest", True):
+            return {}
+        urls = {}
+        for crate in crates:
+            if base := sparseindex.index_url(crate.source):
+                relpath = index_cache_relpath(crate.name).replace(os.sep, "/")
+                urls[crate.name] = base + relpath
+        fetched = sparseindex.fetch_all(urls.values())
+        last_run = load_cache(UPGRADE_CACHE).get("last_run")
+        if not isinstance(last_run, (int, float)):
+            last_run = None
+        latest: dict[str, Optional[str]] = {}
+        for crate in crates:
+            if (versions := fetched.get(urls.get(crate.name, ""))) is not None:
+                latest[crate.name] = latest_stable(versions)
+            elif index_cache_is_fresh(home, crate.name, last_run):
+                latest[crate.name] = latest_cached_version(home, crate.name)
+            else:
+                latest[crate.name] = None
+        return latest
+
+    def _is_up_to_date(self, crate: InstalledCrate, latest: Optional[str]) -> bool:
+        """Check whether a registry crate is already at its *latest* version.
+
+        Crates from git or path sources, and crates whose latest version is
+        unknown, are never considered up to date.
+        """
+        if not self.config.get("check_latest", True):
+            return False
+        if not crate.source.startswith(("registry+", "sparse+")):
+            return False
+        installed = semver_key(crate.version)
+        return (
+            installed is not None
+            and latest is not None
+            and semver_key(latest) <= installed
+        )
+
+    def _upgrade_all(self) -> bool:
+        """Reinstall every crate listed by `cargo install --list`."""
+        success = True
         try:
             result = subprocess.run(
                 ["cargo", "install", "--list"],
@@ -54,10 +393,8 @@ class CargoManager(PackageManager):
                     packages.append(package)
 
             # Update each package
-            for package in packages:
-                if self.verbose:
-                    logging.info(f"Updating cargo package: {package}")
-                success &= self.run_command(["cargo", "install", package])
+            success &= not self._install_each(packages)
+            self._evict_target_cache()
 
         except subprocess.CalledProcessError:
             logging.error("Failed to list cargo packages")
@@ -69,18 +406,83 @@ class CargoManager(PackageManager):
         """Return all cargo-installed package names."""
         if not self.is_available():
             return None
+        if (crates := installed_crates(cargo_home())) is not None:
+            return [crate.name for crate in crates]
         ok, stdout, _ = self.run_command_with_output(["cargo", "install", "--list"])
         if not ok or not stdout:
             return []
         return [line.split()[0] for line in stdout.splitlines() if ":" in line]
 
+    def _target_dir(self, slot: int) -> Optional[str]:
+        """Return the shared target directory for a worker slot, if enabled."""
+        if not self.config.get("shared_target", False):
+            return None
+        return os.path.join(get_cache_dir(), TARGET_CACHE, f"slot-{slot}")
+
+    def _jobs_per_install(self, workers: int) -> Optional[int]:
+        """Split the `build_jobs` CPU budget (default: all CPUs) between workers.
+
+        Returns None when cargo's own default is appropriate, i.e. with a
+        single worker and no configured budget.
+        """
+        budget = self._positive_setting("build_jobs", 0)
+        if not budget and workers <= 1:
+            return None
+        return max(1, (budget or os.cpu_count() or 1) // workers)
+
+    def _evict_target_cache(self) -> None:
+        """Keep the shared target cache under `target_cache_max_mb`."""
+        if not self.config.get("shared_target", False):
+            return
+        max_mb = self._positive_setting("target_cache_max_mb", DEFAULT_TARGET_CACHE_MB)
+        for entry in evict_target_cache(max_mb * 1024 * 1024):
+            if self.verbose:
+                logging.info(f"Evicted cargo build cache {entry}")
+
+    def _install_command(
+        self, names: list[str], slot: int = 0, workers: int = 1, shared: bool = True
+    ) -> list[str]:
+        """Return the cargo command installing all *names* at once.
+
+        *slot* selects the shared target directory (unless *shared* is
+        False) and *workers* the number of installs running alongside this
+        one.
+        """
+        command = ["cargo", "install", *names]
+        if shared and (target := self._target_dir(slot)):
+            command += ["--target-dir", target]
+        if jobs := self._jobs_per_install(workers):
+            command += ["--jobs", str(jobs)]
+        return command
+
+    def _install_batch(self, names: list[str], slot: int = 0, workers: int = 1) -> bool:
+        """Install *names* with one cargo command, creating its target first.
+
+        If the shared target directory cannot be created, cargo builds in
+        its default temporary directory instead.
+        """
+        shared = True
+        if target := self._target_dir(slot):
+            try:
+                os.makedirs(target, exist_ok=True)
+            except OSError as e:
+                logging.warning(f"Cannot use shared cargo target {target}: {e}")
+                shared = False
+        return self.run_command(self._install_command(names, slot, workers, shared))
+
+    def install_packages(self, names: list[str]) -> dict[str, bool]:
+        """Install packages, then trim the shared target cache."""
+        results = super().install_packages(names)
+        self._evict_target_cache()
+        return results
+
     def install_package(self, name: str) -> bool:
         """Install a cargo package by name."""
         if not self.is_available():
             return False
-        return self.run_command(["cargo", "install", name])
+        return self._install_batch([name])
 
     def is_package_installed(self, name: str) -> bool:
         """Check whether a cargo package is installed."""
-        packages = self.list_packages()
+        packages = self.inventory()
         return packages is not None and name in packages
@@ -0,0 +1,121 @@
+"""Reader for the Homebrew Cellar and Caskroom.
+
+Installed formulae and casks are read from the brew prefix directly:
+one directory per package, plus each formula's ``INSTALL_RECEIPT.json``
+for the installed-on-request flag. This replaces ``brew list``
+invocations, which each take most of a second. The index is rebuilt only
+when a package is added to or removed from the Cellar or Caskroom.
+"""
+
+import json
+import os
+from typing import NamedTuple, Optional
+
+from . import availability
+from .cache import memoize_on_stamp
+
+
+class BrewPackage(NamedTuple):
+    """An installed Homebrew formula or cask."""
+
+    name: str
+    version: str
+    cask: bool
+    on_request: bool  # False for formulae installed only as dependencies
+
+
+def brew_prefix() -> Optional[str]:
+    """Return the Homebrew prefix, or None if there is no usable Cellar.
+
+    HOMEBREW_PREFIX wins; otherwise the prefix is derived from the brew
+    executable on PATH (<prefix>/bin/brew).
+    """
+    prefix = os.environ.get("HOMEBREW_PREFIX")
+    if not prefix and (brew := availability.which("brew")):
+        prefix = os.path.dirname(os.path.dirname(brew))
+    if prefix and os.path.isdir(os.path.join(prefix, "Cellar")):
+        return prefix
+    return None
+
+
+def _current_version(package_dir: str, linked: Optional[str] = None) -> str:
+    """Return the installed version directory of a keg or cask.
+
+    The version *linked* from opt/ wins; otherwise the newest directory.
+    """
+    if linked and os.path.isdir(os.path.join(package_dir, linked)):
+        return linked
+    versions = [
+        entry
+        for entry in os.scandir(package_dir)
+        if entry.is_dir() and not entry.name.startswith(".")
+    ]
+    if not versions:
+        return ""
+    return max(versions, key=lambda entry: entry.stat().st_mtime).name
+
+
+def _on_request(keg: str) -> bool:
+    """Read installed_on_request from a keg's INSTALL_RECEIPT.json."""
+    try:
+        with open(
+            os.path.join(keg, "INSTALL_RECEIPT.json"), "r", encoding="utf-8"
+        ) as f:
+            receipt = json.load(f)
+    except (OSError, ValueError):
+        return True  # No receipt: treat as explicitly installed, like brew leaves
+    return bool(receipt.get("installed_on_request", True))
+
+
+def read_index(prefix: str) -> dict[str, BrewPackage]:
+    """Index the formulae and casks installed under a Homebrew prefix by name.
+
+    Raises OSError if the Cellar cannot be listed.
+    """
+    index = {}
+    cellar = os.path.join(prefix, "Cellar")
+    for entry in sorted(os.scandir(cellar), key=lambda e: e.name):
+        if not entry.is_dir() or entry.name.startswith("."):
+            continue
+        opt = os.path.join(prefix, "opt", entry.name)
+        linked = (
+            os.path.basename(os.path.realpath(opt)) if os.path.islink(opt) else None
+        )
+        version = _current_version(entry.path, linked)
+        if not version:
+            continue
+        index[entry.name] = BrewPackage(
+            entry.name,
+            version,
+            False,
+            _on_request(os.path.join(entry.path, version)),
+        )
+
+    caskroom = os.path.join(prefix, "Caskroom")
+    if os.path.isdir(caskroom):
+        for entry in sorted(os.scandir(caskroom), key=lambda e: e.name):
+            if entry.is_dir() and not entry.name.startswith("."):
+                version = _current_version(entry.path)
+                index.setdefault(
+                    entry.name, BrewPackage(entry.name, version, True, True)
+                )
+    return index
+
+
+def installed_packages(
+    prefix: Optional[str] = None,
+) -> Optional[dict[str, BrewPackage]]:
+    """Return the installed package index for *prefix* (default: brew_prefix()).
+
+    Returns None if there is no readable Homebrew prefix.
+    """
+    if prefix is None and (prefix := brew_prefix()) is None:
+        return None
+    try:
+        return memoize_on_stamp(
+            "cellar",
+            [os.path.join(prefix, "Cellar"), os.path.join(prefix, "Caskroom")],
+            lambda: read_index(prefix),
+        )
+    except OSError:
+        return None
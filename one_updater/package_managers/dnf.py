@@ -3,6 +3,7 @@
 import logging
 from typing import Optional
 
+from . import rpmdb
 from .base import PackageManager
 
 
@@ -32,7 +33,7 @@ class DnfManager(PackageManager):
             return False
 
         # Check if dnf is installed
-        return self.run_command(["which", "dnf"])
+        return self._command_available("dnf")
 
     def is_available(self) -> bool:
         """Check if DNF is available on the system.
@@ -41,7 +42,7 @@ class DnfManager(PackageManager):
             bool: True if DNF is available, False otherwise
         """
         # Check if dnf is installed
-        if not self.run_command(["which", "dnf"]):
+        if not self._command_available("dnf"):
             if self.verbose:
                 logging.warning("DNF is not installed")
             return False
@@ -69,10 +70,32 @@ class DnfManager(PackageManager):
 
         return self.run_command(self.commands["upgrade"])
 
+    def outdated_packages(self) -> Optional[list[str]]:
+        """Return the packages `dnf check-update` reports, or None if unknown.
+
+        check-update exits 0 when nothing is outdated and 100 when there are
+        updates, so a failed run only counts if it listed packages.
+        """
+        if not self.is_available():
+            return None
+        ok, stdout, _ = self.run_command_with_output(["dnf", "check-update", "-q"])
+        packages = []
+        for line in (stdout or "").splitlines():
+            fields = line.split()
+            if len(fields) == 3 and "." in fields[0]:
+                packages.append(fields[0].rsplit(".", 1)[0])  # strip the arch
+            elif line.startswith("Obsoleting"):
+                break
+        if not ok and not packages:
+            return None
+        return packages
+
     def list_packages(self) -> Optional[list[str]]:
         """Return all explicitly installed DNF package names."""
         if not self.is_available():
             return None
+        if (index := rpmdb.installed_packages()) is not None:
+            return sorted(index)
         ok, stdout, _ = self.run_command_with_output(
             ["dnf", "repoquery", "--installed", "--qf", "%{name}"]
         )
@@ -80,13 +103,19 @@ class DnfManager(PackageManager):
             return []
         return [line.strip() for line in stdout.splitlines() if line.strip()]
 
+    def _install_command(self, names: list[str]) -> list[str]:
+        """Return the DNF command installing all *names* at once."""
+        return ["sudo", "dnf", "install", "-y", *names]
+
     def install_package(self, name: str) -> bool:
         """Install a DNF package by name."""
         if not self.is_available():
             return False
-        return self.run_command(["sudo", "dnf", "install", "-y", name])
+        return self.run_command(self._install_command([name]))
 
     def is_package_installed(self, name: str) -> bool:
         """Check whether a DNF package is installed."""
+        if (index := rpmdb.installed_packages()) is not None:
+            return name in index
         ok, _, _ = self.run_command_with_output(["dnf", "list", "installed", name])
         return ok
@@ -0,0 +1,114 @@
+"""Reader for the dpkg status database and apt's auto-installed marks.
+
+Parses ``/var/lib/dpkg/status`` and ``/var/lib/apt/extended_states`` in a
+single streaming pass each, so apt inventory and install checks need no
+dpkg or apt-mark processes. The index is rebuilt only when either file
+changes.
+"""
+
+from typing import Iterator, NamedTuple, Optional
+
+from .cache import memoize_on_stamp
+
+DPKG_STATUS = "/var/lib/dpkg/status"
+APT_EXTENDED_STATES = "/var/lib/apt/extended_states"
+
+
+class DpkgPackage(NamedTuple):
+    """An installed package from the dpkg status database."""
+
+    name: str
+    architecture: str
+    version: str
+    manual: bool  # False if apt marked it automatically installed
+
+
+def _stanzas(path: str) -> Iterator[dict[str, str]]:
+    """Yield the fields of each blank-line separated stanza in a control file.
+
+    Continuation lines (multi-line fields such as Description) are skipped.
+    """
+    fields: dict[str, str] = {}
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if not line.strip():
+                if fields:
+                    yield fields
+                    fields = {}
+            elif not line[0].isspace():
+                key, _, value = line.partition(":")
+                fields[key] = value.strip()
+    if fields:
+        yield fields
+
+
+def _auto_installed(path: str) -> set[tuple[str, str]]:
+    """Return (package, architecture) pairs apt marked as automatically installed."""
+    try:
+        return {
+            (fields.get("Package", ""), fields.get("Architecture", ""))
+            for fields in _stanzas(path)
+            if fields.get("Auto-Installed") == "1"
+        }
+    except OSError:
+        return set()
+
+
+def read_index(
+    status_path: str = DPKG_STATUS, states_path: str = APT_EXTENDED_STATES
+) -> dict[str, DpkgPackage]:
+    """Index the installed packages in the dpkg status database.
+
+    Packages for the native architecture (or "all") are keyed by bare name,
+    as apt-mark prints them; other architectures by "name:arch".
+
+    Raises OSError if the status database cannot be read.
+    """
+    auto = _auto_installed(states_path)
+    packages = []
+    native = ""
+    for fields in _stanzas(status_path):
+        name = fields.get("Package")
+        # Status is "<want> <flag> <status>"; only fully installed packages count
+        if not name or not fields.get("Status", "").endswith(" installed"):
+            continue
+        arch = fields.get("Architecture", "")
+        if name == "dpkg":
+            native = arch  # dpkg itself is always built for the native architecture
+        packages.append((name, arch, fields.get("Version", "")))
+
+    index: dict[str, DpkgPackage] = {}
+    for name, arch, version in packages:
+        key = name if arch in (native, "all") else f"{name}:{arch}"
+        # apt records "all" packages under the native architecture
+        marked = (name, native if arch == "all" else arch) in auto
+        index[key] = DpkgPackage(name, arch, version, not marked)
+    return index
+
+
+def installed_packages(
+    status_path: str = DPKG_STATUS, states_path: str = APT_EXTENDED_STATES
+) -> Optional[dict[str, DpkgPackage]]:
+    """Return the installed package index, rebuilding it if either file changed.
+
+    Returns None if the dpkg status database cannot be read.
+    """
+    try:
+        return memoize_on_stamp(
+            "dpkg",
+            [status_path, states_path],
+            lambda: read_index(status_path, states_path),
+        )
+    except OSError:
+        return None
+
+
+def lookup(index: dict[str, DpkgPackage], name: str) -> Optional[DpkgPackage]:
+    """Find a package by "name" or "name:arch"."""
+    if name in index:
+        return index[name]
+    base, _, arch = name.partition(":")
+    package = index.get(base)
+    if package and arch in (package.architecture, "any"):
+        return package
+    return None
@@ -3,6 +3,7 @@
 import logging
 from typing import Optional
 
+from . import receipts
 from .base import PackageManager
 
 
@@ -32,7 +33,7 @@ class FlatpakManager(PackageManager):
             return False
 
         # Check if flatpak is installed
-        return self.run_command(["which", "flatpak"])
+        return self._command_available("flatpak")
 
     def is_available(self) -> bool:
         """Check if Flatpak is available on the system.
@@ -41,7 +42,7 @@ class FlatpakManager(PackageManager):
             bool: True if Flatpak is available, False otherwise
         """
         # Check if flatpak is installed
-        if not self.run_command(["which", "flatpak"]):
+        if not self._command_available("flatpak"):
             if self.verbose:
                 logging.warning("Flatpak is not installed")
             return False
@@ -72,10 +73,23 @@ class FlatpakManager(PackageManager):
 
         return self.run_command(self.commands["upgrade"])
 
+    def outdated_packages(self) -> Optional[list[str]]:
+        """Return the applications and runtimes with updates, or None if unknown."""
+        if not self.is_available():
+            return None
+        ok, stdout, _ = self.run_command_with_output(
+            ["flatpak", "remote-ls", "--updates", "--columns=application"]
+        )
+        if not ok:
+            return None
+        return [line.strip() for line in (stdout or "").splitlines() if line.strip()]
+
     def list_packages(self) -> Optional[list[str]]:
         """Return all installed Flatpak application IDs."""
         if not self.is_available():
             return None
+        if (packages := receipts.flatpak_apps()) is not None:
+            return list(packages)
         ok, stdout, _ = self.run_command_with_output(
             ["flatpak", "list", "--app", "--columns=application"]
         )
@@ -91,5 +105,5 @@ class FlatpakManager(PackageManager):
 
     def is_package_installed(self, name: str) -> bool:
         """Check whether a Flatpak application is installed."""
-        packages = self.list_packages()
+        packages = self.inventory()
         return packages is not None and name in packages
@@ -0,0 +1,78 @@
+"""When each package manager last refreshed its package index.
+
+Successful ``update`` runs are recorded in a timestamp store in the cache
+directory, so a manager configured with ``update_ttl`` is not refreshed
+again until that much time has passed. Managers that keep their index on
+disk (apt lists, the brew checkout) also report when it last changed,
+which covers refreshes made outside one-updater.
+"""
+
+import os
+import re
+import threading
+import time
+from typing import Optional, Union
+
+from .cache import load_cache, save_cache
+
+STAMPS_CACHE = "update-stamps.json"
+
+# When this process (one CLI run) started
+RUN_STARTED = time.time()
+
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)\s*([smhd]?)")
+
+_lock = threading.Lock()
+
+
+def parse_duration(value: Union[int, float, str]) -> float:
+    """Parse a TTL given as seconds or as a string like "90s", "30m", "6h", "1d".
+
+    Raises ValueError for anything else.
+    """
+    if isinstance(value, bool):
+        raise ValueError(f"invalid duration: {value!r}")
+    if isinstance(value, (int, float)):
+        seconds = float(value)
+    elif match := _DURATION.fullmatch(str(value).strip().lower()):
+        seconds = float(match[1]) * _UNITS[match[2] or "s"]
+    else:
+        raise ValueError(f"invalid duration: {value!r}")
+    if seconds < 0:
+        raise ValueError(f"duration must not be negative: {value!r}")
+    return seconds
+
+
+def format_age(seconds: float) -> str:
+    """Format an age in seconds as a short string such as "45s", "12m" or "3h"."""
+    for unit in ("d", "h", "m"):
+        if seconds >= _UNITS[unit]:
+            return f"{int(seconds // _UNITS[unit])}{unit}"
+    return f"{int(seconds)}s"
+
+
+def newest_mtime(paths: list[str]) -> Optional[float]:
+    """Return the newest modification time among *paths* that exist."""
+    mtimes = []
+    for path in paths:
+        try:
+            mtimes.append(os.stat(path).st_mtime)
+        except OSError:
+            continue
+    return max(mtimes, default=None)
+
+
+def last_update(name: str) -> Optional[float]:
+    """Return when *name* last updated successfully (epoch seconds), if known."""
+    with _lock:
+        stamp = load_cache(STAMPS_CACHE).get(name)
+    return float(stamp) if isinstance(stamp, (int, float)) else None
+
+
+def record_update(name: str, when: Optional[float] = None) -> None:
+    """Record a successful update of *name* at *when* (default: now)."""
+    with _lock:
+        stamps = load_cache(STAMPS_CACHE)
+        stamps[name] = time.time() if when is None else when
+        save_cache(STAMPS_CACHE, stamps)
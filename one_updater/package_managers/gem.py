@@ -3,6 +3,7 @@
 import logging
 from typing import Optional
 
+from . import receipts
 from .base import PackageManager
 
 
@@ -11,7 +12,7 @@ class GemManager(PackageManager):
 
     def is_available(self) -> bool:
         """Check if gem is available."""
-        return self.run_command(["which", "gem"])
+        return self._command_available("gem")
 
     def update(self) -> bool:
         """Update RubyGems system."""
@@ -32,10 +33,24 @@ class GemManager(PackageManager):
         # Update all installed gems
         return self.run_command(self.commands.get("upgrade", ["gem", "update"]))
 
+    def outdated_packages(self) -> Optional[list[str]]:
+        """Return the gems `gem outdated` reports, or None if unknown."""
+        if not self.is_available():
+            return None
+        ok, stdout, _ = self.run_command_with_output(["gem", "outdated"])
+        if not ok:
+            return None
+        # Lines look like "rake (13.0.6 < 13.2.1)"
+        return [
+            line.split()[0] for line in (stdout or "").splitlines() if " < " in line
+        ]
+
     def list_packages(self) -> Optional[list[str]]:
         """Return all locally installed gem names."""
         if not self.is_available():
             return None
+        if (packages := receipts.gem_packages()) is not None:
+            return list(packages)
         ok, stdout, _ = self.run_command_with_output(
             ["gem", "list", "--local", "--no-versions"]
         )
@@ -43,13 +58,17 @@ class GemManager(PackageManager):
             return []
         return [line.strip() for line in stdout.splitlines() if line.strip()]
 
+    def _install_command(self, names: list[str]) -> list[str]:
+        """Return the gem command installing all *names* at once."""
+        return ["gem", "install", *names]
+
     def install_package(self, name: str) -> bool:
         """Install a gem by name."""
         if not self.is_available():
             return False
-        return self.run_command(["gem", "install", name])
+        return self.run_command(self._install_command([name]))
 
     def is_package_installed(self, name: str) -> bool:
         """Check whether a gem is installed."""
-        packages = self.list_packages()
+        packages = self.inventory()
         return packages is not None and name in packages
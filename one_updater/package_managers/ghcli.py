@@ -2,6 +2,7 @@
 
 from typing import Optional
 
+from . import receipts
 from .base import PackageManager
 
 
@@ -10,7 +11,7 @@ class GhCliManager(PackageManager):
 
     def is_available(self) -> bool:
         """Check if gh is available."""
-        return self.run_command(["which", "gh"])
+        return self._command_available("gh")
 
     def update(self) -> bool:
         """Update GitHub CLI."""
@@ -32,6 +33,8 @@ class GhCliManager(PackageManager):
         """Return all installed gh extension owner/repo identifiers."""
         if not self.is_available():
             return None
+        if (packages := receipts.gh_extensions()) is not None:
+            return list(packages)
         ok, stdout, _ = self.run_command_with_output(["gh", "extension", "list"])
         if not ok or not stdout:
             return []
@@ -50,5 +53,5 @@ class GhCliManager(PackageManager):
 
     def is_package_installed(self, name: str) -> bool:
         """Check whether a gh extension is installed."""
-        packages = self.list_packages()
+        packages = self.inventory()
         return packages is not None and name in packages
@@ -2,10 +2,19 @@
 
 import logging
 import os
+import shutil
 import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
 
+from . import gobuildinfo, goproxy
 from .base import PackageManager
 
+# Variables read from `go env` in a single call
+GO_ENV_VARS = ("GOPATH", "GOPROXY", "GONOPROXY")
+
 
 class GoManager(PackageManager):
     """Manager for Go packages."""
@@ -21,17 +30,163 @@ class GoManager(PackageManager):
     def __init__(self, config: dict):
         """Initialize the Go package manager."""
         super().__init__(config)
+        self._env: Optional[dict[str, str]] = None
+        self._staging = threading.local()
         logging.debug(f"GoManager initialized with config: {config}")
 
     def is_available(self) -> bool:
         """Check if Go is installed."""
-        return self.run_command(["which", "go"])
+        return self._command_available("go")
 
     def update(self) -> bool:
         """Go itself doesn't need updating, that's handled by the system package manager."""
         logging.info("Go itself doesn't need updating. Skipping.")
         return True
 
+    def _go_env(self) -> dict[str, str]:
+        """Return GOPATH and the module proxy settings (queried once).
+
+        Raises subprocess.CalledProcessError if `go env` fails.
+        """
+        if self._env is None:
+            result = subprocess.run(
+                ["go", "env", *GO_ENV_VARS],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            self._env = dict(zip(GO_ENV_VARS, result.stdout.splitlines()))
+        return self._env
+
+    def get_gopath(self) -> str:
+        """Return GOPATH as reported by the Go toolchain."""
+        return self._go_env().get("GOPATH") or os.path.expanduser("~/go")
+
+    def _up_to_date(
+        self, infos: dict[str, Optional[gobuildinfo.BuildInfo]]
+    ) -> dict[str, str]:
+        """Return {binary: version} for binaries already at their module's latest.
+
+        Latest versions come from one concurrent round of GOPROXY queries.
+        Binaries whose latest version cannot be determined are not included.
+        """
+        if not self.config.get("check_latest", True):
+            return {}
+        modules = {info.module for info in infos.values() if info and info.module}
+        if not modules:
+            return {}
+        env = self._go_env()
+        latest = goproxy.latest_versions(
+            modules, env.get("GOPROXY", ""), env.get("GONOPROXY", "")
+        )
+        return {
+            binary: info.version
+            for binary, info in infos.items()
+            if info and info.version and latest.get(info.module) == info.version
+        }
+
+    @staticmethod
+    def _list_binaries(bin_dir: str) -> list[str]:
+        """Return the names of the files installed in a Go bin directory."""
+        return [
+            binary
+            for binary in os.listdir(bin_dir)
+            if not binary.startswith(".")
+            and os.path.isfile(os.path.join(bin_dir, binary))
+        ]
+
+    def _build_infos(
+        self, bin_dir: str, binaries: list[str]
+    ) -> dict[str, Optional[gobuildinfo.BuildInfo]]:
+        """Return the build info of each binary (None if it cannot be read).
+
+        Build info is read in-process; `go version -m` is only run, all at
+        once, for binaries the reader cannot parse (e.g. built before Go 1.18).
+        """
+        paths = {binary: os.path.join(bin_dir, binary) for binary in binaries}
+        infos = gobuildinfo.read_all(paths.values())
+        result_infos = {binary: infos[path] for binary, path in paths.items()}
+        unreadable = [binary for binary, info in result_infos.items() if info is None]
+        if not unreadable:
+            return result_infos
+        if self.verbose:
+            logging.info(f"Getting module info for: {', '.join(unreadable)}")
+        results = self.run_commands_with_output(
+            [["go", "version", "-m", paths[binary]] for binary in unreadable],
+            limit=gobuildinfo.DEFAULT_JOBS,
+        )
+        for binary, (ok, stdout, stderr) in zip(unreadable, results):
+            if not ok:
+                logging.warning(f"Failed to get module info for {binary}: {stderr}")
+                continue
+            if self.verbose:
+                logging.debug(f"Module info output:\n{stdout}")
+            result_infos[binary] = gobuildinfo.parse_modinfo("", stdout or "")
+        return result_infos
+
+    def _go_install(
+        self, targets: list[str]
+    ) -> tuple[bool, Optional[str], Optional[str]]:
+        """Run go install, building into this thread's staging GOBIN if set."""
+        gobin = getattr(self._staging, "gobin", None)
+        env = {**os.environ, "GOBIN": gobin} if gobin else None
+        return self.run_command_with_output(["go", "install", *targets], env=env)
+
+    def _install_staged(
+        self, bin_dir: str, binaries: list[str], install: Callable[[], dict[str, bool]]
+    ) -> dict[str, bool]:
+        """Run one install task with GOBIN pointed at a private staging directory.
+
+        Whatever the task builds is then renamed into *bin_dir*. The staging
+        directory lives inside *bin_dir*, so each rename is atomic and a
+        running process never sees a partially written binary.
+        """
+        try:
+            staging = tempfile.mkdtemp(prefix=".one-updater-", dir=bin_dir)
+        except OSError as e:
+            logging.error(f"Cannot create staging directory in {bin_dir}: {e}")
+            return dict.fromkeys(binaries, False)
+        self._staging.gobin = staging
+        try:
+            results = install()
+            for name in os.listdir(staging):
+                os.replace(os.path.join(staging, name), os.path.join(bin_dir, name))
+        except OSError as e:
+            logging.error(f"Failed to move {', '.join(binaries)} into {bin_dir}: {e}")
+            return dict.fromkeys(binaries, False)
+        finally:
+            self._staging.gobin = None
+            shutil.rmtree(staging, ignore_errors=True)
+        return results
+
+    def _install_module(self, module: str, packages: dict[str, str]) -> dict[str, bool]:
+        """Upgrade every command package of one module with a single go install.
+
+        *packages* maps binary names to their package paths. If the combined
+        install fails, each binary is retried on its own. Returns the result
+        for each binary.
+        """
+        targets = sorted(set(packages.values()))
+        if self.verbose:
+            logging.info(
+                f"Upgrading {', '.join(sorted(packages))} from module {module}"
+            )
+        success, stdout, stderr = self._go_install(
+            [f"{target}@latest" for target in targets]
+        )
+        if success:
+            if stdout and self.verbose:
+                logging.info(f"Install output: {stdout}")
+            return dict.fromkeys(packages, True)
+        if self.verbose:
+            logging.info(
+                f"Combined install of {module} failed, retrying per binary: {stderr}"
+            )
+        return {
+            binary: self._try_install_package(binary, module)
+            for binary in sorted(packages)
+        }
+
     def _try_install_package(
         self, binary: str, package_path: str, is_retry: bool = False
     ) -> bool:
@@ -46,9 +201,7 @@ class GoManager(PackageManager):
             if self.verbose:
                 logging.info(f"Using special case path for {binary}: {package_path}")
 
-        success, stdout, stderr = self.run_command_with_output(
-            ["go", "install", f"{package_path}@latest"]
-        )
+        success, stdout, stderr = self._go_install([f"{package_path}@latest"])
 
         if success:
             if stdout and self.verbose:
@@ -92,9 +245,37 @@ class GoManager(PackageManager):
                         )
                     return self._try_install_package(binary, cmd_path, True)
 
-        logging.error(f"Failed to install {package_path}: {stderr}")
+        logging.error(f"Failed to install {binary} from {package_path}: {stderr}")
         return False
 
+    def _install_special(self, binary: str) -> bool:
+        """Install a binary whose package path is listed in SPECIAL_CASES."""
+        package_path = self.SPECIAL_CASES[binary]
+        if self.verbose:
+            logging.info(f"Using special case path for {binary}: {package_path}")
+        ok, _, stderr = self._go_install([f"{package_path}@latest"])
+        if not ok:
+            logging.error(f"Failed to update {package_path}: {stderr}")
+        return ok
+
+    def _run_install_tasks(
+        self,
+        bin_dir: str,
+        tasks: list[tuple[list[str], Callable[[], dict[str, bool]]]],
+    ) -> dict[str, bool]:
+        """Run install tasks, up to `parallel_installs` at a time."""
+        jobs = self._positive_setting("parallel_installs")
+        if jobs > 1 and len(tasks) > 1:
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                outcomes = list(
+                    executor.map(
+                        lambda task: self._install_staged(bin_dir, *task), tasks
+                    )
+                )
+        else:
+            outcomes = [self._install_staged(bin_dir, *task) for task in tasks]
+        return {binary: ok for outcome in outcomes for binary, ok in outcome.items()}
+
     def upgrade(self) -> bool:
         """Upgrade all globally installed Go packages."""
         if not self.is_available():
@@ -104,14 +285,7 @@ class GoManager(PackageManager):
 
         success = True
         try:
-            # Get GOPATH
-            result = subprocess.run(
-                ["go", "env", "GOPATH"],
-                capture_output=True,
-                text=True,
-                check=True,
-            )
-            gopath = result.stdout.strip() or os.path.expanduser("~/go")
+            gopath = self.get_gopath()
             if self.verbose:
                 logging.info(f"Using GOPATH: {gopath}")
 
@@ -122,12 +296,7 @@ class GoManager(PackageManager):
                     logging.info(f"No Go binaries found in {bin_dir}")
                 return True
 
-            binaries = [
-                binary
-                for binary in os.listdir(bin_dir)
-                if not binary.startswith(".")
-                and os.path.isfile(os.path.join(bin_dir, binary))
-            ]
+            binaries = self._list_binaries(bin_dir)
 
             if not binaries:
                 if self.verbose:
@@ -137,65 +306,65 @@ class GoManager(PackageManager):
             if self.verbose:
                 logging.info(f"Found Go binaries: {', '.join(binaries)}")
 
-            # For each binary, try to find its package and update it
+            infos = self._build_infos(bin_dir, binaries)
+            up_to_date = self._up_to_date(infos)
+            # Binaries built from the same module share one go install
+            modules: dict[str, dict[str, str]] = {}
+            # Each task installs some binaries and reports a result for each
+            tasks: list[tuple[list[str], Callable[[], dict[str, bool]]]] = []
+
             for binary in binaries:
-                try:
+                if binary in up_to_date:
                     if self.verbose:
-                        logging.info(f"Processing binary: {binary}")
-                    # Check for special cases first
-                    if binary in self.SPECIAL_CASES:
-                        package_path = self.SPECIAL_CASES[binary]
-                        if self.verbose:
-                            logging.info(
-                                f"Using special case path for {binary}: {package_path}"
-                            )
-                        success, stdout, stderr = self.run_command_with_output(
-                            ["go", "install", f"{package_path}@latest"]
+                        logging.info(
+                            f"Skipping {binary}: already at latest {up_to_date[binary]}"
                         )
-                        if not success:
-                            logging.error(f"Failed to update {package_path}: {stderr}")
-                            success = False
-                        continue
+                    continue
+                if self.verbose:
+                    logging.info(f"Processing binary: {binary}")
+                # Check for special cases first
+                if binary in self.SPECIAL_CASES:
+                    tasks.append(
+                        ([binary], lambda b=binary: {b: self._install_special(b)})
+                    )
+                    continue
 
-                    # For non-special cases, get module info
-                    binary_path = os.path.join(bin_dir, binary)
+                info = infos[binary]
+                if info and info.module:
                     if self.verbose:
-                        logging.info(f"Getting module info for: {binary}")
-                    result = subprocess.run(
-                        ["go", "version", "-m", binary_path],
-                        capture_output=True,
-                        text=True,
-                        check=True,
+                        logging.info(f"Found module path: {info.module}")
+                    modules.setdefault(info.module, {})[binary] = (
+                        info.path or info.module
                     )
+                else:
                     if self.verbose:
-                        logging.debug(f"Module info output:\n{result.stdout}")
-
-                    if module_path := next(
+                        logging.warning(
+                            f"Could not determine package for binary: {binary}"
+                        )
+                    # Try using binary name as a last resort
+                    tasks.append(
                         (
-                            line.strip().split("\t")[1]
-                            for line in result.stdout.split("\n")
-                            if line.strip().startswith("mod\t")
-                        ),
-                        None,
-                    ):
-                        if self.verbose:
-                            logging.info(f"Found module path: {module_path}")
-                        if not self._try_install_package(binary, module_path):
-                            success = False
-                    else:
-                        if self.verbose:
-                            logging.warning(
-                                f"Could not determine package for binary: {binary}"
-                            )
-                        # Try using binary name as a last resort
-                        if not self._try_install_package(binary, binary):
-                            success = False
-
-                except subprocess.CalledProcessError as e:
-                    logging.warning(
-                        f"Failed to get module info for {binary}: {e.stderr}"
+                            [binary],
+                            lambda b=binary: {b: self._try_install_package(b, b)},
+                        )
+                    )
+
+            for module, packages in modules.items():
+                tasks.append(
+                    (
+                        sorted(packages),
+                        lambda m=module, p=packages: self._install_module(m, p),
                     )
-                    success = False
+                )
+
+            results = self._run_install_tasks(bin_dir, tasks)
+            failed = sorted(binary for binary, ok in results.items() if not ok)
+            logging.info(
+                f"go summary: {len(results) - len(failed)} upgraded, "
+                f"{len(up_to_date)} skipped (up to date), {len(failed)} failed"
+                + (f" ({', '.join(failed)})" if failed else "")
+            )
+            success = not failed
 
         except subprocess.CalledProcessError as e:
             logging.error(f"Error during Go package updates: {e}")
@@ -208,13 +377,7 @@ class GoManager(PackageManager):
         if not self.is_available():
             return None
         try:
-            result = subprocess.run(
-                ["go", "env", "GOPATH"],
-                capture_output=True,
-                text=True,
-                check=True,
-            )
-            gopath = result.stdout.strip() or os.path.expanduser("~/go")
+            gopath = self.get_gopath()
         except subprocess.CalledProcessError:
             return None
 
@@ -222,39 +385,17 @@ class GoManager(PackageManager):
         if not os.path.isdir(bin_dir):
             return []
 
-        binaries = [
-            b
-            for b in os.listdir(bin_dir)
-            if not b.startswith(".") and os.path.isfile(os.path.join(bin_dir, b))
+        binaries = self._list_binaries(bin_dir)
+        infos = self._build_infos(
+            bin_dir, [b for b in binaries if b not in self.SPECIAL_CASES]
+        )
+        return [
+            self.SPECIAL_CASES.get(binary)
+            or ((info := infos[binary]) and info.module)
+            or binary
+            for binary in binaries
         ]
 
-        packages = []
-        for binary in binaries:
-            if binary in self.SPECIAL_CASES:
-                packages.append(self.SPECIAL_CASES[binary])
-                continue
-            try:
-                r = subprocess.run(
-                    ["go", "version", "-m", os.path.join(bin_dir, binary)],
-                    capture_output=True,
-                    text=True,
-                    check=True,
-                )
-                if module_path := next(
-                    (
-                        line.strip().split("\t")[1]
-                        for line in r.stdout.split("\n")
-                        if line.strip().startswith("mod\t")
-                    ),
-                    None,
-                ):
-                    packages.append(module_path)
-                else:
-                    packages.append(binary)
-            except subprocess.CalledProcessError:
-                packages.append(binary)
-        return packages
-
     def install_package(self, name: str) -> bool:
         """Install a Go package by module path using go install."""
         if not self.is_available():
@@ -266,13 +407,7 @@ class GoManager(PackageManager):
         if not self.is_available():
             return False
         try:
-            result = subprocess.run(
-                ["go", "env", "GOPATH"],
-                capture_output=True,
-                text=True,
-                check=True,
-            )
-            gopath = result.stdout.strip() or os.path.expanduser("~/go")
+            gopath = self.get_gopath()
         except subprocess.CalledProcessError:
             return False
         bin_dir = os.path.join(gopath, "bin")
@@ -0,0 +1,208 @@
+"""In-process reader for the build information embedded in Go executables.
+
+Go 1.18+ binaries carry a ``.go.buildinfo`` blob holding the toolchain
+version and the module information that ``go version -m`` prints. Reading
+it directly avoids starting the Go toolchain once per binary. Results are
+persisted to the cache directory, keyed by inode, size and mtime, so
+unchanged binaries are not even reopened on later runs.
+"""
+
+import logging
+import mmap
+import os
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, NamedTuple, Optional
+
+from .cache import load_cache, save_cache
+
+CACHE_NAME = "go-buildinfo.json"
+DEFAULT_JOBS = 8
+
+BUILDINFO_MAGIC = b"\xff Go buildinf:"
+BUILDINFO_ALIGN = 16
+BUILDINFO_HEADER_SIZE = 32
+FLAG_INLINE_STRINGS = 0x2
+
+# modinfo is wrapped in these sentinels by the linker (see runtime/debug)
+MODINFO_START = bytes.fromhex("3077af0c9274080241e1c107e6d618e6")
+MODINFO_END = bytes.fromhex("f932433186182072008242104116d8f2")
+
+ELF_MAGIC = b"\x7fELF"
+
+
+class BuildInfo(NamedTuple):
+    """Build information recovered from a Go executable."""
+
+    path: str  # main package path, e.g. golang.org/x/tools/cmd/goimports
+    module: str  # main module path, e.g. golang.org/x/tools
+    version: str  # main module version, e.g. v0.21.0 or (devel)
+    go_version: str  # toolchain, e.g. go1.22.3
+
+
+def _elf_section(data: mmap.mmap, name: bytes) -> Optional[tuple[int, int]]:
+    """Return (offset, size) of an ELF section by name, or None."""
+    if data[:4] != ELF_MAGIC:
+        return None
+    is_64 = data[4] == 2
+    endian = "<" if data[5] == 1 else ">"
+    try:
+        if is_64:
+            (shoff,) = struct.unpack_from(endian + "Q", data, 0x28)
+            shentsize, shnum, shstrndx = struct.unpack_from(endian + "HHH", data, 0x3A)
+            header = endian + "IIQQQQ"
+        else:
+            (shoff,) = struct.unpack_from(endian + "I", data, 0x20)
+            shentsize, shnum, shstrndx = struct.unpack_from(endian + "HHH", data, 0x2E)
+            header = endian + "IIIIII"
+        if not shoff or shstrndx >= shnum:
+            return None
+        sections = [
+            struct.unpack_from(header, data, shoff + i * shentsize)
+            for i in range(shnum)
+        ]
+        strtab = sections[shstrndx][4]
+        for name_off, _type, _flags, _addr, offset, size in sections:
+            end = data.find(b"\0", strtab + name_off)
+            if data[strtab + name_off : end] == name:
+                return offset, size
+    except (struct.error, IndexError, ValueError):
+        return None
+    return None
+
+
+def _find_header(data: mmap.mmap) -> int:
+    """Return the offset of the buildinfo header, or -1 if there is none."""
+    if section := _elf_section(data, b".go.buildinfo"):
+        offset, _size = section
+        if data[offset : offset + len(BUILDINFO_MAGIC)] == BUILDINFO_MAGIC:
+            return offset
+    # Other formats (and stripped section tables): scan for the aligned magic
+    start = data.find(BUILDINFO_MAGIC)
+    while start != -1 and start % BUILDINFO_ALIGN:
+        start = data.find(BUILDINFO_MAGIC, start + 1)
+    return start
+
+
+def _read_varint_string(data: mmap.mmap, offset: int) -> tuple[bytes, int]:
+    """Read a uvarint length-prefixed string; return it and the next offset."""
+    length = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        length |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            break
+        shift += 7
+        if shift > 63:
+            raise ValueError("varint overflow")
+    end = offset + length
+    if end > len(data):
+        raise ValueError("string runs past end of file")
+    return data[offset:end], end
+
+
+def parse_modinfo(go_version: str, modinfo: str) -> BuildInfo:
+    """Build a BuildInfo from the text form printed by ``go version -m``."""
+    path = module = version = ""
+    for line in modinfo.splitlines():
+        fields = line.strip().split("\t")
+        if fields[0] == "path" and len(fields) > 1:
+            path = fields[1]
+        elif fields[0] == "mod" and len(fields) > 1:
+            module = fields[1]
+            version = fields[2] if len(fields) > 2 else ""
+    return BuildInfo(path, module, version, go_version)
+
+
+def read_buildinfo(binary: str) -> Optional[BuildInfo]:
+    """Read the build information embedded in a Go executable.
+
+    Returns None if *binary* is not a Go executable or was built with a
+    toolchain older than Go 1.18 (which stored the data out of line).
+    """
+    try:
+        with open(binary, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                start = _find_header(data)
+                if start == -1 or len(data) < start + BUILDINFO_HEADER_SIZE:
+                    return None
+                if not data[start + 15] & FLAG_INLINE_STRINGS:
+                    return None
+                offset = start + BUILDINFO_HEADER_SIZE
+                go_version, offset = _read_varint_string(data, offset)
+                modinfo, _ = _read_varint_string(data, offset)
+    except (OSError, ValueError, IndexError) as e:
+        logging.debug(f"Could not read Go build info from {binary}: {e}")
+        return None
+
+    if (
+        len(modinfo) >= 33
+        and modinfo.startswith(MODINFO_START)
+        and modinfo.endswith(MODINFO_END)
+    ):
+        modinfo = modinfo[16:-16]
+    else:
+        modinfo = b""
+    return parse_modinfo(
+        go_version.decode(errors="replace"), modinfo.decode(errors="replace")
+    )
+
+
+def _cache_key(stat: os.stat_result) -> list[int]:
+    """Return the cache key that identifies one build of a binary."""
+    return [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+
+_cache_lock = threading.Lock()
+
+
+def read_all(
+    binaries: Iterable[str], jobs: int = DEFAULT_JOBS
+) -> dict[str, Optional[BuildInfo]]:
+    """Read the build information of many binaries concurrently.
+
+    Binaries whose inode, size and mtime match the persistent cache are not
+    reopened. Returns {binary: BuildInfo or None} in input order.
+    """
+    binaries = list(binaries)
+    with _cache_lock:
+        cached = load_cache(CACHE_NAME)
+    results: dict[str, Optional[BuildInfo]] = {}
+    keys: dict[str, list[int]] = {}
+    pending = []
+    for binary in binaries:
+        try:
+            keys[binary] = _cache_key(os.stat(binary))
+        except OSError:
+            results[binary] = None
+            continue
+        entry = cached.get(binary)
+        if entry and entry.get("key") == keys[binary]:
+            info = entry.get("info")
+            results[binary] = BuildInfo(*info) if info else None
+        else:
+            pending.append(binary)
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(pending)))) as pool:
+            for binary, info in zip(pending, pool.map(read_buildinfo, pending)):
+                results[binary] = info
+        with _cache_lock:
+            cached = load_cache(CACHE_NAME)
+            for binary in pending:
+                info = results[binary]
+                cached[binary] = {
+                    "key": keys[binary],
+                    "info": list(info) if info else None,
+                }
+            # Forget binaries that no longer exist
+            cached = {
+                path: entry for path, entry in cached.items() if os.path.exists(path)
+            }
+            save_cache(CACHE_NAME, cached)
+
+    return {binary: results[binary] for binary in binaries}
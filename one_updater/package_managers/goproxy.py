@@ -0,0 +1,115 @@
+"""Latest-version lookups against the Go module proxy protocol.
+
+Supports any GOPROXY list, including local ``file://`` proxies. Modules
+that must bypass the proxy (GONOPROXY), and proxy lists without a usable
+entry ("direct" or "off"), resolve to None.
+"""
+
+import fnmatch
+import json
+import logging
+import re
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional
+
+from .versions import is_prerelease, semver_key
+
+DEFAULT_JOBS = 8
+DEFAULT_TIMEOUT = 10.0
+
+
+def escape_module_path(module: str) -> str:
+    """Escape a module path for proxy URLs (uppercase letters become !lower)."""
+    return re.sub(r"[A-Z]", lambda m: "!" + m[0].lower(), module)
+
+
+def proxy_urls(goproxy: str) -> list[str]:
+    """Return the proxy base URLs from a GOPROXY value, in order.
+
+    The list stops at "direct" or "off", which are not proxies.
+    """
+    urls = []
+    for url in (u.strip() for u in re.split(r"[,|]", goproxy)):
+        if url in ("direct", "off"):
+            break
+        if url:
+            urls.append(url.rstrip("/"))
+    return urls
+
+
+def bypasses_proxy(module: str, patterns: str) -> bool:
+    """Check whether *module* matches a GONOPROXY/GOPRIVATE pattern list."""
+    for pattern in filter(None, (p.strip() for p in patterns.split(","))):
+        prefix = "/".join(module.split("/")[: pattern.count("/") + 1])
+        if fnmatch.fnmatchcase(prefix, pattern):
+            return True
+    return False
+
+
+def _pick_latest(versions: list[str]) -> Optional[str]:
+    """Choose the version `@latest` resolves to from a @v/list response.
+
+    Releases win over pre-releases, as with the go command.
+    """
+    keyed = [(key, v) for v in versions if (key := semver_key(v)) is not None]
+    releases = [item for item in keyed if not is_prerelease(item[1])]
+    candidates = releases or keyed
+    return max(candidates)[1] if candidates else None
+
+
+def _fetch(url: str, timeout: float) -> Optional[bytes]:
+    """GET a proxy URL, returning None if the proxy does not have it."""
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.read()
+    except (urllib.error.URLError, OSError, ValueError) as e:
+        logging.debug(f"Module proxy request {url} failed: {e}")
+        return None
+
+
+def latest_version(
+    module: str, proxies: list[str], timeout: float = DEFAULT_TIMEOUT
+) -> Optional[str]:
+    """Return the version `module@latest` resolves to, or None if unknown.
+
+    Each proxy is tried in turn. As with the go command, the highest version
+    in @v/list wins and @latest is only consulted for modules without tagged
+    versions (a file:// proxy usually serves only the former).
+    """
+    escaped = escape_module_path(module)
+    for proxy in proxies:
+        if (body := _fetch(f"{proxy}/{escaped}/@v/list", timeout)) is not None:
+            if latest := _pick_latest(body.decode(errors="replace").split()):
+                return latest
+        if (body := _fetch(f"{proxy}/{escaped}/@latest", timeout)) is not None:
+            try:
+                return json.loads(body)["Version"]
+            except (ValueError, KeyError, TypeError):
+                continue
+    return None
+
+
+def latest_versions(
+    modules: Iterable[str],
+    goproxy: str,
+    noproxy: str = "",
+    jobs: int = DEFAULT_JOBS,
+) -> dict[str, Optional[str]]:
+    """Look up the latest version of many modules concurrently.
+
+    Returns {module: version or None}; None means the latest version could
+    not be determined and the module should be treated as out of date.
+    """
+    modules = sorted(set(modules))
+    proxies = proxy_urls(goproxy)
+    results: dict[str, Optional[str]] = dict.fromkeys(modules)
+    lookups = [m for m in modules if proxies and not bypasses_proxy(m, noproxy)]
+    if lookups:
+        with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(lookups)))) as pool:
+            for module, version in zip(
+                lookups, pool.map(lambda m: latest_version(m, proxies), lookups)
+            ):
+                results[module] = version
+    return results
@@ -0,0 +1,78 @@
+"""Per-command inventory of installed packages across package managers."""
+
+import contextlib
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, NamedTuple, Optional
+
+from .registry import PackageManagerRegistry
+
+
+class ManagerInventory(NamedTuple):
+    """Installed packages collected from one package manager."""
+
+    packages: Optional[list[str]]  # None if unavailable or listing unsupported
+    available: bool
+    error: str  # set when the manager could not be created
+    seconds: float
+
+
+def collect_packages(name: str) -> ManagerInventory:
+    """Enumerate the installed packages of one manager."""
+    started = time.monotonic()
+    try:
+        pm = PackageManagerRegistry.get_manager(name, {"enabled": True})
+    except ValueError as e:
+        return ManagerInventory(None, False, str(e), time.monotonic() - started)
+    if not pm.is_available():
+        return ManagerInventory(None, False, "", time.monotonic() - started)
+    packages = pm.list_packages()
+    return ManagerInventory(packages, True, "", time.monotonic() - started)
+
+
+class InventorySession:
+    """Collects each package manager's inventory at most once per command.
+
+    Enumeration runs on a bounded thread pool. Managers are collected the
+    first time they are requested; later requests reuse the same result.
+    """
+
+    def __init__(self, jobs: int):
+        """Initialize the session with a pool of *jobs* workers."""
+        self._executor = ThreadPoolExecutor(max_workers=jobs)
+        self._futures: dict[str, Future[ManagerInventory]] = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "InventorySession":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Wait for outstanding enumerations and release the worker pool."""
+        self._executor.shutdown(wait=True)
+
+    def submit(self, names: Iterable[str]) -> dict[str, Future[ManagerInventory]]:
+        """Start collecting *names* in the background, skipping known managers."""
+        with self._lock:
+            for name in names:
+                if name not in self._futures:
+                    self._futures[name] = self._executor.submit(collect_packages, name)
+            return {name: self._futures[name] for name in names}
+
+    def collect(self, names: Iterable[str]) -> dict[str, ManagerInventory]:
+        """Return the inventories of *names*, waiting for them if needed."""
+        return {name: future.result() for name, future in self.submit(names).items()}
+
+    def managed_names(self, names: Iterable[str]) -> set[str]:
+        """Return every package name installed by any of *names*.
+
+        Managers that fail to enumerate are ignored.
+        """
+        managed: set[str] = set()
+        for future in self.submit(names).values():
+            with contextlib.suppress(Exception):
+                managed.update(future.result().packages or [])
+        return managed
@@ -2,6 +2,7 @@
 
 from typing import Optional
 
+from . import receipts
 from .base import PackageManager
 
 
@@ -10,7 +11,7 @@ class KubectlKrewManager(PackageManager):
 
     def is_available(self) -> bool:
         """Check if kubectl-krew is available."""
-        return self.run_command(["which", "kubectl-krew"])
+        return self._command_available("kubectl-krew")
 
     def update(self) -> bool:
         """Update kubectl-krew package lists."""
@@ -32,6 +33,8 @@ class KubectlKrewManager(PackageManager):
         """Return all installed krew plugin names."""
         if not self.is_available():
             return None
+        if (packages := receipts.krew_plugins()) is not None:
+            return list(packages)
         ok, stdout, _ = self.run_command_with_output(["kubectl", "krew", "list"])
         if not ok or not stdout:
             return []
@@ -45,5 +48,5 @@ class KubectlKrewManager(PackageManager):
 
     def is_package_installed(self, name: str) -> bool:
         """Check whether a krew plugin is installed."""
-        packages = self.list_packages()
+        packages = self.inventory()
         return packages is not None and name in packages
@@ -2,6 +2,7 @@
 
 from typing import Optional
 
+from . import receipts
 from .base import PackageManager
 
 
@@ -10,7 +11,7 @@ class MicroEditorManager(PackageManager):
 
     def is_available(self) -> bool:
         """Check if micro is available."""
-        return self.run_command(["which", "micro"])
+        return self._command_available("micro")
 
     def update(self) -> bool:
         """Update micro-editor package lists."""
@@ -33,6 +34,8 @@ class MicroEditorManager(PackageManager):
         """Return all non-built-in installed micro plugins."""
         if not self.is_available():
             return None
+        if (packages := receipts.micro_plugins()) is not None:
+            return list(packages)
         ok, stdout, _ = self.run_command_with_output(["micro", "-plugin", "list"])
         if not ok or not stdout:
             return []
@@ -54,5 +57,5 @@ class MicroEditorManager(PackageManager):
 
     def is_package_installed(self, name: str) -> bool:
         """Check whether a micro plugin is installed."""
-        packages = self.list_packages()
+        packages = self.inventory()
         return packages is not None and name in packages
@@ -3,6 +3,7 @@
 import json
 from typing import Optional
 
+from . import receipts
 from .base import PackageManager
 
 
@@ -11,7 +12,7 @@ class NpmManager(PackageManager):
 
     def is_available(self) -> bool:
         """Check if npm is available."""
-        return self.run_command(["which", "npm"])
+        return self._command_available("npm")
 
     def update(self) -> bool:
         """Update npm package lists."""
@@ -26,10 +27,26 @@ class NpmManager(PackageManager):
         # npm update -g handles both update and upgrade
         return self.run_command(self.commands.get("upgrade", ["npm", "update", "-g"]))
 
+    def outdated_packages(self) -> Optional[list[str]]:
+        """Return the outdated global packages, or None if unknown."""
+        if not self.is_available():
+            return None
+        # npm outdated exits 1 when anything is outdated, so go by the JSON
+        _, stdout, _ = self.run_command_with_output(["npm", "outdated", "-g", "--json"])
+        try:
+            outdated = json.loads(stdout or "")
+        except ValueError:
+            return None
+        if not isinstance(outdated, dict) or "error" in outdated:
+            return None
+        return list(outdated)
+
     def list_packages(self) -> Optional[list[str]]:
         """Return all globally installed npm package names."""
         if not self.is_available():
             return None
+        if (packages := receipts.npm_packages()) is not None:
+            return [name for name in packages if name != "npm"]
         ok, stdout, _ = self.run_command_with_output(
             ["npm", "list", "-g", "--depth=0", "--json"]
         )
@@ -42,13 +59,17 @@ class NpmManager(PackageManager):
         except (json.JSONDecodeError, AttributeError):
             return []
 
+    def _install_command(self, names: list[str]) -> list[str]:
+        """Return the npm command installing all *names* at once."""
+        return ["npm", "install", "-g", *names]
+
     def install_package(self, name: str) -> bool:
         """Install a global npm package by name."""
         if not self.is_available():
             return False
-        return self.run_command(["npm", "install", "-g", name])
+        return self.run_command(self._install_command([name]))
 
     def is_package_installed(self, name: str) -> bool:
         """Check whether a global npm package is installed."""
-        packages = self.list_packages()
+        packages = self.inventory()
         return packages is not None and name in packages
@@ -3,6 +3,7 @@
 import logging
 from typing import Optional
 
+from . import pacmandb
 from .base import PackageManager
 
 
@@ -32,7 +33,7 @@ class PacmanManager(PackageManager):
             return False
 
         # Check if pacman is installed
-        return self.run_command(["which", "pacman"])
+        return self._command_available("pacman")
 
     def is_available(self) -> bool:
         """Check if Pacman is available on the system.
@@ -41,7 +42,7 @@ class PacmanManager(PackageManager):
             bool: True if Pacman is available, False otherwise
         """
         # Check if pacman is installed
-        if not self.run_command(["which", "pacman"]):
+        if not self._command_available("pacman"):
             if self.verbose:
                 logging.warning("Pacman is not installed")
             return False
@@ -77,18 +78,26 @@ class PacmanManager(PackageManager):
         """Return all explicitly installed Pacman package names."""
         if not self.is_available():
             return None
+        if (index := pacmandb.installed_packages()) is not None:
+            return sorted(name for name, package in index.items() if package.explicit)
         ok, stdout, _ = self.run_command_with_output(["pacman", "-Qqe"])
         if not ok or not stdout:
             return []
         return [line.strip() for line in stdout.splitlines() if line.strip()]
 
+    def _install_command(self, names: list[str]) -> list[str]:
+        """Return the Pacman command installing all *names* at once."""
+        return ["sudo", "pacman", "-S", "--noconfirm", *names]
+
     def install_package(self, name: str) -> bool:
         """Install a Pacman package by name."""
         if not self.is_available():
             return False
-        return self.run_command(["sudo", "pacman", "-S", "--noconfirm", name])
+        return self.run_command(self._install_command([name]))
 
     def is_package_installed(self, name: str) -> bool:
         """Check whether a Pacman package is installed."""
+        if (index := pacmandb.installed_packages()) is not None:
+            return name in index
         ok, _, _ = self.run_command_with_output(["pacman", "-Q", name])
         return ok
@@ -0,0 +1,74 @@
+"""Reader for the pacman local package database.
+
+Each installed package has a ``desc`` file under ``/var/lib/pacman/local``.
+Reading those directly replaces one ``pacman -Q`` process per lookup. The
+index is rebuilt only when the database directory changes.
+"""
+
+import os
+from typing import NamedTuple, Optional
+
+from .cache import memoize_on_stamp
+
+PACMAN_LOCAL_DB = "/var/lib/pacman/local"
+
+# %REASON% value for packages installed as a dependency
+REASON_DEPEND = "1"
+
+
+class PacmanPackage(NamedTuple):
+    """An installed package from the pacman local database."""
+
+    name: str
+    version: str
+    explicit: bool  # False if installed as a dependency
+
+
+def parse_desc(text: str) -> dict[str, list[str]]:
+    """Parse a desc file into {"NAME": [...], "VERSION": [...], ...}."""
+    sections: dict[str, list[str]] = {}
+    current: Optional[list[str]] = None
+    for line in text.splitlines():
+        if line.startswith("%") and line.endswith("%") and len(line) > 2:
+            current = sections.setdefault(line[1:-1], [])
+        elif line and current is not None:
+            current.append(line)
+        else:
+            current = None
+    return sections
+
+
+def read_index(local_db: str) -> dict[str, PacmanPackage]:
+    """Index the packages in a pacman local database directory by name.
+
+    Raises OSError if the directory cannot be listed.
+    """
+    index = {}
+    for entry in os.scandir(local_db):
+        try:
+            with open(os.path.join(entry.path, "desc"), "r", encoding="utf-8") as f:
+                sections = parse_desc(f.read())
+        except OSError:
+            continue  # e.g. the ALPM_DB_VERSION file
+        if not (name := sections.get("NAME")):
+            continue
+        index[name[0]] = PacmanPackage(
+            name[0],
+            (sections.get("VERSION") or [""])[0],
+            (sections.get("REASON") or ["0"])[0] != REASON_DEPEND,
+        )
+    return index
+
+
+def installed_packages(
+    local_db: str = PACMAN_LOCAL_DB,
+) -> Optional[dict[str, PacmanPackage]]:
+    """Return the installed package index, rebuilding it if the database changed.
+
+    Returns None if the local database cannot be read.
+    """
+    try:
+        # Installs and removals add or delete entries, changing the directory mtime
+        return memoize_on_stamp("pacmandb", [local_db], lambda: read_index(local_db))
+    except OSError:
+        return None
@@ -3,11 +3,110 @@
 import json
 import logging
 import os
+import re
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 from pathlib import Path
 from typing import Optional
 
-from .base import PackageManager
+from . import availability
+from .base import PackageManager, bisect_batch
+from .cache import file_stamp, load_cache, save_cache
+from .receipts import normalize_name, read_distributions
+
+SYS_PATH_CACHE = "pip-sys-path.json"
+# Prints what `pip list` reads: sys.path (without the -c script's "") and
+# the user site, which site.py leaves off sys.path while it does not exist
+_SYS_PATH_QUERY = (
+    "import json, site, sys; print(json.dumps({'path': sys.path[1:], "
+    "'user_site': site.getusersitepackages() if site.ENABLE_USER_SITE else None}))"
+)
+
+_sys_path_lock = threading.Lock()
+
+
+def _is_python(path: str) -> bool:
+    """Check whether *path* names a Python interpreter (python, python3.12, ...)."""
+    return os.path.basename(path).startswith("python")
+
+
+def _script_interpreter(script: str) -> Optional[str]:
+    """Return the Python interpreter a console script (e.g. pip) runs with.
+
+    Returns None for scripts that do not run Python directly, such as the
+    shell-script shims of pyenv or asdf.
+    """
+    try:
+        with open(script, "rb") as f:
+            head = f.read(1024).decode(errors="replace").splitlines()
+    except OSError:
+        return None
+    if not head or not head[0].startswith("#!"):
+        return None
+    parts = head[0][2:].split()
+    if parts and os.path.basename(parts[0]) == "env" and len(parts) > 1:
+        return availability.which(parts[1]) if _is_python(parts[1]) else None
+    if parts and _is_python(parts[0]):
+        return parts[0]
+    # Long interpreter paths use a /bin/sh trampoline: '''exec' "<python>" "$0" ...
+    if len(head) > 1 and (match := re.match(r"'''exec' \"?([^\"\s]+)", head[1])):
+        return match[1] if _is_python(match[1]) else None
+    return None
+
+
+def interpreter_sys_path(interpreter: str) -> Optional[list[str]]:
+    """Return the import path of *interpreter*, asking it only once.
+
+    The answer is kept in the cache directory until the interpreter binary
+    or PYTHONPATH changes. Returns None if the interpreter cannot be run.
+    """
+    stamp = [file_stamp(os.path.realpath(interpreter)), os.environ.get("PYTHONPATH")]
+    with _sys_path_lock:
+        entry = load_cache(SYS_PATH_CACHE).get(interpreter)
+    if not entry or entry.get("key") != stamp:
+        try:
+            result = subprocess.run(
+                [interpreter, "-c", _SYS_PATH_QUERY],
+                capture_output=True,
+                text=True,
+                timeout=30,
+            )
+            entry = {"key": stamp, **json.loads(result.stdout)}
+        except (OSError, subprocess.SubprocessError, ValueError) as e:
+            logging.debug(f"Could not read sys.path of {interpreter}: {e}")
+            return None
+        with _sys_path_lock:
+            cached = load_cache(SYS_PATH_CACHE)
+            cached[interpreter] = entry
+            save_cache(SYS_PATH_CACHE, cached)
+
+    path = list(entry.get("path") or [])
+    if (user_site := entry.get("user_site")) and user_site not in path:
+        # site.py puts the user site in front of the global site-packages
+        position = next(
+            (
+                i
+                for i, d in enumerate(path)
+                if d.endswith(("site-packages", "dist-packages"))
+            ),
+            len(path),
+        )
+        path.insert(position, user_site)
+    return path
+
+
+def site_packages_dirs(pip_path: str) -> Optional[list[str]]:
+    """Return the directories ``pip list`` reads for the given pip script.
+
+    Returns None if the interpreter behind *pip_path* cannot be determined
+    or none of its import path exists.
+    """
+    interpreter = _script_interpreter(pip_path)
+    if not interpreter or (path := interpreter_sys_path(interpreter)) is None:
+        return None
+    return [d for d in path if os.path.isdir(d)] or None
 
 
 class PipManager(PackageManager):
@@ -22,6 +121,10 @@ class PipManager(PackageManager):
                 "Both virtualenv and pyenv_versions specified. Please specify only one. Skipping pip."
             )
             self.enabled = False
+        self._upgrade_results: dict[str, dict[str, bool]] = {}
+        self._log_buffer = threading.local()
+        self._environments: dict[str, Optional[dict[str, tuple[str, str]]]] = {}
+        self._available: Optional[bool] = None
 
     def _get_virtualenvs(self, config: dict) -> list[str]:
         """Get list of virtualenvs from config."""
@@ -45,11 +148,18 @@ class PipManager(PackageManager):
         """Check if pip is available in any specified environment."""
         if not self.enabled:
             return False
-        if self.virtualenvs:
-            return any(self._check_virtualenv(venv) for venv in self.virtualenvs)
-        elif self.pyenv_versions:
-            return any(self._check_pyenv(version) for version in self.pyenv_versions)
-        return self.run_command(["pip", "--version"])
+        if self._available is None:
+            if self.virtualenvs:
+                self._available = any(
+                    self._check_virtualenv(venv) for venv in self.virtualenvs
+                )
+            elif self.pyenv_versions:
+                self._available = any(
+                    self._check_pyenv(version) for version in self.pyenv_versions
+                )
+            else:
+                self._available = self._command_available("pip")
+        return self._available
 
     def _check_virtualenv(self, virtualenv: str) -> bool:
         """Check if virtualenv is available and valid."""
@@ -61,34 +171,37 @@ class PipManager(PackageManager):
             logging.info(f"Using virtualenv pip: {pip_path}")
         return True
 
-    def _check_pyenv(self, version: str) -> bool:
-        # sourcery skip: class-extract-method, extract-method
-        """Check if pyenv is available and the specified version exists."""
+    @cached_property
+    def _pyenv_root(self) -> Optional[str]:
+        """Return `pyenv root`, asking pyenv only once per instance."""
+        if not self._command_available("pyenv"):
+            logging.error("pyenv is not installed")
+            return None
         try:
-            # Check if pyenv is installed and get root
             result = subprocess.run(
                 ["pyenv", "root"], capture_output=True, text=True, check=True
             )
-            pyenv_root = result.stdout.strip()
-            if not pyenv_root:
-                logging.error("Could not determine pyenv root")
-                return False
-
-            # Check if version exists
-            version_path = os.path.join(pyenv_root, "versions", version)
-            if not os.path.exists(version_path):
-                logging.error(f"pyenv version {version} not found at {version_path}")
-                return False
-
-            if self.verbose:
-                logging.info(f"Found pyenv version at: {version_path}")
-            return True
-
         except subprocess.CalledProcessError as e:
-            logging.error(f"Error checking pyenv: {e}")
+            logging.error(f"Error getting pyenv root: {e}")
             if self.verbose and e.stderr:
                 logging.error(f"Error output: {e.stderr}")
+            return None
+        if not (pyenv_root := result.stdout.strip()):
+            logging.error("Could not determine pyenv root")
+            return None
+        return pyenv_root
+
+    def _check_pyenv(self, version: str) -> bool:
+        """Check if pyenv is available and the specified version exists."""
+        if (pyenv_root := self._pyenv_root) is None:
+            return False
+        version_path = os.path.join(pyenv_root, "versions", version)
+        if not os.path.exists(version_path):
+            logging.error(f"pyenv version {version} not found at {version_path}")
             return False
+        if self.verbose:
+            logging.info(f"Found pyenv version at: {version_path}")
+        return True
 
     def _get_pip_commands(self) -> list[list[str]]:
         # sourcery skip: extract-method
@@ -109,42 +222,26 @@ class PipManager(PackageManager):
             return commands
 
         elif self.pyenv_versions:
-            try:
-                # Get pyenv root
-                if self.verbose:
-                    logging.info("Getting pyenv root directory...")
-                result = subprocess.run(
-                    ["pyenv", "root"], capture_output=True, text=True, check=True
-                )
-                pyenv_root = result.stdout.strip()
-                if self.verbose:
-                    logging.info(f"Found pyenv root at: {pyenv_root}")
-
-                # Get pip path for each version
-                commands = []
-                for version in self.pyenv_versions:
-                    if not self._check_pyenv(version):
-                        logging.warning(f"Skipping invalid pyenv version: {version}")
-                        continue
+            if (pyenv_root := self._pyenv_root) is None:
+                return []
+            if self.verbose:
+                logging.info(f"Found pyenv root at: {pyenv_root}")
 
-                    pip_path = os.path.join(
-                        pyenv_root, "versions", version, "bin", "pip"
-                    )
-                    if self.verbose:
-                        logging.info(
-                            f"Using pip from pyenv version {version}: {pip_path}"
-                        )
-                    commands.append([pip_path])
+            # Get pip path for each version
+            commands = []
+            for version in self.pyenv_versions:
+                if not self._check_pyenv(version):
+                    logging.warning(f"Skipping invalid pyenv version: {version}")
+                    continue
 
-                if not commands:
-                    logging.warning("No valid pyenv versions found")
-                return commands
+                pip_path = os.path.join(pyenv_root, "versions", version, "bin", "pip")
+                if self.verbose:
+                    logging.info(f"Using pip from pyenv version {version}: {pip_path}")
+                commands.append([pip_path])
 
-            except subprocess.CalledProcessError as e:
-                logging.error(f"Error getting pyenv root: {e}")
-                if self.verbose and e.stderr:
-                    logging.error(f"Error output: {e.stderr}")
-                return []
+            if not commands:
+                logging.warning("No valid pyenv versions found")
+            return commands
 
         if self.verbose:
             logging.info("Using system pip")
@@ -178,13 +275,67 @@ class PipManager(PackageManager):
             logging.warning("No valid pip environments found to upgrade")
             return False
 
-        success = True
-        for pip_cmd in pip_commands:
-            if not self._upgrade_environment(pip_cmd):
-                success = False
+        self._upgrade_results = {}
+        jobs = self._positive_setting("parallel_environments")
+        if jobs > 1 and len(pip_commands) > 1:
+            success = self._upgrade_environments_parallel(pip_commands, jobs)
+        else:
+            success = True
+            for pip_cmd in pip_commands:
+                if not self._upgrade_environment(pip_cmd):
+                    success = False
+
+        self._log_upgrade_summary(pip_commands)
+        return success
 
+    def _upgrade_environments_parallel(
+        self, pip_commands: list[list[str]], jobs: int
+    ) -> bool:
+        """Upgrade environments on a worker pool, then log each one's output."""
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            outcomes = list(
+                executor.map(self._upgrade_environment_buffered, pip_commands)
+            )
+
+        success = True
+        for pip_cmd, (ok, records) in zip(pip_commands, outcomes):
+            logging.info(f"pip environment {pip_cmd[0]}:")
+            for level, message in records:
+                logging.log(level, f"  {message}")
+            success &= ok
         return success
 
+    def _upgrade_environment_buffered(
+        self, pip_cmd: list[str]
+    ) -> tuple[bool, list[tuple[int, str]]]:
+        """Upgrade one environment, collecting its log output instead of emitting it."""
+        records: list[tuple[int, str]] = []
+        self._log_buffer.records = records
+        try:
+            return self._upgrade_environment(pip_cmd), records
+        finally:
+            self._log_buffer.records = None
+
+    def _log(self, level: int, message: str) -> None:
+        """Log a message, or buffer it while upgrading environments in parallel."""
+        records = getattr(self._log_buffer, "records", None)
+        if records is not None:
+            records.append((level, message))
+        else:
+            logging.log(level, message)
+
+    def _log_upgrade_summary(self, pip_commands: list[list[str]]) -> None:
+        """Log one summary line covering every environment."""
+        outcomes = [
+            ok for results in self._upgrade_results.values() for ok in results.values()
+        ]
+        upgraded = sum(outcomes)
+        failed = len(outcomes) - upgraded
+        logging.info(
+            f"pip summary: {upgraded} upgraded, {failed} failed "
+            f"across {len(pip_commands)} environment(s)"
+        )
+
     def _upgrade_environment(self, pip_cmd: list[str]) -> bool:
         """Upgrade packages in a specific pip environment."""
         if not pip_cmd:
@@ -192,8 +343,9 @@ class PipManager(PackageManager):
 
         try:
             if self.verbose:
-                logging.info(
-                    f"Checking for outdated packages using: {' '.join(pip_cmd)}"
+                self._log(
+                    logging.INFO,
+                    f"Checking for outdated packages using: {' '.join(pip_cmd)}",
                 )
             # Get list of outdated packages using JSON format
             result = subprocess.run(
@@ -206,85 +358,175 @@ class PipManager(PackageManager):
             try:
                 packages = json.loads(result.stdout)
                 if self.verbose:
-                    logging.info(f"Raw outdated packages output: {result.stdout}")
+                    self._log(
+                        logging.INFO, f"Raw outdated packages output: {result.stdout}"
+                    )
                 if not packages:
                     if self.verbose:
-                        logging.info("No outdated packages found in JSON response")
+                        self._log(
+                            logging.INFO, "No outdated packages found in JSON response"
+                        )
                     return True
 
                 if self.verbose:
                     package_names = [pkg["name"] for pkg in packages]
-                    logging.info(
-                        f"Found {len(packages)} outdated packages: {', '.join(package_names)}"
+                    self._log(
+                        logging.INFO,
+                        f"Found {len(packages)} outdated packages: {', '.join(package_names)}",
+                    )
+
+                # Get base upgrade command or use default pip install --upgrade
+                upgrade_cmd = self.commands.get("upgrade", []) or pip_cmd + [
+                    "install",
+                    "--upgrade",
+                ]
+                names = [package["name"] for package in packages]
+                if self.config.get("batch_upgrade", True):
+                    # One resolver run for everything, bisecting on failure
+                    results = bisect_batch(
+                        names, lambda batch: self._run_upgrade(upgrade_cmd, batch)
                     )
+                else:
+                    results = {
+                        name: self._run_upgrade(upgrade_cmd, [name]) for name in names
+                    }
 
-                # Upgrade each package
                 for package in packages:
                     package_name = package["name"]
-                    if self.verbose:
-                        current_version = package.get("version", "unknown")
-                        latest_version = package.get("latest_version", "unknown")
-                        logging.info(
-                            f"Upgrading {package_name} from {current_version} to {latest_version}..."
+                    current_version = package.get("version", "unknown")
+                    latest_version = package.get("latest_version", "unknown")
+                    if results[package_name]:
+                        self._log(
+                            logging.INFO,
+                            f"Upgraded {package_name} from {current_version} to {latest_version}",
                         )
-
-                    # Get base upgrade command or use default pip install --upgrade
-                    upgrade_cmd = self.commands.get("upgrade", []) or pip_cmd + [
-                        "install",
-                        "--upgrade",
-                    ]
-
-                    # Add package name to the command
-                    package_cmd = upgrade_cmd + [package_name]
-                    if self.verbose:
-                        logging.info(
-                            f"Running upgrade command: {' '.join(package_cmd)}"
-                        )
-
-                    result = subprocess.run(
-                        package_cmd,
-                        capture_output=True,
-                        text=True,
-                        check=True,
-                    )
-                    if result.returncode != 0:
-                        logging.error(
-                            f"Failed to upgrade {package_name}: {result.stderr}"
+                    else:
+                        self._log(
+                            logging.ERROR,
+                            f"Failed to upgrade {package_name} from {current_version} to {latest_version}",
                         )
-                        return False
-                    elif self.verbose:
-                        logging.info(f"Upgrade output: {result.stdout}")
 
-                return True
+                self._upgrade_results[pip_cmd[0]] = results
+                return all(results.values())
 
             except json.JSONDecodeError as e:
-                logging.error(f"Failed to parse pip output as JSON: {e}")
+                self._log(logging.ERROR, f"Failed to parse pip output as JSON: {e}")
                 if self.verbose:
-                    logging.error(f"Raw output was: {result.stdout}")
+                    self._log(logging.ERROR, f"Raw output was: {result.stdout}")
                 return False
 
         except subprocess.CalledProcessError as e:
-            logging.error(f"Failed to check for outdated packages: {e}")
+            self._log(logging.ERROR, f"Failed to check for outdated packages: {e}")
             if self.verbose and e.stderr:
-                logging.error(f"Error output: {e.stderr}")
+                self._log(logging.ERROR, f"Error output: {e.stderr}")
             return False
 
-    def list_packages(self) -> Optional[list[str]]:
-        """Return all pip-installed packages using the system pip."""
-        ok, stdout, _ = self.run_command_with_output(["pip", "list", "--format=json"])
+    def _run_upgrade(self, upgrade_cmd: list[str], names: list[str]) -> bool:
+        """Run the upgrade command for *names* in a single pip invocation."""
+        package_cmd = upgrade_cmd + names
+        if self.verbose:
+            self._log(logging.INFO, f"Running upgrade command: {' '.join(package_cmd)}")
+        result = subprocess.run(
+            package_cmd,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        if result.returncode != 0:
+            if self.verbose:
+                self._log(
+                    logging.WARNING,
+                    f"Upgrade of {', '.join(names)} failed: {result.stderr}",
+                )
+            return False
+        if self.verbose:
+            self._log(logging.INFO, f"Upgrade output: {result.stdout}")
+        return True
+
+    @cached_property
+    def _pips(self) -> list[str]:
+        """Return the pip of each configured environment ("pip" for the system pip)."""
+        return [command[0] for command in self._get_pip_commands()]
+
+    def environment_packages(
+        self, pip_path: str = "pip"
+    ) -> Optional[dict[str, tuple[str, str]]]:
+        """Return the packages installed for a pip, read from their metadata.
+
+        *pip_path* is "pip" for the system pip or the full path of a
+        virtualenv or pyenv pip. The index maps PEP 503 normalized names to
+        (name, version) and is built once per environment. Returns None if
+        the environment's site-packages cannot be located.
+        """
+        if pip_path not in self._environments:
+            script = availability.which(pip_path) if pip_path == "pip" else pip_path
+            dirs = site_packages_dirs(script) if script else None
+            self._environments[pip_path] = (
+                read_distributions(dirs) if dirs is not None else None
+            )
+        return self._environments[pip_path]
+
+    def _pip_list(self, pip_path: str) -> list[str]:
+        """Return the packages `pip list` reports for one environment."""
+        ok, stdout, _ = self.run_command_with_output(
+            [pip_path, "list", "--format=json"]
+        )
         if not ok or not stdout:
             return []
         try:
-            packages = json.loads(stdout)
-            return [pkg["name"] for pkg in packages]
-        except (json.JSONDecodeError, KeyError):
+            return [pkg["name"] for pkg in json.loads(stdout)]
+        except (json.JSONDecodeError, KeyError, TypeError):
             return []
 
+    def list_packages(self) -> Optional[list[str]]:
+        """Return the packages installed in the configured environments.
+
+        Those are the virtualenvs or pyenv versions from the config, or the
+        system pip. Names found in several environments are listed once.
+        """
+        packages: dict[str, str] = {}
+        for pip_path in self._pips:
+            if (index := self.environment_packages(pip_path)) is not None:
+                names = [name for name, _ in index.values()]
+            else:
+                names = self._pip_list(pip_path)
+            for name in names:
+                packages.setdefault(normalize_name(name), name)
+        return list(packages.values())
+
+    def _installed_in(self, pip_path: str, name: str) -> bool:
+        """Check whether *name* is installed in one environment."""
+        if (index := self.environment_packages(pip_path)) is not None:
+            return normalize_name(name) in index
+        ok, _, _ = self.run_command_with_output([pip_path, "show", name])
+        return ok
+
+    def _install_command(self, names: list[str]) -> Optional[list[str]]:
+        """Return the pip command installing all *names* at once.
+
+        With several environments each needs its own command, so packages
+        are installed one by one instead.
+        """
+        if len(self._pips) != 1:
+            return None
+        return [self._pips[0], "install", *names]
+
     def install_package(self, name: str) -> bool:
-        """Install a pip package by name."""
-        return self.run_command(["pip", "install", name])
+        """Install a pip package in every configured environment lacking it."""
+        missing = [pip for pip in self._pips if not self._installed_in(pip, name)]
+        return bool(self._pips) and all(
+            self.run_command([pip_path, "install", name]) for pip_path in missing
+        )
+
+    def mark_installed(self, name: str) -> None:
+        """Record a successful install in each environment's metadata index."""
+        super().mark_installed(name)
+        for pip_path in self._pips:
+            if index := self._environments.get(pip_path):
+                index.setdefault(normalize_name(name), (name, ""))
 
     def is_package_installed(self, name: str) -> bool:
-        """Check whether a pip package is installed."""
-        ok, _, _ = self.run_command_with_output(["pip", "show", name])
-        return ok
+        """Check whether a pip package is installed in every configured environment."""
+        return bool(self._pips) and all(
+            self._installed_in(pip_path, name) for pip_path in self._pips
+        )
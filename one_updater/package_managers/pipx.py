@@ -2,6 +2,7 @@
 
 from typing import Optional
 
+from . import receipts
 from .base import PackageManager
 
 
@@ -10,7 +11,7 @@ class PipxManager(PackageManager):
 
     def is_available(self) -> bool:
         """Check if pipx is available."""
-        return self.run_command(["which", "pipx"])
+        return self._command_available("pipx")
 
     def update(self) -> bool:
         """Update pipx package lists."""
@@ -28,6 +29,8 @@ class PipxManager(PackageManager):
         """Return all pipx-installed package names."""
         if not self.is_available():
             return None
+        if (packages := receipts.pipx_packages()) is not None:
+            return list(packages)
         ok, stdout, _ = self.run_command_with_output(["pipx", "list", "--short"])
         if not ok or not stdout:
             return []
@@ -41,5 +44,5 @@ class PipxManager(PackageManager):
 
     def is_package_installed(self, name: str) -> bool:
         """Check whether a pipx package is installed."""
-        packages = self.list_packages()
+        packages = self.inventory()
         return packages is not None and name in packages
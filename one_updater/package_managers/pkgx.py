@@ -8,7 +8,7 @@ class PkgxManager(PackageManager):
 
     def is_available(self) -> bool:
         """Check if pkgx is available."""
-        return self.run_command(["which", "pkgx"])
+        return self._command_available("pkgx")
 
     def update(self) -> bool:
         """Update npm package lists."""
@@ -0,0 +1,551 @@
+"""Inventories read from the install receipts and directories tools keep.
+
+npm, gem, pipx, uv, flatpak, krew, gh, micro and vagrant all record what
+they installed on disk. Reading those records directly avoids starting
+Node, Ruby, Python or the tool itself just to list packages. Each reader
+returns {name: version} (version may be empty when the tool does not
+record one), or None when the tool's install location cannot be found
+(callers then fall back to the CLI). Results are cached until the install
+directory changes.
+"""
+
+import glob
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import threading
+import tomllib
+from importlib.metadata import distributions
+from typing import Optional
+
+import yaml
+
+from . import availability
+from .cache import file_stamp, load_cache, memoize_on_stamp, save_cache
+
+
+def _read_json(path: str) -> Optional[dict]:
+    """Load a JSON object from *path*, or None if it is missing or invalid."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _read_yaml(path: str) -> Optional[dict]:
+    """Load a YAML mapping from *path*, or None if it is missing or invalid."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f)
+    except (OSError, yaml.YAMLError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _data_home() -> str:
+    """Return the XDG data directory (~/.local/share by default)."""
+    return os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+
+
+def _config_home() -> str:
+    """Return the XDG config directory (~/.config by default)."""
+    return os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+
+
+# Python distributions ----------------------------------------------------
+
+
+def normalize_name(name: str) -> str:
+    """Return the PEP 503 normalized form of a distribution name."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def read_distributions(dirs: list[str]) -> dict[str, tuple[str, str]]:
+    """Index installed distributions from .dist-info/.egg-info metadata.
+
+    Returns {normalized name: (name, version)}; earlier directories win, as
+    they would on sys.path.
+    """
+    index: dict[str, tuple[str, str]] = {}
+    for dist in distributions(path=dirs):
+        if name := dist.metadata["Name"]:
+            index.setdefault(normalize_name(name), (name, dist.version))
+    return index
+
+
+# npm ---------------------------------------------------------------------
+
+
+def npm_global_root() -> Optional[str]:
+    """Return the global node_modules directory.
+
+    The prefix comes from npm_config_prefix, then ~/.npmrc, then the
+    location of the npm executable (<prefix>/bin/npm).
+    """
+    prefix = os.environ.get("NPM_CONFIG_PREFIX") or os.environ.get("npm_config_prefix")
+    if not prefix:
+        try:
+            with open(os.path.expanduser("~/.npmrc"), "r", encoding="utf-8") as f:
+                for line in f:
+                    key, _, value = line.partition("=")
+                    if key.strip() == "prefix":
+                        prefix = os.path.expanduser(value.strip())
+        except OSError:
+            pass
+    if not prefix and (npm := availability.which("npm")):
+        prefix = os.path.dirname(os.path.dirname(npm))
+    if not prefix:
+        return None
+    if sys.platform == "win32":
+        return os.path.join(prefix, "node_modules")
+    return os.path.join(prefix, "lib", "node_modules")
+
+
+def read_npm_packages(root: str) -> dict[str, str]:
+    """Read package.json of every package (including @scoped) under *root*."""
+    packages = {}
+    manifests = glob.glob(os.path.join(root, "*", "package.json")) + glob.glob(
+        os.path.join(root, "@*", "*", "package.json")
+    )
+    for manifest in sorted(manifests):
+        if (data := _read_json(manifest)) is None:
+            continue
+        name = os.path.relpath(os.path.dirname(manifest), root).replace(os.sep, "/")
+        packages[name] = str(data.get("version", ""))
+    return packages
+
+
+def npm_packages() -> Optional[dict[str, str]]:
+    """Return the globally installed npm packages."""
+    root = npm_global_root()
+    if not root or not os.path.isdir(root):
+        return None
+    scopes = glob.glob(os.path.join(root, "@*"))
+    return memoize_on_stamp("npm", [root, *scopes], lambda: read_npm_packages(root))
+
+
+# gem ---------------------------------------------------------------------
+
+GEM_PATH_CACHE = "gem-path.json"
+_GEM_PATH_QUERY = "puts Gem.path"
+
+_gem_path_lock = threading.Lock()
+
+_GEMSPEC = re.compile(
+    r"^(?P<name>.+?)-(?P<version>\d+(?:\.[0-9A-Za-z]+)*)(?:-(?P<platform>.+))?\.gemspec$"
+)
+
+
+def _rbenv_version(root: str) -> Optional[str]:
+    """Return the Ruby version rbenv selects (RBENV_VERSION, .ruby-version, global)."""
+    if version := os.environ.get("RBENV_VERSION"):
+        return version
+    directory = os.getcwd()
+    candidates = []
+    while True:
+        candidates.append(os.path.join(directory, ".ruby-version"))
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            break
+        directory = parent
+    candidates.append(os.path.join(root, "version"))
+    for path in candidates:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                if version := f.read().split():
+                    return version[0]
+        except OSError:
+            continue
+    return None
+
+
+def ruby_gem_path(ruby: str, selector: str = "") -> Optional[list[str]]:
+    """Return Gem.path of *ruby*, asking it only once.
+
+    The answer is kept in the cache directory until the interpreter binary,
+    GEM_HOME, GEM_PATH or the rbenv version *selector* changes. Returns None
+    if the interpreter cannot be run.
+    """
+    key = [
+        file_stamp(os.path.realpath(ruby)),
+        os.environ.get("GEM_HOME"),
+        os.environ.get("GEM_PATH"),
+        selector,
+    ]
+    with _gem_path_lock:
+        entry = load_cache(GEM_PATH_CACHE).get(ruby)
+    if entry and entry.get("key") == key:
+        return list(entry.get("path") or [])
+    try:
+        result = subprocess.run(
+            [ruby, "-e", _GEM_PATH_QUERY], capture_output=True, text=True, timeout=30
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        logging.debug(f"Could not read Gem.path of {ruby}: {e}")
+        return None
+    if result.returncode != 0:
+        logging.debug(f"Could not read Gem.path of {ruby}: {result.stderr.strip()}")
+        return None
+    path = [line for line in result.stdout.splitlines() if line]
+    with _gem_path_lock:
+        cached = load_cache(GEM_PATH_CACHE)
+        cached[ruby] = {"key": key, "path": path}
+        save_cache(GEM_PATH_CACHE, cached)
+    return path
+
+
+def _default_gem_homes() -> Optional[list[str]]:
+    """Return the gem directories of the Ruby that runs the gem executable.
+
+    The Ruby next to gem (else the one on PATH) is asked for Gem.path, which
+    covers distribution layouts such as Debian's /var/lib/gems and
+    Homebrew's $HOMEBREW_PREFIX/lib/ruby/gems. Without an answer, only an
+    rbenv version prefix is guessed; for other installs the directories are
+    unknown and None is returned.
+    """
+    if not (gem := availability.which("gem")):
+        return []
+    prefix = os.path.dirname(os.path.dirname(gem))
+    shims = os.path.basename(os.path.dirname(gem)) == "shims"
+    version = _rbenv_version(prefix) if shims else None
+    sibling = os.path.join(os.path.dirname(gem), "ruby")
+    ruby = sibling if os.access(sibling, os.X_OK) else availability.which("ruby")
+    if ruby and (path := ruby_gem_path(ruby, version or "")) is not None:
+        return path
+    if not version or version == "system":
+        return None
+    prefix = os.path.join(prefix, "versions", version)
+    homes = glob.glob(os.path.join(prefix, "lib", "ruby", "gems", "*"))
+    for abi in [os.path.basename(home) for home in homes]:
+        homes.append(os.path.join(_data_home(), "gem", "ruby", abi))
+        homes.append(os.path.expanduser(f"~/.gem/ruby/{abi}"))
+    return homes
+
+
+def gem_spec_dirs() -> Optional[list[str]]:
+    """Return the gem specification directories `gem list` reads.
+
+    Like `gem list`, reads GEM_HOME, then GEM_PATH, then the default gem
+    directories of the Ruby behind the gem executable, so default and
+    bundled gems are found even when the environment points elsewhere.
+    Returns None when the default directories are unknown.
+    """
+    if (defaults := _default_gem_homes()) is None:
+        return None
+    homes = [
+        home
+        for home in [
+            os.environ.get("GEM_HOME", ""),
+            *os.environ.get("GEM_PATH", "").split(os.pathsep),
+            *defaults,
+        ]
+        if home
+    ]
+    dirs = []
+    for home in dict.fromkeys(homes):
+        specs = os.path.join(home, "specifications")
+        dirs += [specs, os.path.join(specs, "default")]
+    dirs = [d for d in dirs if os.path.isdir(d)]
+    return dirs or None
+
+
+def read_gem_specifications(dirs: list[str]) -> dict[str, str]:
+    """Return the newest installed version of each gem from *.gemspec names."""
+    gems: dict[str, str] = {}
+    for directory in dirs:
+        for entry in os.listdir(directory):
+            if not (match := _GEMSPEC.match(entry)):
+                continue
+            name, version = match["name"], match["version"]
+            if name not in gems or _version_tuple(version) > _version_tuple(gems[name]):
+                gems[name] = version
+    return dict(sorted(gems.items()))
+
+
+def _version_tuple(version: str) -> tuple:
+    """Order gem versions numerically (pre-release segments sort first)."""
+    return tuple(
+        (1, int(part), "") if part.isdigit() else (0, 0, part)
+        for part in version.split(".")
+    )
+
+
+def gem_packages() -> Optional[dict[str, str]]:
+    """Return the locally installed gems."""
+    if (dirs := gem_spec_dirs()) is None:
+        return None
+    return memoize_on_stamp("gem", dirs, lambda: read_gem_specifications(dirs))
+
+
+# pipx --------------------------------------------------------------------
+
+
+def pipx_home() -> Optional[str]:
+    """Return PIPX_HOME (or the first default location that exists)."""
+    if home := os.environ.get("PIPX_HOME"):
+        return home
+    candidates = [
+        os.path.expanduser("~/.local/pipx"),
+        os.path.join(_data_home(), "pipx"),
+    ]
+    if sys.platform == "darwin":
+        candidates.append(os.path.expanduser("~/Library/Application Support/pipx"))
+    return next((path for path in candidates if os.path.isdir(path)), None)
+
+
+def read_pipx_venvs(venvs: str) -> dict[str, str]:
+    """Read the main package of every pipx venv from pipx_metadata.json."""
+    packages = {}
+    for metadata_path in sorted(
+        glob.glob(os.path.join(venvs, "*", "pipx_metadata.json"))
+    ):
+        metadata = _read_json(metadata_path) or {}
+        main = metadata.get("main_package") or {}
+        if name := main.get("package"):
+            packages[name] = str(main.get("package_version", ""))
+    return packages
+
+
+def pipx_packages() -> Optional[dict[str, str]]:
+    """Return the packages installed with pipx."""
+    home = pipx_home()
+    venvs = os.path.join(home, "venvs") if home else ""
+    if not venvs or not os.path.isdir(venvs):
+        return None
+    return memoize_on_stamp("pipx", [venvs], lambda: read_pipx_venvs(venvs))
+
+
+# uv ----------------------------------------------------------------------
+
+
+def uv_tool_dir() -> str:
+    """Return the directory uv installs tools into."""
+    return os.environ.get("UV_TOOL_DIR") or os.path.join(_data_home(), "uv", "tools")
+
+
+def read_uv_tools(tool_dir: str) -> dict[str, str]:
+    """Read every uv tool from its uv-receipt.toml and installed metadata."""
+    tools = {}
+    for receipt_path in sorted(
+        glob.glob(os.path.join(tool_dir, "*", "uv-receipt.toml"))
+    ):
+        environment = os.path.dirname(receipt_path)
+        try:
+            with open(receipt_path, "rb") as f:
+                requirements = tomllib.load(f).get("tool", {}).get("requirements", [])
+        except (OSError, tomllib.TOMLDecodeError):
+            continue
+        name = os.path.basename(environment)
+        if requirements and isinstance(requirements[0], dict):
+            name = requirements[0].get("name", name)
+        site_packages = glob.glob(
+            os.path.join(environment, "lib", "python*", "site-packages")
+        ) or glob.glob(os.path.join(environment, "Lib", "site-packages"))
+        installed = read_distributions(site_packages)
+        _, version = installed.get(normalize_name(name), ("", ""))
+        tools[name] = version
+    return tools
+
+
+def uv_tools() -> Optional[dict[str, str]]:
+    """Return the tools installed with `uv tool install`."""
+    tool_dir = uv_tool_dir()
+    if not os.path.isdir(tool_dir):
+        return None
+    return memoize_on_stamp("uv", [tool_dir], lambda: read_uv_tools(tool_dir))
+
+
+# flatpak -----------------------------------------------------------------
+
+
+def flatpak_app_dirs() -> list[str]:
+    """Return the app/ directories of the user and system installations."""
+    user = os.environ.get("FLATPAK_USER_DIR") or os.path.join(_data_home(), "flatpak")
+    system = os.environ.get("FLATPAK_SYSTEM_DIR") or "/var/lib/flatpak"
+    return [
+        path
+        for path in (os.path.join(user, "app"), os.path.join(system, "app"))
+        if os.path.isdir(path)
+    ]
+
+
+def read_flatpak_apps(app_dirs: list[str]) -> dict[str, str]:
+    """Return the installed application IDs with their active branch.
+
+    An app is installed when its directory has a `current` deployment.
+    """
+    apps = {}
+    for app_dir in app_dirs:
+        for app_id in sorted(os.listdir(app_dir)):
+            current = os.path.join(app_dir, app_id, "current")
+            if os.path.exists(current):
+                # current -> <arch>/<branch>
+                branch = os.readlink(current) if os.path.islink(current) else ""
+                apps.setdefault(app_id, os.path.basename(branch))
+    return apps
+
+
+def flatpak_apps() -> Optional[dict[str, str]]:
+    """Return the installed Flatpak applications (user and system)."""
+    if not (app_dirs := flatpak_app_dirs()):
+        return None
+    return memoize_on_stamp("flatpak", app_dirs, lambda: read_flatpak_apps(app_dirs))
+
+
+# krew --------------------------------------------------------------------
+
+
+def krew_receipts_dir() -> str:
+    """Return the directory krew keeps its plugin receipts in."""
+    root = os.environ.get("KREW_ROOT") or os.path.expanduser("~/.krew")
+    return os.path.join(root, "receipts")
+
+
+def read_krew_receipts(receipts_dir: str) -> dict[str, str]:
+    """Read the installed krew plugins from their receipts.
+
+    Plugins from an index other than "default" are named index/plugin, as
+    `kubectl krew list` prints them.
+    """
+    plugins = {}
+    for path in sorted(glob.glob(os.path.join(receipts_dir, "*.yaml"))):
+        receipt = _read_yaml(path) or {}
+        name = (receipt.get("metadata") or {}).get("name") or os.path.basename(
+            path
+        ).removesuffix(".yaml")
+        index = ((receipt.get("status") or {}).get("source") or {}).get("name")
+        if index and index != "default":
+            name = f"{index}/{name}"
+        plugins[name] = str((receipt.get("spec") or {}).get("version", ""))
+    return plugins
+
+
+def krew_plugins() -> Optional[dict[str, str]]:
+    """Return the installed krew plugins."""
+    receipts_dir = krew_receipts_dir()
+    if not os.path.isdir(receipts_dir):
+        return None
+    return memoize_on_stamp(
+        "krew", [receipts_dir], lambda: read_krew_receipts(receipts_dir)
+    )
+
+
+# gh ----------------------------------------------------------------------
+
+
+def gh_extensions_dir() -> str:
+    """Return the directory gh installs extensions into."""
+    data_dir = os.environ.get("GH_DATA_DIR") or os.path.join(_data_home(), "gh")
+    return os.path.join(data_dir, "extensions")
+
+
+def _git_remote_repo(extension: str) -> Optional[str]:
+    """Return owner/repo of a git-cloned extension's origin remote."""
+    try:
+        with open(
+            os.path.join(extension, ".git", "config"), "r", encoding="utf-8"
+        ) as f:
+            config = f.read()
+    except OSError:
+        return None
+    match = re.search(
+        r'\[remote "origin"\][^\[]*?url\s*=\s*(\S+)', config, flags=re.DOTALL
+    )
+    if not match:
+        return None
+    path = match[1].removesuffix(".git").replace(":", "/").rstrip("/")
+    parts = path.split("/")
+    return "/".join(parts[-2:]) if len(parts) >= 2 else None
+
+
+def read_gh_extensions(extensions_dir: str) -> dict[str, str]:
+    """Return the owner/repo of every installed extension.
+
+    Binary extensions record it in manifest.yml, git extensions in their
+    origin remote. Local (symlinked) extensions have no repository and are
+    left out, as in `gh extension list`'s repo column.
+    """
+    extensions = {}
+    for entry in sorted(os.scandir(extensions_dir), key=lambda e: e.name):
+        if not entry.name.startswith("gh-"):
+            continue
+        manifest = _read_yaml(os.path.join(entry.path, "manifest.yml"))
+        if manifest and manifest.get("owner") and manifest.get("name"):
+            repo = f"{manifest['owner']}/{manifest['name']}"
+            extensions[repo] = str(manifest.get("tag", ""))
+        elif repo := _git_remote_repo(entry.path):
+            extensions[repo] = ""
+    return extensions
+
+
+def gh_extensions() -> Optional[dict[str, str]]:
+    """Return the installed gh extensions keyed by owner/repo."""
+    extensions_dir = gh_extensions_dir()
+    if not os.path.isdir(extensions_dir):
+        return None
+    return memoize_on_stamp(
+        "gh", [extensions_dir], lambda: read_gh_extensions(extensions_dir)
+    )
+
+
+# micro -------------------------------------------------------------------
+
+
+def micro_plug_dir() -> str:
+    """Return the directory micro installs plugins into."""
+    config = os.environ.get("MICRO_CONFIG_HOME") or os.path.join(
+        _config_home(), "micro"
+    )
+    return os.path.join(config, "plug")
+
+
+def micro_plugins() -> Optional[dict[str, str]]:
+    """Return the installed (non built-in) micro plugins.
+
+    Built-in plugins ship inside the micro binary, so everything under
+    plug/ was installed by the user. Versions are not recorded.
+    """
+    plug_dir = micro_plug_dir()
+    if not os.path.isdir(plug_dir):
+        return None
+    return memoize_on_stamp(
+        "micro",
+        [plug_dir],
+        lambda: {
+            entry.name: ""
+            for entry in sorted(os.scandir(plug_dir), key=lambda e: e.name)
+            if entry.is_dir() and not entry.name.startswith(".")
+        },
+    )
+
+
+# vagrant -----------------------------------------------------------------
+
+
+def vagrant_plugins_file() -> str:
+    """Return the path of vagrant's plugins.json."""
+    home = os.environ.get("VAGRANT_HOME") or os.path.expanduser("~/.vagrant.d")
+    return os.path.join(home, "plugins.json")
+
+
+def vagrant_plugins() -> Optional[dict[str, str]]:
+    """Return the installed vagrant plugins from plugins.json."""
+    path = vagrant_plugins_file()
+    if not os.path.exists(path):
+        return None
+
+    def _read() -> Optional[dict[str, str]]:
+        if (data := _read_json(path)) is None:
+            return None
+        installed = data.get("installed") or {}
+        return {
+            name: str((info or {}).get("installed_gem_version", ""))
+            for name, info in sorted(installed.items())
+        }
+
+    return memoize_on_stamp("vagrant", [path], _read)
@@ -79,4 +79,6 @@ class PackageManagerRegistry:
         """Get a package manager instance by name."""
         if name not in cls._managers:
             raise ValueError(f"Unknown package manager: {name}")
-        return cls._managers[name](config)
+        manager = cls._managers[name](config)
+        manager.name = name
+        return manager
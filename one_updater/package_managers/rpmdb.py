@@ -0,0 +1,100 @@
+"""Reader for the RPM package database (sqlite backend).
+
+Installed packages are read straight from ``rpmdb.sqlite`` with the
+standard library's sqlite3 module, opened read-only, instead of asking
+dnf (which loads repository metadata first). The index is rebuilt only
+when the database changes.
+"""
+
+import logging
+import sqlite3
+import struct
+from typing import NamedTuple, Optional
+
+from .cache import file_stamp, memoize_on_stamp
+
+RPMDB_PATHS = ("/usr/lib/sysimage/rpm/rpmdb.sqlite", "/var/lib/rpm/rpmdb.sqlite")
+
+# Header tags (see rpmtag.h)
+RPMTAG_NAME = 1000
+RPMTAG_VERSION = 1001
+RPMTAG_RELEASE = 1002
+RPMTAG_ARCH = 1022
+RPM_STRING_TYPE = 6
+
+# Imported signing keys are stored as pseudo-packages; dnf does not list them
+PSEUDO_PACKAGES = {"gpg-pubkey"}
+
+
+class RpmPackage(NamedTuple):
+    """An installed package from the RPM database."""
+
+    name: str
+    version: str  # version-release
+    arch: str
+
+
+def parse_header(blob: bytes) -> dict[int, str]:
+    """Return the string tags of an RPM header blob as {tag: value}.
+
+    The blob is the header as stored in the database: entry count and data
+    length, the index entries (tag, type, offset, count), then the data.
+    """
+    entries, data_length = struct.unpack_from(">ii", blob, 0)
+    data_start = 8 + entries * 16
+    data = blob[data_start : data_start + data_length]
+    tags = {}
+    for i in range(entries):
+        tag, tag_type, offset, _count = struct.unpack_from(">iiii", blob, 8 + i * 16)
+        if tag_type == RPM_STRING_TYPE and 0 <= offset < len(data):
+            end = data.find(b"\0", offset)
+            tags[tag] = data[offset : end if end != -1 else None].decode(
+                errors="replace"
+            )
+    return tags
+
+
+def read_index(path: str) -> dict[str, RpmPackage]:
+    """Index the installed packages in an rpmdb.sqlite file by name.
+
+    Raises sqlite3.Error if the database cannot be read.
+    """
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        rows = connection.execute("SELECT blob FROM Packages").fetchall()
+    finally:
+        connection.close()
+    index = {}
+    for (blob,) in rows:
+        try:
+            tags = parse_header(blob)
+        except struct.error:
+            continue
+        name = tags.get(RPMTAG_NAME)
+        if name and name not in PSEUDO_PACKAGES:
+            version = tags.get(RPMTAG_VERSION, "")
+            if release := tags.get(RPMTAG_RELEASE):
+                version = f"{version}-{release}"
+            index[name] = RpmPackage(name, version, tags.get(RPMTAG_ARCH, ""))
+    return index
+
+
+def installed_packages(
+    paths: tuple[str, ...] = RPMDB_PATHS,
+) -> Optional[dict[str, RpmPackage]]:
+    """Return the installed package index from the first database found.
+
+    Returns None if there is no readable sqlite RPM database.
+    """
+    for path in paths:
+        if file_stamp(path) is None:
+            continue
+        try:
+            # Recent transactions may still live in the write-ahead log
+            return memoize_on_stamp(
+                "rpmdb", [path, f"{path}-wal"], lambda: read_index(path)
+            )
+        except sqlite3.Error as e:
+            logging.debug(f"Could not read RPM database {path}: {e}")
+            return None
+    return None
@@ -1,39 +1,109 @@
 """snap package manager implementation."""
 
+import logging
+import os
 from typing import Optional
 
+from . import snapd
 from .base import PackageManager
 
+DEFAULT_REFRESH = ["sudo", "snap", "refresh"]
+# Upgrade commands the snapd API can stand in for
+REFRESH_COMMANDS = (DEFAULT_REFRESH, ["snap", "refresh"])
+
 
 class SnapManager(PackageManager):
-    """Manager for snap packages."""
+    """Manager for snap packages.
+
+    Inventory, install and refresh checks go to the snapd API when its
+    socket is present; the snap CLI is used otherwise.
+    """
 
     def is_available(self) -> bool:
         """Check if snap is available."""
-        return self.run_command(["which", "snap"])
+        return self._command_available("snap")
+
+    def _api(self, call):
+        """Run *call* against snapd, or return None if the API is unusable."""
+        if (client := snapd.client()) is None:
+            return None
+        try:
+            return call(client)
+        except snapd.SnapdError as e:
+            logging.debug(f"snapd API request failed, using the snap CLI: {e}")
+            return None
 
     def update(self) -> bool:
         """Update snap package lists."""
         if not self.is_available():
             return False
         # snap refresh handles both update and upgrade
-        return self.run_command(
-            self.commands.get("update", ["sudo", "snap", "refresh"])
-        )
+        return self.run_command(self.commands.get("update", DEFAULT_REFRESH))
+
+    def _refresh_via_api(self) -> Optional[bool]:
+        """Refresh all snaps through snapd and wait for the change to finish.
+
+        Only root may refresh over the socket. Returns None if the refresh
+        could not be started (the CLI is used instead); once snapd accepted
+        it, failures are reported rather than starting a second refresh.
+        """
+        if os.geteuid() != 0 or (client := snapd.client()) is None:
+            return None
+        try:
+            change_id = client.refresh()
+        except snapd.SnapdError as e:
+            logging.debug(f"snapd refresh request failed, using the snap CLI: {e}")
+            return None
+        if change_id is None:
+            return True
+        try:
+            change = client.wait_change(change_id)
+        except snapd.SnapdError as e:
+            logging.error(f"Lost track of snap refresh (change {change_id}): {e}")
+            return False
+        if change.get("status") != "Done":
+            logging.error(f"snap refresh failed: {change.get('err', '')}")
+            return False
+        return True
 
     def upgrade(self) -> bool:
-        """Upgrade snap packages."""
+        """Upgrade snap packages.
+
+        The default `snap refresh` goes through the snapd API when possible;
+        other upgrade commands are run as configured.
+        """
         if not self.is_available():
             return False
+        command = self.commands.get("upgrade", DEFAULT_REFRESH)
+        if (
+            command in REFRESH_COMMANDS
+            and (refreshed := self._refresh_via_api()) is not None
+        ):
+            return refreshed
         # snap refresh handles both update and upgrade
-        return self.run_command(
-            self.commands.get("upgrade", ["sudo", "snap", "refresh"])
+        return self.run_command(command)
+
+    def outdated_packages(self) -> Optional[list[str]]:
+        """Return the snaps with a refresh available, or None if unknown."""
+        if not self.is_available():
+            return None
+        if (snaps := self._api(lambda c: c.refresh_candidates())) is not None:
+            return [snap["name"] for snap in snaps]
+        ok, stdout, stderr = self.run_command_with_output(
+            ["snap", "refresh", "--list", "--color=never"]
         )
+        if not ok:
+            return None
+        if not stdout:  # "All snaps up to date." goes to stderr
+            return []
+        return [line.split()[0] for line in stdout.splitlines()[1:] if line.strip()]
 
     def list_packages(self) -> Optional[list[str]]:
         """Return all installed snap package names (excluding snapd)."""
         if not self.is_available():
             return None
+        if (snaps := self._api(lambda c: c.snaps())) is not None:
+            return [snap["name"] for snap in snaps if snap["name"] != "snapd"]
         ok, stdout, _ = self.run_command_with_output(["snap", "list", "--color=never"])
         if not ok or not stdout:
             return []
@@ -45,13 +115,19 @@ class SnapManager(PackageManager):
                 packages.append(parts[0])
         return packages
 
+    def _install_command(self, names: list[str]) -> list[str]:
+        """Return the snap command installing all *names* at once."""
+        return ["sudo", "snap", "install", *names]
+
     def install_package(self, name: str) -> bool:
         """Install a snap package by name."""
         if not self.is_available():
             return False
-        return self.run_command(["sudo", "snap", "install", name])
+        return self.run_command(self._install_command([name]))
 
     def is_package_installed(self, name: str) -> bool:
         """Check whether a snap package is installed."""
+        if (installed := self._api(lambda c: c.snap(name) is not None)) is not None:
+            return installed
         ok, _, _ = self.run_command_with_output(["snap", "list", name])
         return ok
@@ -0,0 +1,191 @@
+"""Client for the snapd REST API on its unix socket.
+
+snapd serves the data behind ``snap list``, ``snap refresh --list`` and
+``snap changes`` as JSON on ``/run/snapd.socket``. Talking to it directly
+avoids starting the snap CLI (and its table formatting) for every query.
+One keep-alive connection is reused for all requests of a run.
+"""
+
+import http.client
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Iterable, Optional
+from urllib.parse import quote
+
+SNAPD_SOCKET = "/run/snapd.socket"
+DEFAULT_TIMEOUT = 30.0
+POLL_INTERVAL = 0.5
+
+
+class SnapdError(Exception):
+    """An error response from snapd, or a failure to reach it."""
+
+    def __init__(self, message: str, kind: str = "", status: int = 0):
+        super().__init__(message)
+        self.kind = kind
+        self.status = status
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a unix domain socket."""
+
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+class SnapdClient:
+    """Minimal snapd API client sharing one keep-alive connection."""
+
+    def __init__(
+        self, socket_path: str = SNAPD_SOCKET, timeout: float = DEFAULT_TIMEOUT
+    ):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._conn: Optional[_UnixHTTPConnection] = None
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        """Close the pooled connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _send(self, method: str, path: str, body: Optional[bytes]) -> tuple[int, bytes]:
+        """Send one request on the pooled connection and read the response."""
+        if self._conn is None:
+            self._conn = _UnixHTTPConnection(self.socket_path, self.timeout)
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        self._conn.request(method, path, body=body, headers=headers)
+        response = self._conn.getresponse()
+        data = response.read()
+        if response.will_close:
+            self._conn.close()
+            self._conn = None
+        return response.status, data
+
+    def request(self, method: str, path: str, body: Optional[dict] = None) -> dict:
+        """Make an API request and return the decoded response document.
+
+        A GET on a reused connection that snapd has since closed is retried
+        once on a fresh connection. Other methods may not be repeated (snapd
+        could have acted on a request whose response was lost), so they
+        always get a fresh connection instead. Raises SnapdError on failure.
+        """
+        payload = json.dumps(body).encode() if body is not None else None
+        with self._lock:
+            if method != "GET" and self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            attempts = 2 if self._conn is not None else 1
+            for attempt in range(attempts):
+                try:
+                    status, data = self._send(method, path, payload)
+                    break
+                except (http.client.HTTPException, OSError) as e:
+                    if self._conn is not None:
+                        self._conn.close()
+                        self._conn = None
+                    if attempt == attempts - 1:
+                        raise SnapdError(f"Cannot reach snapd: {e}") from e
+        try:
+            document = json.loads(data)
+        except ValueError as e:
+            raise SnapdError(f"Invalid response from snapd: {e}", status=status) from e
+        if document.get("type") == "error":
+            result = document.get("result") or {}
+            raise SnapdError(
+                result.get("message", "snapd request failed"),
+                result.get("kind", ""),
+                document.get("status-code", status),
+            )
+        return document
+
+    def get(self, path: str):
+        """GET an API path and return its result."""
+        return self.request("GET", path).get("result")
+
+    def snaps(self) -> list[dict]:
+        """Return the installed snaps."""
+        return self.get("/v2/snaps") or []
+
+    def snap(self, name: str) -> Optional[dict]:
+        """Return one installed snap, or None if it is not installed."""
+        try:
+            return self.get(f"/v2/snaps/{quote(name, safe='')}")
+        except SnapdError as e:
+            if e.kind == "snap-not-found" or e.status == 404:
+                return None
+            raise
+
+    def refresh_candidates(self) -> list[dict]:
+        """Return the installed snaps that have a refresh available."""
+        try:
+            return self.get("/v2/find?select=refresh") or []
+        except SnapdError as e:
+            # Older snapd versions report "no snaps" as a 404
+            if e.status == 404:
+                return []
+            raise
+
+    def refresh(self, names: Iterable[str] = ()) -> Optional[str]:
+        """Start refreshing *names* (all snaps if empty).
+
+        Returns the change ID, or None if snapd had nothing to do.
+        """
+        body: dict = {"action": "refresh"}
+        if names := list(names):
+            body["snaps"] = names
+        return self.request("POST", "/v2/snaps", body).get("change")
+
+    def change(self, change_id: str) -> dict:
+        """Return the status of a change."""
+        return self.get(f"/v2/changes/{quote(change_id, safe='')}") or {}
+
+    def wait_change(
+        self,
+        change_id: str,
+        interval: float = POLL_INTERVAL,
+        timeout: Optional[float] = None,
+    ) -> dict:
+        """Poll a change until it is ready and return its final status.
+
+        Raises SnapdError if *timeout* seconds pass first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not (change := self.change(change_id)).get("ready"):
+            if deadline is not None and time.monotonic() >= deadline:
+                raise SnapdError(f"Timed out waiting for snapd change {change_id}")
+            logging.debug(f"snapd change {change_id}: {change.get('status')}")
+            time.sleep(interval)
+        return change
+
+
+_clients: dict[str, SnapdClient] = {}
+_clients_lock = threading.Lock()
+
+
+def client(socket_path: Optional[str] = None) -> Optional[SnapdClient]:
+    """Return the shared client for *socket_path*, or None if snapd is not running."""
+    socket_path = socket_path or SNAPD_SOCKET
+    if not os.path.exists(socket_path):
+        return None
+    with _clients_lock:
+        if socket_path not in _clients:
+            _clients[socket_path] = SnapdClient(socket_path)
+        return _clients[socket_path]
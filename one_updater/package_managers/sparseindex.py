@@ -0,0 +1,116 @@
+"""Crate version lookups against cargo's sparse registry index protocol.
+
+crates.io and other sparse registries serve the index entries of each
+crate as newline-delimited JSON at ``<index>/<prefix>/<name>``. Responses
+are cached with their ETag and Last-Modified headers, so later runs only
+download the entries of crates that changed upstream.
+"""
+
+import json
+import logging
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional
+
+from .cache import load_cache, save_cache
+
+INDEX_CACHE = "cargo-sparse-index.json"
+CRATES_IO_SOURCE = "registry+https://github.com/rust-lang/crates.io-index"
+CRATES_IO_INDEX = "https://index.crates.io/"
+DEFAULT_JOBS = 8
+DEFAULT_TIMEOUT = 10.0
+
+# Statuses meaning the registry does not have the crate
+_MISSING = (404, 410, 451)
+
+_lock = threading.Lock()
+
+
+def index_url(source: str) -> Optional[str]:
+    """Return the sparse index base URL for a crate source, if it has one.
+
+    crates.io is recorded under its git index URL but served sparsely;
+    other git registries cannot be queried this way.
+    """
+    if source == CRATES_IO_SOURCE:
+        return CRATES_IO_INDEX
+    if source.startswith("sparse+"):
+        url = source[len("sparse+") :]
+        return url if url.endswith("/") else url + "/"
+    return None
+
+
+def parse_entries(body: bytes) -> list[str]:
+    """Return the unyanked versions in a sparse index file."""
+    versions = []
+    for line in body.splitlines():
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(entry, dict) and entry.get("vers") and not entry.get("yanked"):
+            versions.append(entry["vers"])
+    return versions
+
+
+def fetch_versions(
+    url: str, cached: Optional[dict] = None, timeout: float = DEFAULT_TIMEOUT
+) -> Optional[dict]:
+    """Fetch one index file, revalidating the *cached* entry if given.
+
+    Returns a cache entry {"versions", "etag", "last_modified"}, or None if
+    the registry could not be reached.
+    """
+    headers = {}
+    if cached and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    elif cached and cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            body = response.read()
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and cached:
+            return cached
+        if e.code in _MISSING:
+            return {"versions": []}
+        logging.debug(f"Sparse index request {url} failed: {e}")
+        return None
+    except (urllib.error.URLError, OSError, ValueError) as e:
+        logging.debug(f"Sparse index request {url} failed: {e}")
+        return None
+    return {
+        "versions": parse_entries(body),
+        "etag": etag,
+        "last_modified": last_modified,
+    }
+
+
+def fetch_all(
+    urls: Iterable[str], jobs: int = DEFAULT_JOBS
+) -> dict[str, Optional[list[str]]]:
+    """Fetch many index files concurrently.
+
+    Returns {url: versions or None}; None means the registry could not be
+    reached for that file.
+    """
+    urls = sorted(set(urls))
+    results: dict[str, Optional[list[str]]] = dict.fromkeys(urls)
+    if not urls:
+        return results
+    with _lock:
+        cache = load_cache(INDEX_CACHE)
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(urls)))) as pool:
+        entries = list(pool.map(lambda u: fetch_versions(u, cache.get(u)), urls))
+    for url, entry in zip(urls, entries):
+        if entry is not None:
+            cache[url] = entry
+            results[url] = entry["versions"]
+    with _lock:
+        save_cache(INDEX_CACHE, cache)
+    return results
@@ -8,7 +8,7 @@ class TldrManager(PackageManager):
 
     def is_available(self) -> bool:
         """Check if tldr is available."""
-        return self.run_command(["which", "tldr"])
+        return self._command_available("tldr")
 
     def update(self) -> bool:
         """Update tldr pages cache."""
@@ -2,6 +2,7 @@
 
 from typing import Optional
 
+from . import receipts
 from .base import PackageManager
 
 
@@ -10,7 +11,7 @@ class UvManager(PackageManager):
 
     def is_available(self) -> bool:
         """Check if uv is available."""
-        return self.run_command(["which", "uv"])
+        return self._command_available("uv")
 
     def update(self) -> bool:
         """Update uv itself."""
@@ -27,10 +28,29 @@ class UvManager(PackageManager):
             self.commands.get("upgrade", ["uv", "tool", "upgrade", "--all"])
         )
 
+    def outdated_packages(self) -> Optional[list[str]]:
+        """Return the tools `uv tool list --outdated` reports, or None if unknown."""
+        if not self.is_available():
+            return None
+        ok, stdout, _ = self.run_command_with_output(
+            ["uv", "tool", "list", "--outdated"]
+        )
+        if not ok:  # uv releases before --outdated reject the flag
+            return None
+        # Tool lines look like "ruff v0.5.0 [latest: 0.6.0]"; "- ruff" lines
+        # list their executables
+        return [
+            line.split()[0]
+            for line in (stdout or "").splitlines()
+            if line.strip() and not line.startswith("-")
+        ]
+
     def list_packages(self) -> Optional[list[str]]:
         """Return all uv tool package names."""
         if not self.is_available():
             return None
+        if (packages := receipts.uv_tools()) is not None:
+            return list(packages)
         ok, stdout, _ = self.run_command_with_output(["uv", "tool", "list"])
         if not ok or not stdout:
             return []
@@ -48,5 +68,5 @@ class UvManager(PackageManager):
 
     def is_package_installed(self, name: str) -> bool:
         """Check whether a uv tool package is installed."""
-        packages = self.list_packages()
+        packages = self.inventory()
         return packages is not None and name in packages
@@ -2,6 +2,7 @@
 
 from typing import Optional
 
+from . import receipts
 from .base import PackageManager
 
 
@@ -10,7 +11,7 @@ class VagrantPluginManager(PackageManager):
 
     def is_available(self) -> bool:
         """Check if vagrant is available."""
-        return self.run_command(["which", "vagrant"])
+        return self._command_available("vagrant")
 
     def update(self) -> bool:
         if not self.is_available():
@@ -27,6 +28,8 @@ class VagrantPluginManager(PackageManager):
         """Return all installed vagrant plugin names."""
         if not self.is_available():
             return None
+        if (packages := receipts.vagrant_plugins()) is not None:
+            return list(packages)
         ok, stdout, _ = self.run_command_with_output(["vagrant", "plugin", "list"])
         if not ok or not stdout:
             return []
@@ -47,5 +50,5 @@ class VagrantPluginManager(PackageManager):
 
     def is_package_installed(self, name: str) -> bool:
         """Check whether a vagrant plugin is installed."""
-        packages = self.list_packages()
+        packages = self.inventory()
         return packages is not None and name in packages
@@ -0,0 +1,32 @@
+"""Semantic version parsing shared by the package managers."""
+
+import re
+from typing import Optional
+
+_SEMVER = re.compile(
+    r"^v?(\d+)\.(\d+)\.(\d+)(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?$"
+)
+
+
+def semver_key(version: str) -> Optional[tuple]:
+    """Return a sort key for a semantic version, or None if it is not one.
+
+    A leading "v" (as in Go module versions) is accepted.
+    """
+    if not (match := _SEMVER.match(version)):
+        return None
+    major, minor, patch, pre = match.groups()
+    release = (int(major), int(minor), int(patch))
+    if pre is None:
+        return release + (1, ())
+    identifiers = tuple(
+        (0, int(part), "") if part.isdigit() else (1, 0, part)
+        for part in pre.split(".")
+    )
+    return release + (0, identifiers)
+
+
+def is_prerelease(version: str) -> bool:
+    """Check whether a semantic version has a pre-release suffix."""
+    key = semver_key(version)
+    return key is not None and key[3] == 0
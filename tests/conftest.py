@@ -5,6 +5,57 @@ import os
 import pytest
 import yaml
 
+from one_updater.package_managers import availability, receipts, sparseindex
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """Keep one-updater's on-disk and in-process caches out of the user's home."""
+    cache_home = tmp_path / "cache"
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache_home))
+    availability.clear_cache()
+    yield cache_home
+    availability.clear_cache()
+
+
+# Environment variables pointing each tool manager at its install metadata
+TOOL_HOME_VARS = {
+    "CARGO_HOME": "cargo",
+    "NPM_CONFIG_PREFIX": "npm",
+    "GEM_PATH": "gem",
+    "PIPX_HOME": "pipx",
+    "UV_TOOL_DIR": "uv",
+    "FLATPAK_USER_DIR": "flatpak-user",
+    "FLATPAK_SYSTEM_DIR": "flatpak-system",
+    "KREW_ROOT": "krew",
+    "GH_DATA_DIR": "gh",
+    "MICRO_CONFIG_HOME": "micro",
+    "VAGRANT_HOME": "vagrant",
+}
+
+
+@pytest.fixture(autouse=True)
+def tool_homes(tmp_path, monkeypatch):
+    """Point tool managers at empty directories so the user's installs are not read.
+
+    Tests create the subdirectory named in TOOL_HOME_VARS to provide metadata;
+    "gem-default" stands in for the Ruby's default gem directory.
+    """
+    root = tmp_path / "tool-homes"
+    for variable, name in TOOL_HOME_VARS.items():
+        monkeypatch.setenv(variable, str(root / name))
+    monkeypatch.delenv("GEM_HOME", raising=False)
+    monkeypatch.setattr(
+        receipts, "_default_gem_homes", lambda: [str(root / "gem-default")]
+    )
+    return root
+
+
+@pytest.fixture(autouse=True)
+def offline_registries(monkeypatch):
+    """Keep crate lookups off the network; tests serve their own index."""
+    monkeypatch.setattr(sparseindex, "CRATES_IO_INDEX", "http://127.0.0.1:9/")
+
 
 @pytest.fixture
 def test_config_path(tmp_path):
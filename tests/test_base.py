@@ -0,0 +1,149 @@
+"""Tests for the PackageManager subprocess helpers."""
+
+import asyncio
+import json
+import logging
+import os
+from unittest.mock import patch
+
+from one_updater.package_managers import availability
+from one_updater.package_managers.base import PackageManager
+
+
+class _DummyManager(PackageManager):
+    """Minimal concrete PackageManager for exercising base-class helpers."""
+
+    def is_available(self) -> bool:
+        return True
+
+    def update(self) -> bool:
+        return True
+
+    def upgrade(self) -> bool:
+        return True
+
+
+class TestRunCommand:
+    """Tests for the sync wrappers around the asyncio subprocess core."""
+
+    def test_run_command_success_and_failure(self) -> None:
+        """run_command maps the exit status to a bool."""
+        mgr = _DummyManager({})
+        assert mgr.run_command(["true"]) is True
+        assert mgr.run_command(["false"]) is False
+        assert mgr.run_command([]) is True
+
+    def test_run_command_missing_binary(self) -> None:
+        """A missing executable is reported as a failure, not raised."""
+        mgr = _DummyManager({})
+        assert mgr.run_command(["__no_such_command__"]) is False
+        assert mgr.run_command_with_output(["__no_such_command__"]) == (False, "", "")
+
+    def test_run_command_with_output_captures_streams(self) -> None:
+        """stdout and stderr are returned separately."""
+        mgr = _DummyManager({})
+        ok, stdout, stderr = mgr.run_command_with_output(
+            ["sh", "-c", "echo out; echo err >&2; exit 3"]
+        )
+        assert ok is False
+        assert stdout == "out\n"
+        assert stderr == "err\n"
+
+    def test_run_commands_with_output_preserves_order(self) -> None:
+        """Batched probes return results in the order they were given."""
+        mgr = _DummyManager({})
+        results = mgr.run_commands_with_output(
+            [["sh", "-c", f"sleep 0.0{3 - i}; echo {i}"] for i in range(3)], limit=2
+        )
+        assert [stdout for _, stdout, _ in results] == ["0\n", "1\n", "2\n"]
+
+    def test_streaming_callback_receives_lines(self) -> None:
+        """on_output is called once per line, tagged with the stream name."""
+        mgr = _DummyManager({})
+        lines: list[tuple[str, str]] = []
+        ok, _, _ = asyncio.run(
+            mgr.run_command_with_output_async(
+                ["sh", "-c", "printf 'a\\nb'; echo c >&2"],
+                on_output=lambda stream, line: lines.append((stream, line)),
+            )
+        )
+        assert ok is True
+        assert sorted(lines) == [("stderr", "c"), ("stdout", "a"), ("stdout", "b")]
+
+    def test_verbose_output_is_logged_as_it_arrives(self, caplog) -> None:
+        """Verbose runs log each output line, not one block at the end."""
+        mgr = _DummyManager({"verbose": True})
+        with caplog.at_level(logging.INFO):
+            assert mgr.run_command(["sh", "-c", "echo one; echo two >&2"])
+        messages = [record.getMessage() for record in caplog.records]
+        assert "sh [stdout]: one" in messages
+        assert "sh [stderr]: two" in messages
+        assert not any(m.startswith("INFO - stdout") for m in messages)
+
+    def test_sync_wrapper_inside_running_loop(self) -> None:
+        """The sync wrappers still work when called from a coroutine."""
+        mgr = _DummyManager({})
+
+        async def _call() -> bool:
+            return mgr.run_command(["true"])
+
+        assert asyncio.run(_call()) is True
+
+
+class TestAvailabilityCache:
+    """Tests for the cached PATH lookup behind _command_available."""
+
+    def _make_tool(self, directory, name: str) -> None:
+        """Create an executable called *name* in *directory*."""
+        tool = directory / name
+        tool.write_text("#!/bin/sh\n")
+        tool.chmod(0o755)
+
+    def test_lookup_is_memoized(self, tmp_path, monkeypatch) -> None:
+        """A tool is only searched for once per run."""
+        self._make_tool(tmp_path, "mytool")
+        monkeypatch.setenv("PATH", str(tmp_path))
+        mgr = _DummyManager({})
+        with patch(
+            "one_updater.package_managers.availability.shutil.which",
+            wraps=availability.shutil.which,
+        ) as mock_which:
+            assert mgr._command_available("mytool") is True
+            assert mgr._command_available("mytool") is True
+            assert mgr._command_available("missing") is False
+            assert mgr._command_available("missing") is False
+        assert mock_which.call_count == 2
+
+    def test_disk_cache_reused_while_path_unchanged(
+        self, tmp_path, monkeypatch, isolated_cache
+    ) -> None:
+        """A fresh process reuses persisted results if PATH did not change."""
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        self._make_tool(bin_dir, "mytool")
+        monkeypatch.setenv("PATH", str(bin_dir))
+        assert availability.which("mytool") == str(bin_dir / "mytool")
+        with open(isolated_cache / "one-updater" / "which.json", encoding="utf-8") as f:
+            assert "mytool" in json.load(f)["tools"]
+
+        availability.clear_cache()
+        with patch(
+            "one_updater.package_managers.availability.shutil.which"
+        ) as mock_which:
+            assert availability.which("mytool") == str(bin_dir / "mytool")
+        mock_which.assert_not_called()
+
+    def test_disk_cache_invalidated_when_path_changes(
+        self, tmp_path, monkeypatch
+    ) -> None:
+        """Adding a binary to a PATH directory invalidates persisted results."""
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        monkeypatch.setenv("PATH", str(bin_dir))
+        assert availability.which("newtool") is None
+
+        availability.clear_cache()
+        self._make_tool(bin_dir, "newtool")
+        stat = os.stat(bin_dir)
+        os.utime(bin_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert availability.which("newtool") == str(bin_dir / "newtool")
@@ -1,12 +1,29 @@
 """Basic tests for the one-updater CLI."""
 
 import io
+import os
 import sys
+import threading
+import time
 from unittest.mock import patch
 
 import pytest
 
-from one_updater.cli import main
+from one_updater.cli import (
+    TERMINAL_GROUP,
+    config_jobs,
+    get_concurrency_group,
+    main,
+    run_managers,
+    update_and_record,
+    update_managers,
+    update_skip_reason,
+    upgrade_skip_reason,
+)
+from one_updater.package_managers import apt, freshness
+from one_updater.package_managers.apt import AptManager
+from one_updater.package_managers.npm import NpmManager
+from one_updater.package_managers.registry import PackageManagerRegistry
 
 
 def test_cli_list_managers(monkeypatch, test_config_path):
@@ -50,3 +67,175 @@ def test_cli_version(monkeypatch):
         # Check that version information is shown
         assert "version" in output.lower()
         assert "one-updater" in output.lower()
+
+
+def test_concurrency_group_defaults():
+    """sudo commands share the terminal group; explicit groups win."""
+    apt_cfg = {"commands": {"update": ["sudo", "apt-get", "update"]}}
+    assert get_concurrency_group("apt", apt_cfg, "update") == TERMINAL_GROUP
+    assert (
+        get_concurrency_group("npm", {"commands": {"update": ["npm"]}}, "update")
+        is None
+    )
+    assert get_concurrency_group("brew", {}, "upgrade") == TERMINAL_GROUP
+    # Explicit groups cannot take a sudo manager out of the terminal group
+    pacman_cfg = {
+        "concurrency_group": "system",
+        "commands": {"upgrade": ["sudo", "pacman", "-Su"]},
+    }
+    assert get_concurrency_group("pacman", pacman_cfg, "upgrade") == TERMINAL_GROUP
+    assert (
+        get_concurrency_group("npm", {"concurrency_group": "node"}, "update") == "node"
+    )
+
+
+def test_run_managers_serializes_groups():
+    """Managers in the same group never overlap; others run in parallel."""
+    running: dict[str, int] = {"locked": 0, "max_locked": 0, "total": 0, "max": 0}
+    lock = threading.Lock()
+
+    def _fake_action(name, cfg, *_args):
+        grouped = cfg.get("concurrency_group") == "locked"
+        with lock:
+            running["total"] += 1
+            running["max"] = max(running["max"], running["total"])
+            if grouped:
+                running["locked"] += 1
+                running["max_locked"] = max(running["max_locked"], running["locked"])
+        time.sleep(0.05)
+        with lock:
+            running["total"] -= 1
+            if grouped:
+                running["locked"] -= 1
+
+    managers = {
+        "apt": {"concurrency_group": "locked"},
+        "dnf": {"concurrency_group": "locked"},
+        "npm": {},
+        "cargo": {},
+    }
+    with patch("one_updater.cli.run_package_manager_action", side_effect=_fake_action):
+        run_managers(managers, "upgrade", lambda pm: pm.upgrade(), False, jobs=4)
+
+    assert running["max_locked"] == 1
+    assert running["max"] > 1
+
+
+def test_terminal_managers_run_alone():
+    """Managers needing the terminal never overlap with any other manager."""
+    events: list[tuple[str, str]] = []
+    lock = threading.Lock()
+
+    def _fake_action(name, *_args):
+        with lock:
+            events.append(("start", name))
+        time.sleep(0.02)
+        with lock:
+            events.append(("end", name))
+
+    sudo = {"commands": {"upgrade": ["sudo", "true"]}}
+    managers = {"apt": sudo, "npm": {}, "dnf": sudo, "cargo": {}}
+    with patch("one_updater.cli.run_package_manager_action", side_effect=_fake_action):
+        run_managers(managers, "upgrade", lambda pm: pm.upgrade(), False, jobs=4)
+
+    assert events[:4] == [
+        ("start", "apt"),
+        ("end", "apt"),
+        ("start", "dnf"),
+        ("end", "dnf"),
+    ]
+
+
+@pytest.mark.parametrize("jobs", ["4", 2])
+def test_config_jobs_accepts_positive_integers(jobs):
+    """'jobs' from the config is converted to an int."""
+    assert config_jobs({"jobs": jobs}) == int(jobs)
+
+
+@pytest.mark.parametrize("jobs", [0, "many", True])
+def test_config_jobs_rejects_invalid_values(jobs, capsys):
+    """An invalid 'jobs' setting is reported instead of crashing the executor."""
+    with pytest.raises(SystemExit):
+        config_jobs({"jobs": jobs})
+    assert "invalid 'jobs' in config" in capsys.readouterr().out
+
+
+def test_upgrade_skipped_when_nothing_is_outdated(capsys):
+    """A manager whose probe finds nothing outdated is not upgraded."""
+    managers = {"npm": {"commands": {"upgrade": ["npm", "update", "-g"]}}}
+    with (
+        patch.object(NpmManager, "outdated_packages", return_value=[]),
+        patch.object(NpmManager, "upgrade") as upgrade,
+    ):
+        run_managers(
+            managers,
+            "upgrade",
+            lambda pm: pm.upgrade(),
+            False,
+            skip_check=upgrade_skip_reason,
+        )
+
+    upgrade.assert_not_called()
+    assert "npm is up to date, skipping upgrade" in capsys.readouterr().out
+
+
+def test_upgrade_runs_when_outdated_or_unknown():
+    """Outdated packages, an unknown answer or a disabled probe run the upgrade."""
+    for outdated, cfg in [
+        (["eslint"], {}),
+        (None, {}),
+        ([], {"probe_outdated": False}),
+    ]:
+        pm = NpmManager(cfg)
+        with patch.object(pm, "outdated_packages", return_value=outdated):
+            assert upgrade_skip_reason(pm) is None
+
+
+def test_parse_update_ttl():
+    """update_ttl accepts seconds or a number with an s/m/h/d unit."""
+    assert freshness.parse_duration(90) == 90
+    assert freshness.parse_duration("30m") == 1800
+    assert freshness.parse_duration("1.5h") == 5400
+    assert freshness.parse_duration("2d") == 172800
+    for invalid in ["soon", "-5", True]:
+        with pytest.raises(ValueError):
+            freshness.parse_duration(invalid)
+
+
+def test_update_skipped_within_ttl(capsys):
+    """A recorded update younger than update_ttl skips the next one."""
+    cfg = {"update_ttl": "1h", "commands": {"update": ["npm", "--version"]}}
+    freshness.record_update("npm", time.time() - 600)
+    with patch.object(NpmManager, "update", return_value=True) as update:
+        update_managers({"package_managers": {"npm": cfg}}, [], False)
+        update.assert_not_called()
+        assert "npm was updated 10m ago, skipping update" in capsys.readouterr().out
+
+        update_managers({"package_managers": {"npm": cfg}}, [], False, force=True)
+        update.assert_called_once()
+
+
+def test_update_runs_when_stale_and_records_success():
+    """An update older than the TTL runs and its success is recorded."""
+    pm = PackageManagerRegistry.get_manager("npm", {"update_ttl": 60})
+    freshness.record_update("npm", time.time() - 3600)
+    assert update_skip_reason(pm) is None
+    with patch.object(pm, "update", return_value=True):
+        assert update_and_record(pm)
+    assert time.time() - freshness.last_update("npm") < 60
+    assert update_skip_reason(pm) is not None
+
+
+def test_update_ttl_uses_apt_lists(tmp_path, monkeypatch):
+    """apt counts a refresh of its lists made outside one-updater."""
+    lists = tmp_path / "lists"
+    lists.mkdir()
+    monkeypatch.setattr(apt, "APT_LISTS", str(lists))
+    monkeypatch.setattr(apt, "APT_UPDATE_STAMP", str(tmp_path / "missing-stamp"))
+    pm = PackageManagerRegistry.get_manager("apt", {"update_ttl": "1h"})
+    assert isinstance(pm, AptManager)
+    assert update_skip_reason(pm).startswith("was updated")
+
+    old = time.time() - 7200
+    os.utime(lists, (old, old))
+    assert update_skip_reason(pm) is None
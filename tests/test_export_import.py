@@ -1,6 +1,7 @@
 """Tests for export/import CLI functionality."""
 
 import json
+import threading
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -12,8 +13,12 @@ from one_updater.cli import (
     import_packages,
     scan_unmanaged_binaries,
 )
+from one_updater.package_managers import cellar
+from one_updater.package_managers.apt import AptManager
+from one_updater.package_managers.base import bisect_batch
 from one_updater.package_managers.brew import HomebrewManager
 from one_updater.package_managers.cargo import CargoManager
+from one_updater.package_managers.npm import NpmManager
 from one_updater.package_managers.pipx import PipxManager
 from one_updater.package_managers.registry import PackageManagerRegistry
 
@@ -36,6 +41,9 @@ def _make_pm(
         pm.install_package.side_effect = lambda name: name not in failed_packages
     else:
         pm.install_package.return_value = True
+    pm.install_packages.side_effect = lambda names: {
+        name: pm.install_package(name) for name in names
+    }
     return pm
 
 
@@ -53,22 +61,26 @@ class TestHomebrewMethods:
         with patch.object(mgr, "is_available", return_value=False):
             assert mgr.list_packages() is None
 
-    def test_list_packages_combines_formulae_and_casks(self) -> None:
+    def test_list_packages_combines_formulae_and_casks(self, monkeypatch) -> None:
         """list_packages concatenates formulae and cask results."""
         mgr = HomebrewManager({})
+        monkeypatch.setattr(cellar, "brew_prefix", lambda: None)
         with (
             patch.object(mgr, "is_available", return_value=True),
             patch.object(
                 mgr,
-                "run_command_with_output",
-                side_effect=[
+                "run_commands_with_output",
+                return_value=[
                     (True, "git\nvim\n", ""),
                     (True, "iterm2\n", ""),
                 ],
-            ),
+            ) as run,
         ):
             result = mgr.list_packages()
         assert result == ["git", "vim", "iterm2"]
+        run.assert_called_once_with(
+            [["brew", "list", "--formula"], ["brew", "list", "--cask"]]
+        )
 
     def test_install_package_calls_brew_install(self) -> None:
         """install_package delegates to brew install <name>."""
@@ -80,17 +92,19 @@ class TestHomebrewMethods:
             assert mgr.install_package("ripgrep") is True
             mock_run.assert_called_once_with(["brew", "install", "ripgrep"])
 
-    def test_is_package_installed_true(self) -> None:
+    def test_is_package_installed_true(self, monkeypatch) -> None:
         """is_package_installed returns True when brew list succeeds."""
         mgr = HomebrewManager({})
+        monkeypatch.setattr(cellar, "brew_prefix", lambda: None)
         with patch.object(
             mgr, "run_command_with_output", return_value=(True, "git\n", "")
         ):
             assert mgr.is_package_installed("git") is True
 
-    def test_is_package_installed_false(self) -> None:
+    def test_is_package_installed_false(self, monkeypatch) -> None:
         """is_package_installed returns False when brew list fails."""
         mgr = HomebrewManager({})
+        monkeypatch.setattr(cellar, "brew_prefix", lambda: None)
         with patch.object(mgr, "run_command_with_output", return_value=(False, "", "")):
             assert mgr.is_package_installed("no-such-pkg") is False
 
@@ -126,6 +140,94 @@ class TestPipxMethods:
             assert mgr.is_package_installed("black") is False
 
 
+class TestInventorySnapshot:
+    """Tests for the per-run installed-package snapshot."""
+
+    def test_list_packages_called_once_for_many_checks(self) -> None:
+        """Repeated is_package_installed calls reuse one enumeration."""
+        mgr = NpmManager({})
+        with patch.object(
+            mgr, "list_packages", return_value=["eslint", "typescript"]
+        ) as mock_list:
+            results = [mgr.is_package_installed(f"pkg{i}") for i in range(50)]
+            assert mgr.is_package_installed("eslint") is True
+        assert not any(results)
+        mock_list.assert_called_once()
+
+    def test_mark_installed_updates_snapshot(self) -> None:
+        """Successful installs are reflected without re-enumerating."""
+        mgr = NpmManager({})
+        with patch.object(mgr, "list_packages", return_value=[]) as mock_list:
+            assert mgr.is_package_installed("prettier") is False
+            mgr.mark_installed("prettier")
+            assert mgr.is_package_installed("prettier") is True
+        mock_list.assert_called_once()
+
+    def test_unavailable_manager_snapshot_is_none(self) -> None:
+        """An unavailable manager yields no snapshot and reports nothing installed."""
+        mgr = NpmManager({})
+        with patch.object(mgr, "list_packages", return_value=None) as mock_list:
+            assert mgr.inventory() is None
+            assert mgr.is_package_installed("eslint") is False
+            mgr.mark_installed("eslint")
+        mock_list.assert_called_once()
+
+
+class TestBatchInstall:
+    """Tests for install_packages and failure bisection."""
+
+    def test_bisect_batch_isolates_failures(self) -> None:
+        """Only the failing names are reported as failed."""
+        calls: list[list[str]] = []
+
+        def _run(batch: list[str]) -> bool:
+            calls.append(batch)
+            return "bad" not in batch
+
+        results = bisect_batch(["a", "b", "bad", "c"], _run)
+        assert results == {"a": True, "b": True, "bad": False, "c": True}
+        assert calls[0] == ["a", "b", "bad", "c"]
+
+    def test_install_packages_single_command(self) -> None:
+        """A batch that succeeds is installed with one native command."""
+        mgr = AptManager({})
+        with (
+            patch.object(mgr, "is_available", return_value=True),
+            patch.object(mgr, "run_command", return_value=True) as mock_run,
+        ):
+            results = mgr.install_packages(["curl", "git", "jq"])
+        assert results == {"curl": True, "git": True, "jq": True}
+        mock_run.assert_called_once_with(
+            ["sudo", "apt-get", "install", "-y", "curl", "git", "jq"]
+        )
+
+    def test_install_packages_marks_snapshot(self) -> None:
+        """Successful installs are added to the inventory snapshot."""
+        mgr = NpmManager({})
+        with (
+            patch.object(mgr, "is_available", return_value=True),
+            patch.object(mgr, "list_packages", return_value=[]),
+            patch.object(
+                mgr, "run_command", side_effect=lambda cmd: "broken" not in cmd
+            ),
+        ):
+            assert mgr.is_package_installed("eslint") is False
+            results = mgr.install_packages(["eslint", "broken"])
+            assert results == {"eslint": True, "broken": False}
+            assert mgr.is_package_installed("eslint") is True
+            assert mgr.is_package_installed("broken") is False
+
+    def test_install_packages_falls_back_per_package(self) -> None:
+        """Managers without a batch command install one package at a time."""
+        mgr = PipxManager({})
+        with patch.object(mgr, "install_package", return_value=True) as mock_install:
+            assert mgr.install_packages(["black", "ruff"]) == {
+                "black": True,
+                "ruff": True,
+            }
+        assert mock_install.call_count == 2
+
+
 class TestHomebrewNegativePaths:
     """Negative-path tests for HomebrewManager."""
 
@@ -266,6 +368,42 @@ class TestExportPackages:
         captured = capsys.readouterr()
         assert "not export-supported" in captured.out
 
+    def test_export_collects_managers_concurrently(self, tmp_path, capsys) -> None:
+        """Managers are enumerated in parallel and merged in sorted order."""
+        barrier = threading.Barrier(3, timeout=5)
+
+        def _get(name: str, _cfg: dict) -> MagicMock:
+            """Return a PM whose listing only finishes once all three overlap."""
+            pm = MagicMock()
+            pm.is_available.return_value = True
+
+            def _list() -> list[str]:
+                if name in ("brew", "cargo", "npm"):
+                    barrier.wait()
+                return [f"{name}-pkg"]
+
+            pm.list_packages.side_effect = _list
+            return pm
+
+        out_file = str(tmp_path / "packages.json")
+        with (
+            patch.object(PackageManagerRegistry, "get_manager", side_effect=_get),
+            patch("one_updater.cli.scan_unmanaged_binaries", return_value=[]),
+        ):
+            export_packages(
+                managers=["npm", "brew", "cargo"],
+                output=out_file,
+                fmt="json",
+                verbose=True,
+                jobs=3,
+            )
+
+        with open(out_file, encoding="utf-8") as f:
+            data = json.load(f)
+        assert list(data) == ["brew", "cargo", "npm"]
+        assert data["npm"] == ["npm-pkg"]
+        assert "slowest" in capsys.readouterr().out
+
     def test_export_to_file_yaml(self, tmp_path) -> None:
         """export_packages writes valid YAML when fmt='yaml' and output given."""
         mock_pm = _make_pm(available=True, packages=["black", "ruff"])
@@ -407,6 +545,37 @@ class TestExportPackagesUnmanagedBinaries:
         assert "git" in captured_args["managed_names"]
         assert "vim" in captured_args["managed_names"]
 
+    def test_each_manager_enumerated_once(self) -> None:
+        """Export targets are not re-enumerated for the unmanaged scan."""
+        created: list[str] = []
+
+        def _get(name: str, _cfg: dict) -> MagicMock:
+            """Return a fresh PM mock and record which manager was created."""
+            created.append(name)
+            return _make_pm(available=True, packages=[f"{name}-pkg"])
+
+        captured_args: dict = {}
+
+        def _capture_scan(managed_names: set, scan_dirs=None) -> list:
+            """Record the managed_names argument and return an empty list."""
+            captured_args["managed_names"] = set(managed_names)
+            return []
+
+        with (
+            patch.object(PackageManagerRegistry, "get_manager", side_effect=_get),
+            patch("one_updater.cli.scan_unmanaged_binaries", side_effect=_capture_scan),
+        ):
+            export_packages(
+                managers=["brew", "npm"],
+                output=None,
+                fmt="yaml",
+                verbose=False,
+                skip=["npm"],
+            )
+        assert sorted(created) == sorted(PackageManagerRegistry.EXPORT_SUPPORTED)
+        assert "npm-pkg" in captured_args["managed_names"]
+        assert "brew-pkg" in captured_args["managed_names"]
+
     def test_unmanaged_section_shown_even_when_no_packages_exported(
         self, capsys
     ) -> None:
@@ -578,6 +747,23 @@ class TestImportPackages:
         assert "failed" in captured.out
         assert "installed" in captured.out
 
+    def test_import_batches_missing_packages(self, tmp_path, capsys) -> None:
+        """Missing packages are passed to install_packages in one call."""
+        data = {"npm": ["eslint", "prettier", "typescript"]}
+        file_path = self._write_export(tmp_path, data)
+        mock_pm = _make_pm(
+            available=True, packages=["typescript"], failed_packages={"prettier"}
+        )
+        with patch.object(PackageManagerRegistry, "get_manager", return_value=mock_pm):
+            import_packages(
+                file_path=file_path, managers=None, dry_run=False, verbose=False
+            )
+        mock_pm.install_packages.assert_called_once_with(["eslint", "prettier"])
+        captured = capsys.readouterr()
+        assert "1 installed" in captured.out
+        assert "1 skipped" in captured.out
+        assert "1 failed" in captured.out
+
     def test_import_verbose_dry_run_shows_table_entries(self, tmp_path, capsys) -> None:
         """verbose+dry_run prints skipped and would-install rows in the table."""
         data = {"brew": ["git", "ripgrep"]}
@@ -0,0 +1,1916 @@
+"""Tests for package manager upgrade and inventory internals."""
+
+import http.server
+import json
+import os
+import socket
+import socketserver
+import sqlite3
+import struct
+import subprocess
+import sys
+import threading
+import time
+from typing import Optional
+from unittest.mock import patch
+
+import pytest
+
+from one_updater.cli import run_package_manager_action
+from one_updater.package_managers import (
+    availability,
+    cargo,
+    cellar,
+    dpkg,
+    freshness,
+    gobuildinfo,
+    goproxy,
+    pacmandb,
+    receipts,
+    rpmdb,
+    snapd,
+    sparseindex,
+)
+from one_updater.package_managers.apt import AptManager
+from one_updater.package_managers.brew import HomebrewManager
+from one_updater.package_managers.cargo import CargoManager
+from one_updater.package_managers.dnf import DnfManager
+from one_updater.package_managers.flatpak import FlatpakManager
+from one_updater.package_managers.gem import GemManager
+from one_updater.package_managers.ghcli import GhCliManager
+from one_updater.package_managers.go import GoManager
+from one_updater.package_managers.krew import KubectlKrewManager
+from one_updater.package_managers.micro import MicroEditorManager
+from one_updater.package_managers.npm import NpmManager
+from one_updater.package_managers.pacman import PacmanManager
+from one_updater.package_managers.pip import PipManager, site_packages_dirs
+from one_updater.package_managers.pipx import PipxManager
+from one_updater.package_managers.snap import SnapManager
+from one_updater.package_managers.uv import UvManager
+from one_updater.package_managers.vagrant import VagrantPluginManager
+
+# The real lookup; conftest replaces it for most tests
+_DEFAULT_GEM_HOMES = receipts._default_gem_homes
+
+
+def _completed(args: list[str], returncode: int = 0, stdout: str = ""):
+    """Build a CompletedProcess like subprocess.run would return."""
+    return subprocess.CompletedProcess(args, returncode, stdout=stdout, stderr="")
+
+
+class TestPipBatchUpgrade:
+    """Tests for PipManager's batched upgrade with failure bisection."""
+
+    OUTDATED = [
+        {"name": "requests", "version": "2.0", "latest_version": "2.31"},
+        {"name": "broken", "version": "1.0", "latest_version": "2.0"},
+        {"name": "rich", "version": "12.0", "latest_version": "13.0"},
+    ]
+
+    def _fake_run(self, calls: list[list[str]]):
+        """Return a subprocess.run stand-in that fails batches containing 'broken'."""
+
+        def _run(args, **_kwargs):
+            if "list" in args:
+                return _completed(args, stdout=json.dumps(self.OUTDATED))
+            calls.append(args)
+            return _completed(args, returncode=1 if "broken" in args else 0)
+
+        return _run
+
+    def test_single_invocation_when_all_succeed(self) -> None:
+        """All outdated packages go to one pip install when none fail."""
+        self.OUTDATED = [
+            p for p in TestPipBatchUpgrade.OUTDATED if p["name"] != "broken"
+        ]
+        calls: list[list[str]] = []
+        mgr = PipManager({})
+        with patch("subprocess.run", side_effect=self._fake_run(calls)):
+            assert mgr._upgrade_environment(["pip"]) is True
+        assert calls == [["pip", "install", "--upgrade", "requests", "rich"]]
+
+    def test_failures_are_bisected(self, caplog) -> None:
+        """A failing package is isolated and the rest are still upgraded."""
+        calls: list[list[str]] = []
+        mgr = PipManager({})
+        with (
+            caplog.at_level("INFO"),
+            patch("subprocess.run", side_effect=self._fake_run(calls)),
+        ):
+            assert mgr._upgrade_environment(["pip"]) is False
+        assert calls[0] == ["pip", "install", "--upgrade", "requests", "broken", "rich"]
+        assert ["pip", "install", "--upgrade", "rich"] in calls
+        assert "Upgraded requests from 2.0 to 2.31" in caplog.text
+        assert "Upgraded rich from 12.0 to 13.0" in caplog.text
+        assert "Failed to upgrade broken" in caplog.text
+
+    def test_batch_upgrade_disabled_runs_per_package(self) -> None:
+        """batch_upgrade: false keeps one pip run per package."""
+        calls: list[list[str]] = []
+        mgr = PipManager({"batch_upgrade": False})
+        with patch("subprocess.run", side_effect=self._fake_run(calls)):
+            mgr._upgrade_environment(["pip"])
+        assert len(calls) == 3
+
+
+class TestPipParallelEnvironments:
+    """Tests for upgrading several pip environments on a worker pool."""
+
+    def test_output_grouped_per_environment(self, tmp_path, caplog) -> None:
+        """Each environment's log lines are emitted together, then one summary."""
+        venvs = []
+        for name in ("venv-a", "venv-b", "venv-c"):
+            pip = tmp_path / name / "bin" / "pip"
+            pip.parent.mkdir(parents=True)
+            pip.write_text("")
+            venvs.append(str(tmp_path / name))
+
+        def _run(args, **_kwargs):
+            if "list" in args:
+                outdated = [{"name": f"pkg-{args[0].split('/')[-3]}", "version": "1"}]
+                return _completed(args, stdout=json.dumps(outdated))
+            return _completed(args)
+
+        mgr = PipManager({"virtualenv": venvs, "parallel_environments": 3})
+        with (
+            caplog.at_level("INFO"),
+            patch("subprocess.run", side_effect=_run),
+        ):
+            assert mgr.upgrade() is True
+
+        messages = [record.getMessage() for record in caplog.records]
+        for index, venv in enumerate(venvs):
+            header = messages.index(f"pip environment {venv}/bin/pip:")
+            name = f"venv-{'abc'[index]}"
+            assert messages[header + 1].strip().startswith(f"Upgraded pkg-{name}")
+        assert (
+            messages[-1] == "pip summary: 3 upgraded, 0 failed across 3 environment(s)"
+        )
+
+    def test_invalid_parallel_environments_upgrade_in_turn(
+        self, tmp_path, caplog
+    ) -> None:
+        venvs = []
+        for name in ("venv-a", "venv-b"):
+            pip = tmp_path / name / "bin" / "pip"
+            pip.parent.mkdir(parents=True)
+            pip.write_text("")
+            venvs.append(str(tmp_path / name))
+        mgr = PipManager({"virtualenv": venvs, "parallel_environments": -1})
+
+        with (
+            patch("subprocess.run", return_value=_completed([], stdout="[]")),
+            patch.object(mgr, "_upgrade_environments_parallel") as parallel,
+        ):
+            assert mgr.upgrade() is True
+
+        parallel.assert_not_called()
+        assert "'parallel_environments'" in caplog.text
+
+
+class TestPipAvailability:
+    """Tests for resolving pip environments without spawning processes."""
+
+    def test_system_pip_is_looked_up_on_path_once(self, monkeypatch) -> None:
+        lookups = []
+        monkeypatch.setattr(
+            availability, "which", lambda name: lookups.append(name) or "/bin/pip"
+        )
+        pm = PipManager({})
+
+        with patch("subprocess.run") as run:
+            assert pm.is_available()
+            assert pm.is_available()
+
+        run.assert_not_called()
+        assert lookups == ["pip"]
+
+    def test_pyenv_root_is_asked_once(self, tmp_path, monkeypatch) -> None:
+        for version in ("3.11.7", "3.12.1"):
+            (tmp_path / "versions" / version / "bin").mkdir(parents=True)
+        monkeypatch.setattr(availability, "which", lambda name: f"/bin/{name}")
+        pm = PipManager({"pyenv_version": ["3.11.7", "3.12.1"]})
+
+        with patch(
+            "subprocess.run", return_value=_completed([], stdout=f"{tmp_path}\n")
+        ) as run:
+            assert pm.is_available()
+            assert pm._get_pip_commands() == [
+                [str(tmp_path / "versions" / "3.11.7" / "bin" / "pip")],
+                [str(tmp_path / "versions" / "3.12.1" / "bin" / "pip")],
+            ]
+
+        run.assert_called_once()
+
+
+class TestPipMetadataInventory:
+    """Tests for reading pip inventories from installed distribution metadata."""
+
+    def _make_venv(self, tmp_path):
+        """Create a virtualenv with one dist-info and one egg-info.
+
+        Its interpreter links to the running Python, so it can report its
+        sys.path like a real virtualenv.
+        """
+        venv = tmp_path / "venv"
+        bin_dir = venv / "bin"
+        python = f"python{sys.version_info.major}.{sys.version_info.minor}"
+        site = venv / "lib" / python / "site-packages"
+        bin_dir.mkdir(parents=True)
+        site.mkdir(parents=True)
+        (venv / "pyvenv.cfg").write_text(
+            f"home = {os.path.dirname(os.path.realpath(sys.executable))}\n"
+            "include-system-site-packages = false\n"
+        )
+        (bin_dir / python).symlink_to(os.path.realpath(sys.executable))
+        pip = bin_dir / "pip"
+        pip.write_text(f"#!{bin_dir / python}\nimport pip\n")
+        dist_info = site / "Typing_Extensions-4.9.0.dist-info"
+        dist_info.mkdir()
+        (dist_info / "METADATA").write_text(
+            "Metadata-Version: 2.1\nName: typing_extensions\nVersion: 4.9.0\n"
+        )
+        egg_info = site / "legacy.pkg-1.0.egg-info"
+        egg_info.mkdir()
+        (egg_info / "PKG-INFO").write_text(
+            "Metadata-Version: 1.0\nName: Legacy.Pkg\nVersion: 1.0\n"
+        )
+        return str(pip)
+
+    def test_environment_index_is_normalized(self, tmp_path) -> None:
+        pip = self._make_venv(tmp_path)
+
+        index = PipManager({"enabled": True}).environment_packages(pip)
+
+        assert index == {
+            "typing-extensions": ("typing_extensions", "4.9.0"),
+            "legacy-pkg": ("Legacy.Pkg", "1.0"),
+        }
+
+    def test_interpreter_is_asked_once(self, tmp_path) -> None:
+        pip = self._make_venv(tmp_path)
+        first = PipManager({"enabled": True}).environment_packages(pip)
+
+        with patch("subprocess.run") as run:
+            second = PipManager({"enabled": True}).environment_packages(pip)
+
+        run.assert_not_called()
+        assert first == second
+
+    def test_system_lookups_do_not_spawn_pip(self, tmp_path) -> None:
+        pip = self._make_venv(tmp_path)
+        pm = PipManager({"enabled": True})
+
+        with (
+            patch(
+                "one_updater.package_managers.pip.availability.which", return_value=pip
+            ),
+            patch.object(pm, "run_command_with_output") as run,
+        ):
+            assert pm.is_package_installed("Typing-Extensions")
+            assert pm.is_package_installed("legacy_pkg")
+            assert not pm.is_package_installed("requests")
+            assert sorted(pm.list_packages()) == ["Legacy.Pkg", "typing_extensions"]
+
+        run.assert_not_called()
+
+    def test_configured_virtualenvs_are_inventoried(self, tmp_path) -> None:
+        first = self._make_venv(tmp_path / "a")
+        second = self._make_venv(tmp_path / "b")
+        site = next((tmp_path / "b" / "venv" / "lib").glob("python*/site-packages"))
+        (site / "rich-13.7.0.dist-info").mkdir()
+        (site / "rich-13.7.0.dist-info" / "METADATA").write_text(
+            "Metadata-Version: 2.1\nName: rich\nVersion: 13.7.0\n"
+        )
+        venvs = [str(tmp_path / "a" / "venv"), str(tmp_path / "b" / "venv")]
+        pm = PipManager({"virtualenv": venvs})
+
+        with patch.object(pm, "run_command", return_value=True) as run:
+            assert sorted(pm.list_packages()) == [
+                "Legacy.Pkg",
+                "rich",
+                "typing_extensions",
+            ]
+            assert pm.is_package_installed("typing-extensions")
+            assert not pm.is_package_installed("rich")
+            assert pm.install_packages(["rich", "httpx"]) == {
+                "rich": True,
+                "httpx": True,
+            }
+
+        assert [call.args[0] for call in run.call_args_list] == [
+            [first, "install", "rich"],
+            [first, "install", "httpx"],
+            [second, "install", "httpx"],
+        ]
+
+    def test_unknown_interpreter_falls_back_to_pip(self, tmp_path) -> None:
+        script = tmp_path / "pip"
+        script.write_text("not a script\n")
+        pm = PipManager({"enabled": True})
+
+        with (
+            patch(
+                "one_updater.package_managers.pip.availability.which",
+                return_value=str(script),
+            ),
+            patch.object(
+                pm, "run_command_with_output", return_value=(True, "", "")
+            ) as run,
+        ):
+            assert pm.is_package_installed("requests")
+
+        run.assert_called_once_with(["pip", "show", "requests"])
+
+    def test_shell_script_shim_falls_back_to_pip(self, tmp_path) -> None:
+        shim = tmp_path / "pip"
+        shim.write_text('#!/usr/bin/env bash\nexec pyenv exec pip "$@"\n')
+
+        assert site_packages_dirs(str(shim)) is None
+
+    def test_prefix_without_site_packages_falls_back_to_pip(self, tmp_path) -> None:
+        pip = tmp_path / "bin" / "pip"
+        pip.parent.mkdir()
+        pip.write_text(f"#!{tmp_path / 'bin' / 'python3'}\n")
+        missing = str(tmp_path / "lib" / "python3" / "site-packages")
+        pm = PipManager({"enabled": True})
+
+        with (
+            patch(
+                "one_updater.package_managers.pip.interpreter_sys_path",
+                return_value=[missing],
+            ),
+            patch(
+                "one_updater.package_managers.pip.availability.which",
+                return_value=str(pip),
+            ),
+            patch.object(
+                pm,
+                "run_command_with_output",
+                return_value=(True, '[{"name": "requests"}]', ""),
+            ) as run,
+        ):
+            assert pm.list_packages() == ["requests"]
+
+        run.assert_called_once_with(["pip", "list", "--format=json"])
+
+
+def _varint(n: int) -> bytes:
+    """Encode *n* as a Go uvarint."""
+    out = bytearray()
+    while n >= 0x80:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+    return bytes(out)
+
+
+def _write_go_binary(
+    path,
+    module: str,
+    version: str = "v1.2.3",
+    package: str = "",
+    settings: bytes = b"",
+) -> None:
+    """Write a file carrying a Go 1.18+ style inline buildinfo blob."""
+    go_version = b"go1.22.3"
+    package = package or f"{module}/cmd/tool"
+    modinfo = (
+        gobuildinfo.MODINFO_START
+        + f"path\t{package}\nmod\t{module}\t{version}\th1:x=\n".encode()
+        + settings
+        + gobuildinfo.MODINFO_END
+    )
+    header = gobuildinfo.BUILDINFO_MAGIC + bytes([8, gobuildinfo.FLAG_INLINE_STRINGS])
+    header = header.ljust(gobuildinfo.BUILDINFO_HEADER_SIZE, b"\0")
+    path.write_bytes(
+        b"\0" * 48
+        + header
+        + _varint(len(go_version))
+        + go_version
+        + _varint(len(modinfo))
+        + modinfo
+    )
+
+
+class TestGoBuildInfo:
+    """Tests for the in-process Go buildinfo reader."""
+
+    def test_reads_module_and_toolchain(self, tmp_path) -> None:
+        binary = tmp_path / "tool"
+        _write_go_binary(binary, "example.com/tool")
+
+        info = gobuildinfo.read_buildinfo(str(binary))
+
+        assert info == gobuildinfo.BuildInfo(
+            "example.com/tool/cmd/tool", "example.com/tool", "v1.2.3", "go1.22.3"
+        )
+
+    def test_non_utf8_build_settings(self, tmp_path) -> None:
+        binary = tmp_path / "tool"
+        _write_go_binary(
+            binary, "example.com/tool", settings=b"build\t-ldflags=-X main.v=\xff\n"
+        )
+
+        info = gobuildinfo.read_all([str(binary)])[str(binary)]
+
+        assert info.module == "example.com/tool"
+
+    def test_non_go_file_returns_none(self, tmp_path) -> None:
+        script = tmp_path / "script"
+        script.write_text("#!/bin/sh\necho hi\n")
+        empty = tmp_path / "empty"
+        empty.write_bytes(b"")
+
+        assert gobuildinfo.read_buildinfo(str(script)) is None
+        assert gobuildinfo.read_buildinfo(str(empty)) is None
+
+    def test_unchanged_binaries_are_served_from_cache(self, tmp_path) -> None:
+        binary = tmp_path / "tool"
+        _write_go_binary(binary, "example.com/tool")
+        gobuildinfo.read_all([str(binary)])
+
+        with patch.object(gobuildinfo, "read_buildinfo") as reader:
+            info = gobuildinfo.read_all([str(binary)])[str(binary)]
+        reader.assert_not_called()
+        assert info.module == "example.com/tool"
+
+        _write_go_binary(binary, "example.com/tool", "v1.3.0.extra")
+        info = gobuildinfo.read_all([str(binary)])[str(binary)]
+        assert info.version == "v1.3.0.extra"
+
+
+class TestGoModuleDiscovery:
+    """Tests for GoManager resolving binaries to module paths."""
+
+    def test_list_packages_without_go_version(self, tmp_path) -> None:
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        _write_go_binary(bin_dir / "tool", "example.com/tool")
+        _write_go_binary(bin_dir / "staticcheck", "honnef.co/go/tools")
+        (bin_dir / "legacy").write_bytes(b"\x7fELF old binary")
+        pm = GoManager({})
+        pm._env = {"GOPATH": str(tmp_path), "GOPROXY": "off"}
+
+        legacy = "legacy: go1.16\n\tmod\texample.com/legacy\tv0.1.0\n"
+
+        with (
+            patch.object(pm, "is_available", return_value=True),
+            patch.object(
+                pm, "run_commands_with_output", return_value=[(True, legacy, "")]
+            ) as run,
+        ):
+            packages = pm.list_packages()
+
+        assert sorted(packages) == [
+            "example.com/legacy",
+            "example.com/tool",
+            "honnef.co/go/tools/cmd/staticcheck",
+        ]
+        run.assert_called_once_with(
+            [["go", "version", "-m", str(bin_dir / "legacy")]],
+            limit=gobuildinfo.DEFAULT_JOBS,
+        )
+
+    def test_upgrade_installs_each_module_once(self, tmp_path) -> None:
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        tools = "golang.org/x/tools"
+        _write_go_binary(bin_dir / "gopls", tools, package=f"{tools}/gopls")
+        _write_go_binary(bin_dir / "goimports", tools, package=f"{tools}/cmd/goimports")
+        _write_go_binary(bin_dir / "tool", "example.com/tool")
+        pm = GoManager({})
+        pm._env = {"GOPATH": str(tmp_path), "GOPROXY": "off"}
+
+        with (
+            patch.object(pm, "is_available", return_value=True),
+            patch.object(
+                pm, "run_command_with_output", return_value=(True, "", "")
+            ) as run,
+        ):
+            assert pm.upgrade()
+
+        assert sorted(call.args[0] for call in run.call_args_list) == [
+            ["go", "install", "example.com/tool/cmd/tool@latest"],
+            [
+                "go",
+                "install",
+                f"{tools}/cmd/goimports@latest",
+                f"{tools}/gopls@latest",
+            ],
+        ]
+
+    def test_failed_module_install_retries_per_binary(self, tmp_path) -> None:
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        _write_go_binary(bin_dir / "a", "example.com/m", package="example.com/m/cmd/a")
+        _write_go_binary(bin_dir / "b", "example.com/m", package="example.com/m/cmd/b")
+        pm = GoManager({})
+        pm._env = {"GOPATH": str(tmp_path), "GOPROXY": "off"}
+
+        with (
+            patch.object(pm, "is_available", return_value=True),
+            patch.object(
+                pm, "run_command_with_output", return_value=(False, "", "boom")
+            ),
+            patch.object(pm, "_try_install_package", return_value=True) as retry,
+        ):
+            assert pm.upgrade()
+
+        assert sorted(call.args for call in retry.call_args_list) == [
+            ("a", "example.com/m"),
+            ("b", "example.com/m"),
+        ]
+
+    def test_invalid_parallel_installs_run_one_at_a_time(self, caplog) -> None:
+        pm = GoManager({"parallel_installs": "four"})
+        tasks = [(["a"], lambda: {"a": True}), (["b"], lambda: {"b": False})]
+
+        with (
+            patch.object(
+                pm, "_install_staged", side_effect=lambda _dir, _bins, run: run()
+            ),
+            patch("one_updater.package_managers.go.ThreadPoolExecutor") as pool,
+        ):
+            assert pm._run_install_tasks("bin", tasks) == {"a": True, "b": False}
+
+        pool.assert_not_called()
+        assert "'parallel_installs'" in caplog.text
+
+    def test_parallel_installs_are_staged_and_moved_atomically(
+        self, tmp_path, caplog
+    ) -> None:
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        _write_go_binary(bin_dir / "a", "example.com/a", package="example.com/a")
+        _write_go_binary(bin_dir / "b", "example.com/b", package="example.com/b")
+        _write_go_binary(bin_dir / "c", "example.com/c", package="example.com/c")
+        pm = GoManager({"parallel_installs": 3})
+        pm._env = {"GOPATH": str(tmp_path), "GOPROXY": "off"}
+        gobins = []
+
+        def _install(args, env=None):
+            gobin = env["GOBIN"]
+            gobins.append(gobin)
+            name = args[2].split("@")[0].rsplit("/", 1)[-1]
+            if name == "c":
+                return False, "", "build failed"
+            (tmp_path / "bin" / gobin / name).write_text("new build")
+            return True, "", ""
+
+        with (
+            patch.object(pm, "is_available", return_value=True),
+            patch.object(pm, "run_command_with_output", side_effect=_install),
+            caplog.at_level("INFO"),
+        ):
+            assert not pm.upgrade()
+
+        assert len(set(gobins)) == 3
+        assert all(os.path.dirname(gobin) == str(bin_dir) for gobin in gobins)
+        assert sorted(os.listdir(bin_dir)) == ["a", "b", "c"]
+        assert (bin_dir / "a").read_text() == "new build"
+        assert (bin_dir / "b").read_text() == "new build"
+        assert (
+            "go summary: 2 upgraded, 0 skipped (up to date), 1 failed (c)"
+            in caplog.text
+        )
+        assert "Failed to install c from example.com/c" in caplog.text
+
+    def test_up_to_date_binaries_are_skipped(self, tmp_path, caplog) -> None:
+        proxy = tmp_path / "proxy"
+        for module, versions in {
+            "example.com/current": "v1.1.0\nv1.2.3\nv1.3.0-rc.1\n",
+            "github.com/!burnt!sushi/toml": "v1.0.0\nv1.4.0\n",
+        }.items():
+            (proxy / module / "@v").mkdir(parents=True)
+            (proxy / module / "@v" / "list").write_text(versions)
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        _write_go_binary(bin_dir / "current", "example.com/current", "v1.2.3")
+        _write_go_binary(
+            bin_dir / "tomlv",
+            "github.com/BurntSushi/toml",
+            "v1.0.0",
+            "github.com/BurntSushi/toml/cmd/tomlv",
+        )
+        _write_go_binary(bin_dir / "private", "corp.example/tool", "v0.1.0")
+        pm = GoManager({})
+        pm._env = {
+            "GOPATH": str(tmp_path),
+            "GOPROXY": f"{proxy.as_uri()},direct",
+            "GONOPROXY": "corp.example",
+        }
+
+        with (
+            patch.object(pm, "is_available", return_value=True),
+            patch.object(
+                pm, "run_command_with_output", return_value=(True, "", "")
+            ) as run,
+            caplog.at_level("INFO"),
+        ):
+            assert pm.upgrade()
+
+        assert sorted(call.args[0] for call in run.call_args_list) == [
+            ["go", "install", "corp.example/tool/cmd/tool@latest"],
+            ["go", "install", "github.com/BurntSushi/toml/cmd/tomlv@latest"],
+        ]
+        assert "2 upgraded, 1 skipped (up to date), 0 failed" in caplog.text
+
+
+class TestGoProxy:
+    """Tests for module proxy version lookups."""
+
+    def test_latest_prefers_releases(self) -> None:
+        assert goproxy._pick_latest(["v1.9.0", "v1.10.0-beta.1", "v1.10.0"]) == (
+            "v1.10.0"
+        )
+        assert goproxy._pick_latest(["v2.0.0-rc.2", "v2.0.0-rc.10"]) == "v2.0.0-rc.10"
+        assert goproxy._pick_latest([]) is None
+
+    def test_proxy_list_stops_at_direct(self) -> None:
+        assert goproxy.proxy_urls(
+            "https://a.example/,file:///srv|direct,https://b"
+        ) == [
+            "https://a.example",
+            "file:///srv",
+        ]
+        assert goproxy.proxy_urls("off") == []
+
+    def test_at_latest_used_when_list_is_empty(self, tmp_path) -> None:
+        module = tmp_path / "example.com" / "untagged" / "@v"
+        module.mkdir(parents=True)
+        (module / "list").write_text("")
+        (module.parent / "@latest").write_text(
+            json.dumps({"Version": "v0.0.0-20240101000000-abcdef123456"})
+        )
+
+        assert goproxy.latest_version("example.com/untagged", [tmp_path.as_uri()]) == (
+            "v0.0.0-20240101000000-abcdef123456"
+        )
+
+
+CRATES_IO = "registry+https://github.com/rust-lang/crates.io-index"
+
+
+def _write_cargo_home(home, installs: dict[str, str], index: dict[str, list]) -> None:
+    """Create a CARGO_HOME with .crates2.json and a registry index cache.
+
+    *installs* maps crate names to installed versions; *index* maps crate
+    names to (version, yanked) pairs in the index cache.
+    """
+    home.mkdir(parents=True, exist_ok=True)
+    (home / ".crates2.json").write_text(
+        json.dumps(
+            {
+                "installs": {
+                    f"{name} {version} ({CRATES_IO})": {"bins": [name]}
+                    for name, version in installs.items()
+                }
+            }
+        )
+    )
+    cache = home / "registry" / "index" / "index.crates.io-6f17d22bba15001f" / ".cache"
+    for name, versions in index.items():
+        path = cache / cargo.index_cache_relpath(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        body = b"\x03\x02\x00\x00\x00etag-123\x00"
+        for version, yanked in versions:
+            entry = {"name": name, "vers": version, "deps": [], "yanked": yanked}
+            body += version.encode() + b"\x00" + json.dumps(entry).encode() + b"\x00"
+        path.write_bytes(body)
+
+
+class _FakeSparseIndex(http.server.ThreadingHTTPServer):
+    """A localhost HTTP server answering like a sparse crate index.
+
+    *crates* maps crate names to (version, yanked) pairs. Each request is
+    recorded with its If-None-Match header.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, crates: dict[str, list]):
+        self.crates = crates
+        self.requests: list[tuple[str, Optional[str]]] = []
+        super().__init__(("127.0.0.1", 0), _FakeSparseIndexHandler)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+
+class _FakeSparseIndexHandler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        etag = self.headers.get("If-None-Match")
+        self.server.requests.append((self.path, etag))
+        name = self.path.rsplit("/", 1)[-1]
+        if name not in self.server.crates:
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = b"".join(
+            json.dumps({"name": name, "vers": version, "yanked": yanked}).encode()
+            + b"\n"
+            for version, yanked in self.server.crates[name]
+        )
+        tag = f'"{len(body)}"'
+        if etag == tag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", tag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def crates_index(monkeypatch):
+    """Serve a fake sparse index in place of crates.io."""
+    server = _FakeSparseIndex({})
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(sparseindex, "CRATES_IO_INDEX", server.url)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestCargoOutdated:
+    """Tests for CargoManager rebuilding only outdated crates."""
+
+    def test_index_cache_paths(self) -> None:
+        assert cargo.index_cache_relpath("a") == "1/a"
+        assert cargo.index_cache_relpath("cc") == "2/cc"
+        assert cargo.index_cache_relpath("bat") == "3/b/bat"
+        assert cargo.index_cache_relpath("RipGrep") == "ri/pg/ripgrep"
+
+    def test_latest_skips_yanked_and_prereleases(self, tmp_path) -> None:
+        _write_cargo_home(
+            tmp_path,
+            {},
+            {
+                "bat": [
+                    ("0.9.0", False),
+                    ("0.10.0", False),
+                    ("0.11.0", True),
+                    ("1.0.0-rc.1", False),
+                ]
+            },
+        )
+        assert cargo.latest_cached_version(str(tmp_path), "bat") == "0.10.0"
+        assert cargo.latest_cached_version(str(tmp_path), "missing") is None
+
+    def test_upgrade_rebuilds_only_outdated(
+        self, tmp_path, monkeypatch, caplog, crates_index
+    ) -> None:
+        home = tmp_path / "cargo"
+        index = {"bat": [("0.24.0", False)], "ripgrep": [("14.1.0", False)]}
+        _write_cargo_home(
+            home, {"bat": "0.24.0", "ripgrep": "13.0.0", "uncached": "1.0.0"}, index
+        )
+        crates_index.crates.update(index)
+        monkeypatch.setenv("CARGO_HOME", str(home))
+        mgr = CargoManager({"commands": {"update": [], "upgrade": []}})
+
+        with (
+            patch.object(mgr, "is_available", return_value=True),
+            patch.object(mgr, "run_command", return_value=True) as run,
+            caplog.at_level("INFO"),
+        ):
+            assert mgr.upgrade()
+
+        installs = [call.args[0] for call in run.call_args_list if call.args[0]]
+        assert installs == [
+            ["cargo", "install", "ripgrep"],
+            ["cargo", "install", "uncached"],
+        ]
+        assert "cargo summary: 2 rebuilt, 1 build(s) avoided, 0 failed" in caplog.text
+
+    def test_upstream_release_beats_stale_local_cache(
+        self, tmp_path, monkeypatch, crates_index
+    ) -> None:
+        home = tmp_path / "cargo"
+        _write_cargo_home(home, {"bat": "0.24.0"}, {"bat": [("0.24.0", False)]})
+        crates_index.crates["bat"] = [("0.24.0", False), ("0.25.0", False)]
+        monkeypatch.setenv("CARGO_HOME", str(home))
+        mgr = CargoManager({"commands": {"update": [], "upgrade": []}})
+
+        with (
+            patch.object(mgr, "is_available", return_value=True),
+            patch.object(mgr, "run_command", return_value=True) as run,
+        ):
+            assert mgr.upgrade()
+
+        installs = [call.args[0] for call in run.call_args_list if call.args[0]]
+        assert installs == [["cargo", "install", "bat"]]
+        assert crates_index.requests == [("/3/b/bat", None)]
+
+    def test_unchanged_index_entries_are_revalidated(self, crates_index) -> None:
+        crates_index.crates["bat"] = [("0.24.0", False), ("0.25.0", True)]
+        url = crates_index.url + "3/b/bat"
+
+        assert sparseindex.fetch_all([url]) == {url: ["0.24.0"]}
+        assert sparseindex.fetch_all([url]) == {url: ["0.24.0"]}
+        (_, first), (_, second) = crates_index.requests
+        assert first is None and second is not None  # answered 304 Not Modified
+        crates_index.crates["bat"].append(("0.26.0", False))
+        assert sparseindex.fetch_all([url]) == {url: ["0.24.0", "0.26.0"]}
+
+    def test_offline_uses_only_cache_refreshed_since_last_run(
+        self, tmp_path, monkeypatch
+    ) -> None:
+        home = tmp_path / "cargo"
+        _write_cargo_home(
+            home,
+            {"bat": "0.24.0", "ripgrep": "14.1.0"},
+            {"bat": [("0.24.0", False)], "ripgrep": [("14.1.0", False)]},
+        )
+        cache = home / "registry" / "index" / "index.crates.io-6f17d22bba15001f"
+        os.utime(cache / ".cache" / "3" / "b" / "bat", (1000, 1000))
+        cargo.save_cache(cargo.UPGRADE_CACHE, {"last_run": 2000})
+        monkeypatch.setenv("CARGO_HOME", str(home))
+        mgr = CargoManager({"commands": {"update": [], "upgrade": []}})
+
+        with (
+            patch.object(mgr, "is_available", return_value=True),
+            patch.object(mgr, "run_command", return_value=True) as run,
+        ):
+            assert mgr.upgrade()
+
+        installs = [call.args[0] for call in run.call_args_list if call.args[0]]
+        assert installs == [["cargo", "install", "bat"]]
+        assert cargo.load_cache(cargo.UPGRADE_CACHE) == {
+            "last_run": freshness.RUN_STARTED
+        }
+
+    def test_missing_metadata_reinstalls_everything(
+        self, tmp_path, monkeypatch
+    ) -> None:
+        monkeypatch.setenv("CARGO_HOME", str(tmp_path))
+        mgr = CargoManager({"commands": {"update": [], "upgrade": []}})
+        listing = "bat v0.24.0:\n    bat\nripgrep v14.1.0:\n    rg\n"
+
+        with (
+            patch.object(mgr, "is_available", return_value=True),
+            patch.object(mgr, "run_command", return_value=True) as run,
+            patch("subprocess.run", return_value=_completed([], stdout=listing)),
+        ):
+            assert mgr.upgrade()
+
+        installs = [call.args[0] for call in run.call_args_list if call.args[0]]
+        assert installs == [
+            ["cargo", "install", "bat"],
+            ["cargo", "install", "ripgrep"],
+        ]
+
+
+class TestCargoSharedTarget:
+    """Tests for cargo installs sharing a persistent target directory."""
+
+    def test_parallel_installs_split_jobs_and_own_a_target(
+        self, tmp_path, monkeypatch, isolated_cache
+    ) -> None:
+        home = tmp_path / "cargo"
+        _write_cargo_home(
+            home, {"bat": "1.0.0", "fd-find": "1.0.0", "ripgrep": "1.0.0"}, {}
+        )
+        monkeypatch.setenv("CARGO_HOME", str(home))
+        mgr = CargoManager(
+            {
+                "commands": {"update": [], "upgrade": []},
+                "shared_target": True,
+                "parallel_installs": 2,
+                "build_jobs": 8,
+            }
+        )
+
+        with (
+            patch.object(mgr, "is_available", return_value=True),
+            patch.object(mgr, "run_command", return_value=True) as run,
+        ):
+            assert mgr.upgrade()
+
+        installs = [call.args[0] for call in run.call_args_list if call.args[0]]
+        assert sorted(command[2] for command in installs) == [
+            "bat",
+            "fd-find",
+            "ripgrep",
+        ]
+        targets = set()
+        for command in installs:
+            assert command[3] == "--target-dir"
+            assert command[5:] == ["--jobs", "4"]
+            targets.add(command[4])
+        root = isolated_cache / "one-updater" / cargo.TARGET_CACHE
+        assert targets <= {str(root / "slot-0"), str(root / "slot-1")}
+
+    @pytest.mark.parametrize("value", ["four", -2, 0, True])
+    def test_invalid_parallel_installs_fall_back_to_one(self, value, caplog) -> None:
+        mgr = CargoManager({"parallel_installs": value, "build_jobs": "lots"})
+
+        with patch.object(mgr, "run_command", return_value=True) as run:
+            assert mgr._install_each(["bat", "ripgrep"]) == []
+
+        assert [call.args[0] for call in run.call_args_list] == [
+            ["cargo", "install", "bat"],
+            ["cargo", "install", "ripgrep"],
+        ]
+        assert "'parallel_installs'" in caplog.text
+        assert "'build_jobs'" in caplog.text
+
+    def test_target_is_only_created_by_an_install(self, isolated_cache) -> None:
+        root = isolated_cache / "one-updater" / cargo.TARGET_CACHE
+        mgr = CargoManager({"shared_target": True})
+
+        with patch.object(mgr, "is_available", return_value=False):
+            assert mgr.install_packages(["bat", "ripgrep"]) == {
+                "bat": False,
+                "ripgrep": False,
+            }
+        assert not root.exists()
+
+        with (
+            patch.object(mgr, "is_available", return_value=True),
+            patch.object(mgr, "run_command", return_value=True) as run,
+        ):
+            assert mgr.install_packages(["bat", "ripgrep"]) == {
+                "bat": True,
+                "ripgrep": True,
+            }
+        run.assert_called_once_with(
+            ["cargo", "install", "bat", "ripgrep", "--target-dir", str(root / "slot-0")]
+        )
+        assert (root / "slot-0").is_dir()
+
+    def test_default_install_is_unchanged(self) -> None:
+        mgr = CargoManager({})
+        assert mgr._install_command(["bat"]) == ["cargo", "install", "bat"]
+
+    def test_eviction_removes_least_recently_built_outputs(
+        self, isolated_cache
+    ) -> None:
+        root = isolated_cache / "one-updater" / cargo.TARGET_CACHE
+        deps = root / "slot-0" / "release" / "deps"
+        deps.mkdir(parents=True)
+        for age, name in enumerate(["libold.rlib", "libmid.rlib", "libnew.rlib"]):
+            (deps / name).write_bytes(b"x" * 1000)
+            os.utime(deps / name, (1000 + age, 1000 + age))
+
+        removed = cargo.evict_target_cache(2000)
+
+        assert removed == [str(deps / "libold.rlib")]
+        assert sorted(os.listdir(deps)) == ["libmid.rlib", "libnew.rlib"]
+
+    def test_eviction_measures_unchanged_directories_once(self, isolated_cache) -> None:
+        root = isolated_cache / "one-updater" / cargo.TARGET_CACHE
+        build = root / "slot-0" / "release" / "build" / "ring-0123"
+        (build / "out").mkdir(parents=True)
+        (build / "out" / "libring.a").write_bytes(b"x" * 1000)
+        fingerprint = root / "slot-0" / "release" / ".fingerprint" / "ring-0123"
+        fingerprint.mkdir(parents=True)
+        (fingerprint / "lib-ring").write_bytes(b"x" * 10)
+        os.utime(build, (1000, 1000))
+
+        with patch.object(cargo, "_tree_size", wraps=cargo._tree_size) as measure:
+            assert cargo.evict_target_cache(10_000) == []
+            assert cargo.evict_target_cache(10_000) == []
+        assert measure.call_count == 2
+
+        assert cargo.evict_target_cache(500) == [str(build)]
+        assert fingerprint.is_dir()
+
+
+class TestCargoInventory:
+    """Tests for reading cargo's install metadata directly."""
+
+    def test_crates2_provides_versions_sources_and_bins(self, tmp_path) -> None:
+        _write_cargo_home(tmp_path, {"ripgrep": "14.1.0"}, {})
+
+        assert cargo.installed_crates(str(tmp_path)) == [
+            cargo.InstalledCrate("ripgrep", "14.1.0", CRATES_IO, ["ripgrep"])
+        ]
+
+    def test_falls_back_to_crates_toml(self, tmp_path) -> None:
+        (tmp_path / ".crates.toml").write_text(
+            "[v1]\n"
+            f'"ripgrep 13.0.0 ({CRATES_IO})" = ["rg"]\n'
+            '"tool 0.1.0 (git+https://example.com/tool#abc123)" = ["tool", "tool-cli"]\n'
+        )
+
+        assert cargo.installed_crates(str(tmp_path)) == [
+            cargo.InstalledCrate("ripgrep", "13.0.0", CRATES_IO, ["rg"]),
+            cargo.InstalledCrate(
+                "tool",
+                "0.1.0",
+                "git+https://example.com/tool#abc123",
+                ["tool", "tool-cli"],
+            ),
+        ]
+
+    def test_metadata_parsed_once_until_it_changes(self, tmp_path) -> None:
+        _write_cargo_home(tmp_path, {"bat": "0.24.0"}, {})
+        with patch.object(cargo, "read_crates2", wraps=cargo.read_crates2) as reader:
+            cargo.installed_crates(str(tmp_path))
+            cargo.installed_crates(str(tmp_path))
+            assert reader.call_count == 1
+            _write_cargo_home(tmp_path, {"bat": "0.24.0", "fd-find": "10.0.0"}, {})
+            crates = cargo.installed_crates(str(tmp_path))
+        assert reader.call_count == 2
+        assert [crate.name for crate in crates] == ["bat", "fd-find"]
+
+    def test_lookups_do_not_run_cargo(self, tool_homes) -> None:
+        _write_cargo_home(
+            tool_homes / "cargo", {"bat": "0.24.0", "ripgrep": "14.1.0"}, {}
+        )
+        mgr = CargoManager({})
+
+        with (
+            patch.object(mgr, "is_available", return_value=True),
+            patch.object(mgr, "run_command_with_output") as run,
+        ):
+            assert mgr.list_packages() == ["bat", "ripgrep"]
+            assert mgr.is_package_installed("ripgrep")
+            assert not mgr.is_package_installed("fd-find")
+
+        run.assert_not_called()
+
+
+DPKG_STATUS = """\
+Package: dpkg
+Status: install ok installed
+Architecture: amd64
+Version: 1.21.22
+Description: Debian package management system
+ This package provides the low-level infrastructure.
+
+Package: curl
+Status: install ok installed
+Architecture: amd64
+Version: 7.88.1-10
+
+Package: ca-certificates
+Status: install ok installed
+Architecture: all
+Version: 20230311
+
+Package: libc6
+Status: install ok installed
+Architecture: i386
+Version: 2.36-9
+
+Package: removed-tool
+Status: deinstall ok config-files
+Architecture: amd64
+Version: 1.0
+"""
+
+EXTENDED_STATES = """\
+Package: ca-certificates
+Architecture: amd64
+Auto-Installed: 1
+
+Package: libc6
+Architecture: i386
+Auto-Installed: 1
+"""
+
+
+class TestDpkgStatus:
+    """Tests for the dpkg status database reader."""
+
+    def _write(self, tmp_path):
+        status = tmp_path / "status"
+        states = tmp_path / "extended_states"
+        status.write_text(DPKG_STATUS)
+        states.write_text(EXTENDED_STATES)
+        return str(status), str(states)
+
+    def test_index_versions_and_manual_marks(self, tmp_path) -> None:
+        status, states = self._write(tmp_path)
+
+        index = dpkg.installed_packages(status, states)
+
+        assert index == {
+            "dpkg": dpkg.DpkgPackage("dpkg", "amd64", "1.21.22", True),
+            "curl": dpkg.DpkgPackage("curl", "amd64", "7.88.1-10", True),
+            "ca-certificates": dpkg.DpkgPackage(
+                "ca-certificates", "all", "20230311", False
+            ),
+            "libc6:i386": dpkg.DpkgPackage("libc6", "i386", "2.36-9", False),
+        }
+        assert dpkg.lookup(index, "curl:amd64")
+        assert dpkg.lookup(index, "libc6:i386")
+        assert not dpkg.lookup(index, "libc6")
+        assert not dpkg.lookup(index, "removed-tool")
+
+    def test_index_rebuilt_only_when_files_change(self, tmp_path) -> None:
+        status, states = self._write(tmp_path)
+        with patch.object(dpkg, "read_index", wraps=dpkg.read_index) as reader:
+            dpkg.installed_packages(status, states)
+            dpkg.installed_packages(status, states)
+            assert reader.call_count == 1
+            with open(states, "a", encoding="utf-8") as f:
+                f.write("\nPackage: curl\nArchitecture: amd64\nAuto-Installed: 1\n")
+            index = dpkg.installed_packages(status, states)
+        assert reader.call_count == 2
+        assert not index["curl"].manual
+
+    def test_apt_lookups_do_not_spawn_processes(self, tmp_path) -> None:
+        status, states = self._write(tmp_path)
+        mgr = AptManager({})
+
+        with (
+            patch.object(mgr, "is_available", return_value=True),
+            patch.object(
+                dpkg, "installed_packages", lambda: dpkg.read_index(status, states)
+            ),
+            patch.object(mgr, "run_command_with_output") as run,
+        ):
+            assert mgr.list_packages() == ["curl", "dpkg"]
+            assert mgr.is_package_installed("ca-certificates")
+            assert not mgr.is_package_installed("removed-tool")
+
+        run.assert_not_called()
+
+
+def _rpm_header(tags: dict[int, str]) -> bytes:
+    """Build an RPM header blob holding string *tags*."""
+    index = b""
+    data = b""
+    for tag, value in tags.items():
+        index += struct.pack(">iiii", tag, rpmdb.RPM_STRING_TYPE, len(data), 1)
+        data += value.encode() + b"\0"
+    return struct.pack(">ii", len(tags), len(data)) + index + data
+
+
+class TestNativeDatabases:
+    """Tests for the RPM and pacman local database readers."""
+
+    def test_rpmdb_index(self, tmp_path) -> None:
+        path = str(tmp_path / "rpmdb.sqlite")
+        connection = sqlite3.connect(path)
+        connection.execute(
+            "CREATE TABLE Packages (hnum INTEGER PRIMARY KEY AUTOINCREMENT, blob BLOB NOT NULL)"
+        )
+        for name, version, release in [
+            ("bash", "5.2.26", "3.fc40"),
+            ("gpg-pubkey", "a15b79cc", "63d04c2c"),
+            ("git-core", "2.45.2", "2.fc40"),
+        ]:
+            blob = _rpm_header(
+                {
+                    rpmdb.RPMTAG_NAME: name,
+                    rpmdb.RPMTAG_VERSION: version,
+                    rpmdb.RPMTAG_RELEASE: release,
+                    rpmdb.RPMTAG_ARCH: "x86_64",
+                }
+            )
+            connection.execute("INSERT INTO Packages (blob) VALUES (?)", (blob,))
+        connection.commit()
+        connection.close()
+
+        index = rpmdb.installed_packages((str(tmp_path / "missing.sqlite"), path))
+
+        assert index == {
+            "bash": rpmdb.RpmPackage("bash", "5.2.26-3.fc40", "x86_64"),
+            "git-core": rpmdb.RpmPackage("git-core", "2.45.2-2.fc40", "x86_64"),
+        }
+        with patch.object(rpmdb, "read_index") as reader:
+            assert rpmdb.installed_packages((path,)) == index
+        reader.assert_not_called()
+
+    def test_missing_rpmdb_returns_none(self, tmp_path) -> None:
+        assert rpmdb.installed_packages((str(tmp_path / "rpmdb.sqlite"),)) is None
+
+    def test_pacman_local_db(self, tmp_path) -> None:
+        local = tmp_path / "local"
+        for name, version, reason in [
+            ("git", "2.45.2-1", None),
+            ("zlib", "1:1.3.1-1", "1"),
+        ]:
+            entry = local / f"{name}-{version}"
+            entry.mkdir(parents=True)
+            desc = f"%NAME%\n{name}\n\n%VERSION%\n{version}\n\n"
+            if reason:
+                desc += f"%REASON%\n{reason}\n\n"
+            (entry / "desc").write_text(desc)
+        (local / "ALPM_DB_VERSION").write_text("9\n")
+
+        index = pacmandb.installed_packages(str(local))
+
+        assert index == {
+            "git": pacmandb.PacmanPackage("git", "2.45.2-1", True),
+            "zlib": pacmandb.PacmanPackage("zlib", "1:1.3.1-1", False),
+        }
+
+    def test_pacman_manager_uses_local_db(self, tmp_path) -> None:
+        index = {
+            "git": pacmandb.PacmanPackage("git", "2.45.2-1", True),
+            "zlib": pacmandb.PacmanPackage("zlib", "1:1.3.1-1", False),
+        }
+        mgr = PacmanManager({})
+
+        with (
+            patch.object(mgr, "is_available", return_value=True),
+            patch.object(pacmandb, "installed_packages", return_value=index),
+            patch.object(mgr, "run_command_with_output") as run,
+        ):
+            assert mgr.list_packages() == ["git"]
+            assert mgr.is_package_installed("zlib")
+            assert not mgr.is_package_installed("vim")
+
+        run.assert_not_called()
+
+
+class TestHomebrewCellar:
+    """Tests for reading installed Homebrew packages from the prefix."""
+
+    def _make_prefix(self, tmp_path):
+        prefix = tmp_path / "homebrew"
+        for name, versions, linked, on_request in [
+            ("git", ["2.44.0", "2.45.2"], "2.45.2", True),
+            ("pcre2", ["10.44"], None, False),
+        ]:
+            for version in versions:
+                keg = prefix / "Cellar" / name / version
+                keg.mkdir(parents=True)
+                (keg / "INSTALL_RECEIPT.json").write_text(
+                    json.dumps({"installed_on_request": on_request})
+                )
+            if linked:
+                (prefix / "opt").mkdir(exist_ok=True)
+                (prefix / "opt" / name).symlink_to(prefix / "Cellar" / name / linked)
+        (prefix / "Caskroom" / "iterm2" / "3.5.2").mkdir(parents=True)
+        (prefix / "Caskroom" / "iterm2" / ".metadata").mkdir()
+        return prefix
+
+    def test_index_from_cellar_and_caskroom(self, tmp_path, monkeypatch) -> None:
+        prefix = self._make_prefix(tmp_path)
+        monkeypatch.setenv("HOMEBREW_PREFIX", str(prefix))
+
+        assert cellar.installed_packages() == {
+            "git": cellar.BrewPackage("git", "2.45.2", False, True),
+            "pcre2": cellar.BrewPackage("pcre2", "10.44", False, False),
+            "iterm2": cellar.BrewPackage("iterm2", "3.5.2", True, True),
+        }
+
+    def test_prefix_from_brew_on_path(self, tmp_path, monkeypatch) -> None:
+        prefix = self._make_prefix(tmp_path)
+        monkeypatch.delenv("HOMEBREW_PREFIX", raising=False)
+        with patch.object(
+            cellar.availability, "which", return_value=str(prefix / "bin" / "brew")
+        ):
+            assert cellar.brew_prefix() == str(prefix)
+        with patch.object(cellar.availability, "which", return_value=None):
+            assert cellar.brew_prefix() is None
+
+    def test_lookups_do_not_run_brew(self, tmp_path, monkeypatch) -> None:
+        monkeypatch.setenv("HOMEBREW_PREFIX", str(self._make_prefix(tmp_path)))
+        mgr = HomebrewManager({})
+
+        with (
+            patch.object(mgr, "is_available", return_value=True),
+            patch.object(mgr, "run_command_with_output") as run,
+        ):
+            assert mgr.list_packages() == ["git", "pcre2", "iterm2"]
+            assert mgr.is_package_installed("homebrew/core/git")
+            assert mgr.is_package_installed("iterm2")
+            assert not mgr.is_package_installed("vim")
+
+        run.assert_not_called()
+
+
+class TestReceiptInventories:
+    """Tests for npm, gem, pipx and uv inventories read from install receipts."""
+
+    def test_npm_global_packages(self, tool_homes) -> None:
+        root = tool_homes / "npm" / "lib" / "node_modules"
+        for name, version in [
+            ("npm", "10.8.2"),
+            ("eslint", "9.5.0"),
+            ("@vue/cli", "5.0.8"),
+        ]:
+            (root / name).mkdir(parents=True)
+            (root / name / "package.json").write_text(
+                json.dumps({"name": name, "version": version})
+            )
+        (root / ".bin").mkdir()
+
+        assert receipts.npm_packages() == {
+            "@vue/cli": "5.0.8",
+            "eslint": "9.5.0",
+            "npm": "10.8.2",
+        }
+
+    def test_gem_specifications(self, tool_homes) -> None:
+        specs = tool_homes / "gem" / "specifications"
+        (specs / "default").mkdir(parents=True)
+        for spec in [
+            "rake-13.0.6.gemspec",
+            "rake-13.2.1.gemspec",
+            "nokogiri-1.16.6-x86_64-linux.gemspec",
+            "net-http-0.4.1.gemspec",
+        ]:
+            (specs / spec).write_text("")
+        (specs / "default" / "json-2.7.1.gemspec").write_text("")
+
+        assert receipts.gem_packages() == {
+            "json": "2.7.1",
+            "net-http": "0.4.1",
+            "nokogiri": "1.16.6",
+            "rake": "13.2.1",
+        }
+
+    def test_gem_home_and_default_dir(self, tool_homes, monkeypatch) -> None:
+        gem_home = tool_homes / "gem-home" / "specifications"
+        gem_home.mkdir(parents=True)
+        (gem_home / "rails-7.1.3.gemspec").write_text("")
+        default = tool_homes / "gem-default" / "specifications"
+        (default / "default").mkdir(parents=True)
+        (default / "minitest-5.20.0.gemspec").write_text("")
+        (default / "default" / "json-2.7.1.gemspec").write_text("")
+        monkeypatch.setenv("GEM_HOME", str(tool_homes / "gem-home"))
+
+        assert receipts.gem_packages() == {
+            "json": "2.7.1",
+            "minitest": "5.20.0",
+            "rails": "7.1.3",
+        }
+        assert receipts.gem_spec_dirs() == [
+            str(gem_home),
+            str(default),
+            str(default / "default"),
+        ]
+
+    def test_system_ruby_gems_outside_the_gem_prefix(
+        self, tmp_path, tool_homes, monkeypatch
+    ) -> None:
+        # Debian layout: /usr/bin/gem, defaults in /usr/lib/ruby/gems/X and
+        # `gem install` writing to /var/lib/gems/X
+        usr = tmp_path / "usr"
+        system = usr / "lib" / "ruby" / "gems" / "3.1.0" / "specifications"
+        (system / "default").mkdir(parents=True)
+        (system / "default" / "json-2.6.1.gemspec").write_text("")
+        var = tmp_path / "var" / "lib" / "gems" / "3.1.0"
+        (var / "specifications").mkdir(parents=True)
+        (var / "specifications" / "rails-7.1.3.gemspec").write_text("")
+        (usr / "bin").mkdir()
+        (usr / "bin" / "gem").write_text("#!/usr/bin/ruby\n")
+        ruby = usr / "bin" / "ruby"
+        ruby.write_text(f"#!/bin/sh\necho {var}\necho {system.parent}\n")
+        ruby.chmod(0o755)
+        monkeypatch.setattr(receipts, "_default_gem_homes", _DEFAULT_GEM_HOMES)
+        monkeypatch.setattr(
+            receipts.availability, "which", lambda name: str(usr / "bin" / name)
+        )
+
+        assert receipts.gem_packages() == {"json": "2.6.1", "rails": "7.1.3"}
+        with patch("subprocess.run") as run:
+            assert receipts.gem_spec_dirs() == [
+                str(var / "specifications"),
+                str(system),
+                str(system / "default"),
+            ]
+        run.assert_not_called()
+
+    def test_unknown_gem_dirs_fall_back_to_cli(self, tmp_path, monkeypatch) -> None:
+        (tmp_path / "gem").write_text("#!/usr/bin/ruby\n")
+        monkeypatch.setattr(receipts, "_default_gem_homes", _DEFAULT_GEM_HOMES)
+        monkeypatch.setattr(
+            receipts.availability,
+            "which",
+            lambda name: str(tmp_path / "gem") if name == "gem" else None,
+        )
+
+        assert receipts.gem_spec_dirs() is None
+
+    def test_pipx_metadata(self, tool_homes) -> None:
+        venv = tool_homes / "pipx" / "venvs" / "black"
+        venv.mkdir(parents=True)
+        (venv / "pipx_metadata.json").write_text(
+            json.dumps(
+                {"main_package": {"package": "black", "package_version": "24.4.2"}}
+            )
+        )
+
+        assert receipts.pipx_packages() == {"black": "24.4.2"}
+
+    def test_uv_receipts(self, tool_homes) -> None:
+        tool = tool_homes / "uv" / "ruff"
+        dist_info = (
+            tool / "lib" / "python3.12" / "site-packages" / "ruff-0.5.0.dist-info"
+        )
+        dist_info.mkdir(parents=True)
+        (dist_info / "METADATA").write_text(
+            "Metadata-Version: 2.1\nName: ruff\nVersion: 0.5.0\n"
+        )
+        (tool / "uv-receipt.toml").write_text(
+            '[tool]\nrequirements = [{ name = "ruff" }]\n'
+        )
+
+        assert receipts.uv_tools() == {"ruff": "0.5.0"}
+
+    def test_results_reused_until_directory_changes(self, tool_homes) -> None:
+        venvs = tool_homes / "pipx" / "venvs"
+        venvs.mkdir(parents=True)
+        with patch.object(
+            receipts, "read_pipx_venvs", wraps=receipts.read_pipx_venvs
+        ) as reader:
+            assert receipts.pipx_packages() == {}
+            assert receipts.pipx_packages() == {}
+            assert reader.call_count == 1
+            (venvs / "black").mkdir()
+            (venvs / "black" / "pipx_metadata.json").write_text(
+                json.dumps(
+                    {"main_package": {"package": "black", "package_version": "24.4.2"}}
+                )
+            )
+            os.utime(venvs, ns=(0, os.stat(venvs).st_mtime_ns + 1))
+            assert receipts.pipx_packages() == {"black": "24.4.2"}
+        assert reader.call_count == 2
+
+    def test_managers_do_not_run_their_cli(self, tool_homes) -> None:
+        (tool_homes / "npm" / "lib" / "node_modules" / "eslint").mkdir(parents=True)
+        (
+            tool_homes / "npm" / "lib" / "node_modules" / "eslint" / "package.json"
+        ).write_text("{}")
+        (tool_homes / "gem" / "specifications").mkdir(parents=True)
+        (tool_homes / "gem" / "specifications" / "rake-13.2.1.gemspec").write_text("")
+        (tool_homes / "pipx" / "venvs").mkdir(parents=True)
+        (tool_homes / "uv").mkdir()
+
+        for mgr, installed in [
+            (NpmManager({}), "eslint"),
+            (GemManager({}), "rake"),
+            (PipxManager({}), None),
+            (UvManager({}), None),
+        ]:
+            with (
+                patch.object(mgr, "is_available", return_value=True),
+                patch.object(mgr, "run_command_with_output") as run,
+            ):
+                assert mgr.list_packages() == ([installed] if installed else [])
+                if installed:
+                    assert mgr.is_package_installed(installed)
+                assert not mgr.is_package_installed("missing")
+            run.assert_not_called()
+
+
+class TestDirectoryInventories:
+    """Tests for flatpak, krew, gh, micro and vagrant directory inventories."""
+
+    def test_flatpak_user_and_system_apps(self, tool_homes) -> None:
+        for installation, app_id in [
+            ("flatpak-user", "org.gimp.GIMP"),
+            ("flatpak-system", "org.mozilla.firefox"),
+        ]:
+            app = tool_homes / installation / "app" / app_id
+            (app / "x86_64" / "stable").mkdir(parents=True)
+            (app / "current").symlink_to("x86_64/stable")
+        # An app directory without a current deployment is not installed
+        (tool_homes / "flatpak-system" / "app" / "org.example.Removed").mkdir()
+
+        assert receipts.flatpak_apps() == {
+            "org.gimp.GIMP": "stable",
+            "org.mozilla.firefox": "stable",
+        }
+
+    def test_krew_receipts(self, tool_homes) -> None:
+        receipts_dir = tool_homes / "krew" / "receipts"
+        receipts_dir.mkdir(parents=True)
+        (receipts_dir / "ctx.yaml").write_text(
+            "metadata:\n  name: ctx\nspec:\n  version: v0.9.5\n"
+            "status:\n  source:\n    name: default\n"
+        )
+        (receipts_dir / "foo.yaml").write_text(
+            "metadata:\n  name: foo\nspec:\n  version: v1.0.0\n"
+            "status:\n  source:\n    name: custom\n"
+        )
+
+        assert receipts.krew_plugins() == {"ctx": "v0.9.5", "custom/foo": "v1.0.0"}
+
+    def test_gh_binary_and_git_extensions(self, tool_homes) -> None:
+        extensions = tool_homes / "gh" / "extensions"
+        (extensions / "gh-dash").mkdir(parents=True)
+        (extensions / "gh-dash" / "manifest.yml").write_text(
+            "owner: dlvhdr\nname: gh-dash\nhost: github.com\ntag: v4.0.0\n"
+        )
+        (extensions / "gh-poi" / ".git").mkdir(parents=True)
+        (extensions / "gh-poi" / ".git" / "config").write_text(
+            '[core]\n\tbare = false\n[remote "origin"]\n'
+            "\turl = https://github.com/seachicken/gh-poi.git\n"
+        )
+        (extensions / "gh-ssh" / ".git").mkdir(parents=True)
+        (extensions / "gh-ssh" / ".git" / "config").write_text(
+            '[remote "origin"]\n\turl = git@github.com:owner/gh-ssh.git\n'
+        )
+
+        assert receipts.gh_extensions() == {
+            "dlvhdr/gh-dash": "v4.0.0",
+            "owner/gh-ssh": "",
+            "seachicken/gh-poi": "",
+        }
+
+    def test_micro_and_vagrant_plugins(self, tool_homes) -> None:
+        for plugin in ["filemanager", "fzf"]:
+            (tool_homes / "micro" / "plug" / plugin).mkdir(parents=True)
+        (tool_homes / "vagrant").mkdir()
+        (tool_homes / "vagrant" / "plugins.json").write_text(
+            json.dumps(
+                {
+                    "version": "1",
+                    "installed": {
+                        "vagrant-vbguest": {"installed_gem_version": "0.32.0"}
+                    },
+                }
+            )
+        )
+
+        assert receipts.micro_plugins() == {"filemanager": "", "fzf": ""}
+        assert receipts.vagrant_plugins() == {"vagrant-vbguest": "0.32.0"}
+
+    def test_managers_do_not_run_their_cli(self, tool_homes) -> None:
+        app = tool_homes / "flatpak-user" / "app" / "org.gimp.GIMP"
+        app.mkdir(parents=True)
+        (app / "current").symlink_to(".")
+        (tool_homes / "krew" / "receipts").mkdir(parents=True)
+        (tool_homes / "krew" / "receipts" / "ctx.yaml").write_text(
+            "metadata:\n  name: ctx\n"
+        )
+        (tool_homes / "gh" / "extensions").mkdir(parents=True)
+        (tool_homes / "micro" / "plug" / "fzf").mkdir(parents=True)
+        (tool_homes / "vagrant").mkdir()
+        (tool_homes / "vagrant" / "plugins.json").write_text('{"installed": {}}')
+
+        for mgr, expected in [
+            (FlatpakManager({}), ["org.gimp.GIMP"]),
+            (KubectlKrewManager({}), ["ctx"]),
+            (GhCliManager({}), []),
+            (MicroEditorManager({}), ["fzf"]),
+            (VagrantPluginManager({}), []),
+        ]:
+            with (
+                patch.object(mgr, "is_available", return_value=True),
+                patch.object(mgr, "run_command_with_output") as run,
+            ):
+                assert mgr.list_packages() == expected
+            run.assert_not_called()
+
+    def test_missing_directories_fall_back_to_the_cli(self, tool_homes) -> None:
+        mgr = MicroEditorManager({})
+        with (
+            patch.object(mgr, "is_available", return_value=True),
+            patch.object(
+                mgr,
+                "run_command_with_output",
+                return_value=(True, "The following plugins are installed:\nfzf\n", ""),
+            ) as run,
+        ):
+            mgr.list_packages()
+        run.assert_called_once()
+
+
+class _FakeSnapd(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """A unix-socket HTTP server answering like snapd.
+
+    *routes* maps "METHOD /path" to (status, response document). Each
+    accepted connection and request is recorded.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path: str, routes: dict):
+        self.routes = routes
+        self.connections = 0
+        self.requests: list[tuple[str, str, Optional[dict]]] = []
+        super().__init__(path, _FakeSnapdHandler)
+
+
+class _FakeSnapdHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep connections alive
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.connections += 1
+
+    def address_string(self) -> str:
+        return "snapd-client"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _respond(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        self.server.requests.append((self.command, self.path, body))
+        route = self.server.routes.get(f"{self.command} {self.path}")
+        if callable(route):
+            route = route()
+        status, document = route or (
+            404,
+            {"type": "error", "status-code": 404, "result": {"kind": "not-found"}},
+        )
+        payload = json.dumps(document).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = _respond
+
+
+def _sync(result) -> tuple[int, dict]:
+    return 200, {"type": "sync", "status-code": 200, "result": result}
+
+
+class TestSnapdClient:
+    """Tests for the snapd API client and SnapManager's use of it."""
+
+    @pytest.fixture
+    def serve(self, tmp_path, monkeypatch):
+        """Start a fake snapd on a socket and point the client at it."""
+        path = str(tmp_path / "snapd.socket")
+        monkeypatch.setattr(snapd, "SNAPD_SOCKET", path)
+        monkeypatch.setattr(snapd, "_clients", {})
+        servers = []
+
+        def _serve(routes: dict) -> _FakeSnapd:
+            server = _FakeSnapd(path, routes)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            servers.append(server)
+            return server
+
+        yield _serve
+        for client in snapd._clients.values():
+            client.close()
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+    def test_inventory_reuses_one_connection(self, serve) -> None:
+        server = serve(
+            {
+                "GET /v2/snaps": _sync(
+                    [{"name": "core22"}, {"name": "snapd"}, {"name": "firefox"}]
+                ),
+                "GET /v2/snaps/firefox": _sync({"name": "firefox"}),
+                "GET /v2/snaps/missing": (
+                    404,
+                    {
+                        "type": "error",
+                        "status-code": 404,
+                        "result": {"kind": "snap-not-found", "message": "not found"},
+                    },
+                ),
+            },
+        )
+        mgr = SnapManager({})
+        with (
+            patch.object(mgr, "is_available", return_value=True),
+            patch.object(mgr, "run_command_with_output") as run,
+        ):
+            assert mgr.list_packages() == ["core22", "firefox"]
+            assert mgr.is_package_installed("firefox")
+            assert not mgr.is_package_installed("missing")
+        run.assert_not_called()
+        assert len(server.requests) == 3
+        assert server.connections == 1
+
+    def test_refresh_candidates(self, serve) -> None:
+        serve(
+            {"GET /v2/find?select=refresh": _sync([{"name": "firefox"}])},
+        )
+        mgr = SnapManager({})
+        with patch.object(mgr, "is_available", return_value=True):
+            assert mgr.outdated_packages() == ["firefox"]
+
+    def test_refresh_polls_change_until_ready(self, serve) -> None:
+        polls = iter(
+            [
+                _sync({"id": "7", "status": "Doing", "ready": False}),
+                _sync({"id": "7", "status": "Done", "ready": True}),
+            ]
+        )
+        server = serve(
+            {
+                "POST /v2/snaps": (
+                    202,
+                    {"type": "async", "status-code": 202, "change": "7"},
+                ),
+                "GET /v2/changes/7": lambda: next(polls),
+            },
+        )
+        client = snapd.client()
+        change_id = client.refresh(["firefox"])
+        assert client.wait_change(change_id, interval=0)["status"] == "Done"
+        assert server.requests[0] == (
+            "POST",
+            "/v2/snaps",
+            {"action": "refresh", "snaps": ["firefox"]},
+        )
+        assert server.connections == 1
+
+    def _upgrade_from_cli(self, capsys) -> tuple[str, object]:
+        """Run `upgrade` for snap as root the way the CLI does."""
+        cfg = {"commands": {"upgrade": ["sudo", "snap", "refresh"]}}
+        with (
+            patch("os.geteuid", return_value=0),
+            patch.object(SnapManager, "is_available", return_value=True),
+            patch.object(SnapManager, "run_command", return_value=True) as run,
+        ):
+            run_package_manager_action(
+                "snap", cfg, "upgrade", lambda pm: pm.upgrade(), False
+            )
+        return capsys.readouterr().out, run
+
+    def test_cli_upgrade_refreshes_through_snapd(self, serve, capsys) -> None:
+        server = serve(
+            {
+                "POST /v2/snaps": (
+                    202,
+                    {"type": "async", "status-code": 202, "change": "7"},
+                ),
+                "GET /v2/changes/7": _sync({"status": "Done", "ready": True}),
+            }
+        )
+
+        output, run = self._upgrade_from_cli(capsys)
+
+        run.assert_not_called()
+        assert "snap upgraded successfully" in output
+        assert [r[:2] for r in server.requests] == [
+            ("POST", "/v2/snaps"),
+            ("GET", "/v2/changes/7"),
+        ]
+
+    def test_lost_change_is_reported_not_retried(self, serve, capsys) -> None:
+        serve(
+            {
+                "POST /v2/snaps": (
+                    202,
+                    {"type": "async", "status-code": 202, "change": "7"},
+                ),
+                "GET /v2/changes/7": (
+                    500,
+                    {"type": "error", "status-code": 500, "result": {}},
+                ),
+            }
+        )
+
+        output, run = self._upgrade_from_cli(capsys)
+
+        run.assert_not_called()
+        assert "snap upgrade failed" in output
+
+    def test_rejected_refresh_falls_back_to_cli(self, serve, capsys) -> None:
+        serve(
+            {
+                "POST /v2/snaps": (
+                    401,
+                    {"type": "error", "status-code": 401, "result": {}},
+                )
+            }
+        )
+
+        output, run = self._upgrade_from_cli(capsys)
+
+        run.assert_called_once_with(["sudo", "snap", "refresh"])
+        assert "snap upgraded successfully" in output
+
+    def test_reconnects_after_server_closes(self, serve) -> None:
+        server = serve({"GET /v2/snaps": _sync([])})
+        client = snapd.client()
+        assert client.snaps() == []
+        # Simulate snapd dropping the idle keep-alive connection
+        client._conn.sock.shutdown(socket.SHUT_RDWR)
+        assert client.snaps() == []
+        assert server.connections == 2
+
+    def test_refresh_is_sent_once_on_a_fresh_connection(self, serve) -> None:
+        server = serve(
+            {
+                "GET /v2/snaps": _sync([]),
+                "POST /v2/snaps": (
+                    202,
+                    {"type": "async", "status-code": 202, "change": "7"},
+                ),
+            }
+        )
+        client = snapd.client()
+        assert client.snaps() == []
+        client._conn.sock.shutdown(socket.SHUT_RDWR)
+        assert client.refresh() == "7"
+        assert [r[:2] for r in server.requests] == [
+            ("GET", "/v2/snaps"),
+            ("POST", "/v2/snaps"),
+        ]
+        assert server.connections == 2
+
+    def test_missing_socket_falls_back_to_cli(self, tmp_path, monkeypatch) -> None:
+        monkeypatch.setattr(snapd, "SNAPD_SOCKET", str(tmp_path / "missing.socket"))
+        mgr = SnapManager({})
+        with (
+            patch.object(mgr, "is_available", return_value=True),
+            patch.object(
+                mgr,
+                "run_command_with_output",
+                return_value=(True, "Name  Version\nfirefox  128.0\nsnapd  2.63\n", ""),
+            ) as run,
+        ):
+            assert mgr.list_packages() == ["firefox"]
+        run.assert_called_once()
+
+
+class TestOutdatedProbes:
+    """Tests for the cheap outdated-package probes used to skip upgrades."""
+
+    def _probe(self, mgr, *results) -> Optional[list[str]]:
+        with (
+            patch.object(mgr, "is_available", return_value=True),
+            patch.object(mgr, "run_command_with_output", side_effect=results),
+        ):
+            return mgr.outdated_packages()
+
+    def test_apt_upgradable(self) -> None:
+        stdout = (
+            "Listing...\n"
+            "curl/jammy-updates 7.81.0-1ubuntu1.16 amd64 "
+            "[upgradable from: 7.81.0-1ubuntu1.15]\n"
+        )
+        assert self._probe(AptManager({}), (True, stdout, "")) == ["curl"]
+
+    def test_dnf_check_update_exit_codes(self) -> None:
+        updates = (
+            "\nkernel.x86_64    6.9.7-200.fc40    updates\n"
+            "vim-enhanced.x86_64    2:9.1.452-1.fc40    updates\n"
+            "Obsoleting Packages\n"
+            "grub2-tools.x86_64    1:2.06-121.fc40    updates\n"
+        )
+        mgr = DnfManager({"commands": {}})
+        # Exit code 100 (not ok) with a package list means updates are available
+        assert self._probe(mgr, (False, updates, "")) == ["kernel", "vim-enhanced"]
+        assert self._probe(mgr, (True, "", "")) == []
+        assert self._probe(mgr, (False, "", "Error: Failed to download")) is None
+
+    def test_brew_outdated_json(self) -> None:
+        stdout = json.dumps(
+            {"formulae": [{"name": "git"}], "casks": [{"name": "firefox"}]}
+        )
+        assert self._probe(HomebrewManager({}), (True, stdout, "")) == [
+            "git",
+            "firefox",
+        ]
+
+    def test_brew_trusts_nothing_outdated_only_with_fresh_taps(
+        self, monkeypatch
+    ) -> None:
+        monkeypatch.setattr(cellar, "brew_prefix", lambda: None)
+        mgr = HomebrewManager({"update_ttl": "1h"})
+        mgr.name = "brew"
+        nothing = (True, json.dumps({"formulae": [], "casks": []}), "")
+
+        # Never updated: the taps may be stale, so the answer is unknown
+        assert self._probe(mgr, nothing) is None
+        freshness.record_update("brew", time.time() - 7200)
+        assert self._probe(mgr, nothing) is None
+        # Updated within update_ttl
+        freshness.record_update("brew", time.time() - 600)
+        assert self._probe(mgr, nothing) == []
+        # Updated earlier in this run, even without an update_ttl
+        mgr = HomebrewManager({})
+        mgr.name = "brew"
+        monkeypatch.setattr(freshness, "RUN_STARTED", time.time() - 900)
+        assert self._probe(mgr, nothing) == []
+
+    def test_brew_probe_mirrors_upgrade_flags(self) -> None:
+        mgr = HomebrewManager(
+            {"commands": {"upgrade": ["brew", "upgrade", "--greedy", "--quiet"]}}
+        )
+        stdout = json.dumps({"formulae": [], "casks": [{"name": "firefox"}]})
+        with (
+            patch.object(mgr, "is_available", return_value=True),
+            patch.object(
+                mgr, "run_command_with_output", return_value=(True, stdout, "")
+            ) as run,
+        ):
+            assert mgr.outdated_packages() == ["firefox"]
+        assert run.call_args.args[0] == ["brew", "outdated", "--json=v2", "--greedy"]
+
+    def test_npm_outdated_exits_nonzero(self) -> None:
+        stdout = json.dumps({"eslint": {"current": "9.5.0", "latest": "9.6.0"}})
+        mgr = NpmManager({})
+        assert self._probe(mgr, (False, stdout, "")) == ["eslint"]
+        assert self._probe(mgr, (True, "{}", "")) == []
+        assert self._probe(mgr, (False, "", "npm ERR! network")) is None
+
+    def test_gem_and_uv_output(self) -> None:
+        gems = "rake (13.0.6 < 13.2.1)\nrdoc (6.6.2 < 6.7.0)\n"
+        assert self._probe(GemManager({}), (True, gems, "")) == ["rake", "rdoc"]
+        tools = "ruff v0.5.0 [latest: 0.6.0]\n- ruff\n"
+        assert self._probe(UvManager({}), (True, tools, "")) == ["ruff"]